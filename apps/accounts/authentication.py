@@ -0,0 +1,222 @@
+"""
+Authentification par token avec mise en cache de l'utilisateur.
+
+TokenAuthentication exécute une jointure Token + User à chaque requête d'API.
+CachedTokenAuthentication conserve dans le cache partagé (memcached en
+production) la correspondance token → identifiant d'utilisateur et les champs
+de l'utilisateur, avec une courte durée de vie, précédé d'un petit cache LRU
+propre au processus. Sur un succès de cache, l'utilisateur est reconstruit sans
+aucune requête.
+
+Les entrées sont invalidées par signaux à l'enregistrement d'un utilisateur et à
+la suppression d'un token. Chaque utilisateur a un numéro de génération, lu avant
+le chargement depuis la base et incrémenté par l'invalidation : une entrée écrite
+par une requête concurrente avec des valeurs antérieures à l'invalidation porte
+l'ancienne génération et est ignorée. Le cache local n'est invalidé que dans le
+processus courant : sa durée de vie (quelques secondes) borne le délai de
+propagation.
+
+Un utilisateur reconstruit depuis le cache n'enregistre que les champs modifiés
+depuis sa reconstruction (voir User.save) : save() ne réécrit jamais en base des
+valeurs du cache.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+
+# Durée de vie des entrées dans le cache partagé (secondes)
+TOKEN_CACHE_TIMEOUT = 300
+
+# Cache local : nombre d'entrées (0 pour le désactiver) et durée de vie (secondes)
+LOCAL_CACHE_SIZE = 1024
+LOCAL_CACHE_TIMEOUT = 5
+
+# Champs jamais copiés dans le cache
+EXCLUDED_FIELDS = ('password',)
+
+
+def _token_cache_key(key):
+    # Le token lui-même n'apparaît jamais dans les clés de cache
+    return 'auth_token_%s' % hashlib.sha256(key.encode()).hexdigest()
+
+
+def _user_cache_key(user_id):
+    return f'auth_user_{user_id}'
+
+
+def _generation_key(user_id):
+    return f'auth_user_generation_{user_id}'
+
+
+class LocalLRUCache:
+    """
+    Cache LRU en mémoire, avec expiration, partagé par les threads d'un processus.
+    """
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, predicate):
+        """Supprime les entrées dont la valeur satisfait le prédicat."""
+        with self._lock:
+            for key in [key for key, (_, value) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalLRUCache(
+    getattr(settings, 'TOKEN_AUTH_LOCAL_CACHE_SIZE', LOCAL_CACHE_SIZE),
+    getattr(settings, 'TOKEN_AUTH_LOCAL_CACHE_TIMEOUT', LOCAL_CACHE_TIMEOUT)
+)
+
+
+def serialize_user(user):
+    """Valeurs des champs de l'utilisateur à conserver en cache."""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in User._meta.concrete_fields
+        if field.attname not in EXCLUDED_FIELDS
+    }
+
+
+def build_user(values):
+    """
+    Reconstruit un utilisateur à partir des valeurs en cache, sans requête.
+    Les champs exclus restent différés et sont chargés à la demande.
+
+    L'instance reçoit une copie des valeurs (le cache local est partagé entre
+    les requêtes) et garde les valeurs d'origine dans _cached_values.
+    """
+    field_names = list(values)
+    user = User.from_db(DEFAULT_DB_ALIAS, field_names, [copy.deepcopy(values[name]) for name in field_names])
+    user._cached_values = values
+    return user
+
+
+def user_generation(user_id):
+    """
+    Génération courante des entrées de l'utilisateur. Une génération absente
+    est initialisée à partir de l'horloge, pour ne jamais revalider une
+    entrée déjà écrite.
+    """
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def invalidate_user(user_id):
+    """Oublie l'utilisateur en cache (cache partagé et cache local du processus)."""
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        # Génération absente : aucune entrée écrite avec elle ne sera acceptée
+        pass
+    cache.delete(_user_cache_key(user_id))
+    local_cache.discard(lambda values: values['id'] == user_id)
+
+
+def invalidate_token(key, user_id=None):
+    """
+    Oublie un token en cache. Avec user_id, les entrées de l'utilisateur en
+    cours d'écriture par une requête concurrente sont aussi invalidées.
+    """
+    token_key = _token_cache_key(key)
+    cache.delete(token_key)
+    local_cache.discard(lambda values: values.get('_token') == token_key)
+    if user_id is not None:
+        invalidate_user(user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication sans requête lorsque le token et l'utilisateur sont en cache.
+    """
+    def authenticate_credentials(self, key):
+        token_key = _token_cache_key(key)
+
+        values = local_cache.get(token_key)
+        if values is None:
+            user_id = cache.get(token_key)
+            values = self._get_shared(token_key, user_id) if user_id is not None else None
+            if values is None:
+                return self._authenticate_from_db(key, token_key, user_id)
+            local_cache.set(token_key, values)
+
+        if not values['is_active']:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        user = build_user({name: value for name, value in values.items() if name != '_token'})
+        # Token reconstruit lui aussi : request.auth reste utilisable (suppression à la déconnexion)
+        token = Token.from_db(DEFAULT_DB_ALIAS, ['key', 'user_id'], [key, user.pk])
+        return (user, token)
+
+    def _get_shared(self, token_key, user_id):
+        user_key, generation_key = _user_cache_key(user_id), _generation_key(user_id)
+        entries = cache.get_many([user_key, generation_key])
+        entry = entries.get(user_key)
+        # Entrée écrite avant la dernière invalidation : ignorée
+        if entry is None or entry[0] != entries.get(generation_key):
+            return None
+        return {**entry[1], '_token': token_key}
+
+    def _authenticate_from_db(self, key, token_key, user_id=None):
+        if user_id is None:
+            user_id = Token.objects.filter(key=key).values_list('user_id', flat=True).first()
+            if user_id is None:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        # Lue avant l'utilisateur : une invalidation survenant pendant le
+        # chargement rend obsolète l'entrée écrite ci-dessous
+        generation = user_generation(user_id)
+        user, token = super().authenticate_credentials(key)
+        if user.pk != user_id:
+            return (user, token)
+
+        values = serialize_user(user)
+        timeout = getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', TOKEN_CACHE_TIMEOUT)
+        cache.set_many({token_key: user.pk, _user_cache_key(user.pk): (generation, values)}, timeout)
+        local_cache.set(token_key, {**values, '_token': token_key})
+        return (user, token)
@@ -0,0 +1,291 @@
+"""
+Import en masse de comptes (étudiants, élèves, enseignants) depuis un fichier
+CSV ou XLSX fourni par un établissement.
+
+Les lignes sont lues et validées une à une, sans charger le fichier en mémoire.
+Les lignes valides sont regroupées par lots ; les mots de passe d'un lot sont
+hachés dans un groupe de processus (le hachage PBKDF2 est volontairement
+coûteux), puis UserImportService crée les comptes et leurs profils en quelques
+requêtes par lot.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+
+import django
+import openpyxl
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.translation import gettext as _
+
+from .models import User, Student, Pupil, Teacher
+
+# Nombre de comptes créés par transaction
+IMPORT_BATCH_SIZE = 500
+
+# Nombre maximal de lignes importées par l'API, dans la requête HTTP ; les
+# fichiers plus grands passent par la commande import_users
+WEB_IMPORT_MAX_ROWS = 200
+
+# Types de comptes importables et modèle de profil associé
+PROFILE_MODELS = {
+    'student': Student,
+    'pupil': Pupil,
+    'teacher': Teacher,
+}
+
+# Colonnes correspondant à des champs de l'utilisateur
+USER_COLUMNS = (
+    'email', 'first_name', 'last_name', 'phone_number', 'date_of_birth',
+    'address', 'city', 'postal_code', 'country',
+)
+
+# Champs de profil jamais renseignés par un import
+PROFILE_EXCLUDED_FIELDS = ('user', 'is_approved', 'approval_date')
+
+# En-têtes usuels des tableurs des établissements
+HEADER_ALIASES = {
+    'e_mail': 'email',
+    'courriel': 'email',
+    'adresse_email': 'email',
+    'prenom': 'first_name',
+    'prénom': 'first_name',
+    'nom': 'last_name',
+    'mot_de_passe': 'password',
+    'telephone': 'phone_number',
+    'téléphone': 'phone_number',
+    'date_de_naissance': 'date_of_birth',
+    'adresse': 'address',
+    'ville': 'city',
+    'code_postal': 'postal_code',
+    'pays': 'country',
+}
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+
+
+def normalize_header(header):
+    name = str(header or '').strip().lower().replace(' ', '_').replace('-', '_')
+    return HEADER_ALIASES.get(name, name)
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def read_rows(file, filename=''):
+    """
+    Parcourt les lignes d'un fichier CSV ou XLSX ouvert en mode binaire.
+
+    Yields:
+        Tuples (numéro de ligne dans le fichier, dictionnaire colonne → valeur)
+    """
+    if filename.lower().endswith('.xlsx'):
+        yield from _read_xlsx(file)
+    elif filename.lower().endswith('.csv'):
+        yield from _read_csv(file)
+    else:
+        raise ValueError(_("Format de fichier non pris en charge : utilisez un fichier CSV ou XLSX."))
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            # Les tableurs configurés en français exportent avec des points-virgules
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(text, dialect)
+        headers = [normalize_header(header) for header in next(reader, [])]
+        for row in reader:
+            if any(not _is_blank(value) for value in row):
+                yield reader.line_num, dict(zip(headers, row))
+    finally:
+        # Le fichier sous-jacent reste ouvert : il appartient à l'appelant
+        text.detach()
+
+
+def _read_xlsx(file):
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(header) for header in next(rows, ())]
+        for line, row in enumerate(rows, start=2):
+            if any(not _is_blank(value) for value in row):
+                yield line, dict(zip(headers, row))
+    finally:
+        workbook.close()
+
+
+@lru_cache(maxsize=None)
+def profile_fields(model):
+    """Champs d'un modèle de profil qu'une colonne peut renseigner."""
+    return {
+        field.name: field
+        for field in model._meta.concrete_fields
+        if field.editable
+        and not field.is_relation
+        and field.name not in PROFILE_EXCLUDED_FIELDS
+        and not isinstance(field, (models.FileField, models.JSONField))
+    }
+
+
+@lru_cache(maxsize=None)
+def required_profile_fields(model):
+    """Champs d'un modèle de profil sans valeur par défaut, à renseigner par l'import."""
+    return tuple(
+        name for name, field in profile_fields(model).items()
+        if not field.blank and not field.null and not field.has_default()
+    )
+
+
+def clean_value(field, value):
+    """Convertit et valide une cellule selon le champ de modèle correspondant."""
+    if isinstance(value, str):
+        value = value.strip()
+    if isinstance(field, models.DateField):
+        if isinstance(value, datetime):
+            value = value.date()
+        elif isinstance(value, str):
+            for date_format in DATE_FORMATS:
+                try:
+                    value = datetime.strptime(value, date_format).date()
+                    break
+                except ValueError:
+                    continue
+    elif isinstance(field, models.CharField) and not isinstance(value, (str, date)):
+        # Numéros de téléphone ou matricules lus comme nombres dans un tableur
+        value = str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+    return field.clean(value, None)
+
+
+class RowValidator:
+    """
+    Valide les lignes d'un fichier une à une et repère les adresses email en
+    double dans le fichier.
+
+    Args:
+        default_type: Type de compte des lignes sans colonne « type »
+        defaults: Valeurs appliquées aux cellules vides (ex. {'school_id': 3})
+    """
+    def __init__(self, default_type=None, defaults=None):
+        self.default_type = default_type
+        self.defaults = defaults or {}
+        self.seen_emails = set()
+
+    def clean(self, row):
+        """
+        Returns:
+            Tuple (valeurs de l'utilisateur, valeurs du profil, mot de passe ou None)
+
+        Raises:
+            ValidationError: Avec les erreurs de la ligne, par colonne
+        """
+        data = {**self.defaults, **{name: value for name, value in row.items() if not _is_blank(value)}}
+        errors = {}
+
+        user_type = str(data.pop('type', None) or self.default_type or '').strip().lower()
+        profile_model = PROFILE_MODELS.get(user_type)
+        if profile_model is None:
+            errors['type'] = [_("Type de compte non importable : « %(type)s ».") % {'type': user_type}]
+
+        password = data.pop('password', None)
+        user_values, profile_values = {'type': user_type}, {}
+        for name, value in data.items():
+            if name in USER_COLUMNS:
+                target, field = user_values, User._meta.get_field(name)
+            elif profile_model is not None and name in profile_fields(profile_model):
+                target, field = profile_values, profile_fields(profile_model)[name]
+            else:
+                continue
+            try:
+                target[name] = clean_value(field, value)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        for name in ('email', 'first_name', 'last_name'):
+            if name not in user_values and name not in errors:
+                errors[name] = [_("Ce champ est obligatoire.")]
+
+        if profile_model is not None:
+            for name in required_profile_fields(profile_model):
+                if name not in profile_values and name not in errors:
+                    errors[name] = [_("Ce champ est obligatoire.")]
+
+        if 'email' in user_values:
+            email = User.objects.normalize_email(user_values['email'])
+            if email.lower() in self.seen_emails:
+                errors['email'] = [_("Adresse email déjà présente plus haut dans le fichier.")]
+            self.seen_emails.add(email.lower())
+            user_values['email'] = email
+
+        if errors:
+            raise ValidationError(errors)
+        return user_values, profile_values, None if password is None else str(password)
+
+
+class ImportReport:
+    """
+    Résultat d'un import : comptes créés et erreurs par ligne.
+    """
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, email, errors):
+        self.errors.append({
+            'line': line,
+            'email': email or '',
+            'errors': errors,
+        })
+
+    def as_dict(self):
+        return {
+            'dry_run': self.dry_run,
+            'created': self.created,
+            'error_count': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+@contextmanager
+def password_pool(workers=None):
+    """
+    Groupe de processus pour le hachage des mots de passe, ou None pour hacher
+    dans le processus courant (un seul processus demandé).
+    """
+    if workers is None:
+        workers = getattr(settings, 'USER_IMPORT_WORKERS', None) or os.cpu_count() or 1
+    if workers <= 1:
+        yield None
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        yield pool
+
+
+def hash_passwords(passwords, pool=None):
+    """
+    Hache une liste de mots de passe, en parallèle si un groupe est fourni.
+    Un mot de passe absent donne un mot de passe inutilisable (sans calcul) :
+    le titulaire du compte le définit par la réinitialisation du mot de passe.
+    """
+    secrets = [password for password in passwords if password]
+    if pool is not None and secrets:
+        hashed = pool.map(make_password, secrets, chunksize=8)
+    else:
+        hashed = map(make_password, secrets)
+    hashed = iter(hashed)
+    return [next(hashed) if password else make_password(None) for password in passwords]
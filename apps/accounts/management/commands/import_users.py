@@ -0,0 +1,59 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.imports import IMPORT_BATCH_SIZE, PROFILE_MODELS
+from apps.accounts.services import UserImportService
+
+
+class Command(BaseCommand):
+    """
+    Importe en masse des comptes depuis le tableur d'un établissement.
+    """
+    help = "Importe des comptes (étudiants, élèves, enseignants) depuis un fichier CSV ou XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Chemin du fichier CSV ou XLSX")
+        parser.add_argument('--type', choices=sorted(PROFILE_MODELS),
+                            help="Type des comptes pour les lignes sans colonne « type »")
+        parser.add_argument('--school-id', type=int,
+                            help="Établissement des étudiants et enseignants sans colonne « school_id »")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help="Nombre de comptes créés par transaction")
+        parser.add_argument('--workers', type=int,
+                            help="Nombre de processus de hachage des mots de passe")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Valider le fichier sans créer de compte")
+
+    def handle(self, *args, **options):
+        defaults = {}
+        if options['school_id'] is not None:
+            defaults['school_id'] = options['school_id']
+
+        start = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as file:
+                report = UserImportService.import_file(
+                    file,
+                    os.path.basename(options['path']),
+                    default_type=options['type'],
+                    defaults=defaults,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    dry_run=options['dry_run']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            details = '; '.join(
+                f"{field} : {' '.join(messages)}" for field, messages in error['errors'].items()
+            )
+            self.stderr.write(f"Ligne {error['line']} ({error['email']}) : {details}")
+
+        verb = "valide(s)" if report.dry_run else "créé(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.created} compte(s) {verb}, {len(report.errors)} ligne(s) en erreur "
+            f"en {time.monotonic() - start:.1f} s."
+        ))
@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-19 03:52
+
+from django.db import migrations, models
+
+from apps.accounts.search import search_keys
+
+BATCH_SIZE = 1000
+
+
+def fill_search_keys(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    users = User.objects.only('first_name', 'last_name', 'email').order_by('pk')
+    batch = []
+    for user in users.iterator(chunk_size=BATCH_SIZE):
+        for name, value in search_keys(user).items():
+            setattr(user, name, value)
+        batch.append(user)
+        if len(batch) == BATCH_SIZE:
+            User.objects.bulk_update(batch, ['search_first_name', 'search_last_name', 'search_key'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['search_first_name', 'search_last_name', 'search_key'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Index GIN de trigrammes : recherche de sous-chaînes et classement par similarité
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS user_search_key_trgm_idx '
+        'ON accounts_user USING gin (search_key gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS user_search_key_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_remove_advisor_expertise_areas'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_first_name',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_key',
+            field=models.CharField(blank=True, editable=False, max_length=600),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_last_name',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_last_name'], name='user_search_last_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_first_name'], name='user_search_first_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
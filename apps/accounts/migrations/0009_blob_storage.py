@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 04:07
+
+import apps.resources.blobs
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_search_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teacher',
+            name='cv',
+            field=models.FileField(blank=True, help_text='Curriculum Vitae du professeur', null=True, storage=apps.resources.blobs.get_blob_storage, upload_to='teacher_cvs/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(['pdf', 'doc', 'docx'])], verbose_name='CV complet'),
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='degree_document',
+            field=models.FileField(blank=True, help_text='Document scanné du diplôme (PDF ou image)', null=True, storage=apps.resources.blobs.get_blob_storage, upload_to='teacher_degrees/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(['pdf', 'png', 'jpg', 'jpeg'])], verbose_name='document du diplôme'),
+        ),
+        migrations.AlterField(
+            model_name='teacher',
+            name='identity_document',
+            field=models.FileField(blank=True, help_text="Document d'identité scanné (PDF ou image)", null=True, storage=apps.resources.blobs.get_blob_storage, upload_to='teacher_identity/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(['pdf', 'png', 'jpg', 'jpeg'])], verbose_name="document d'identité"),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='identity_document',
+            field=models.FileField(blank=True, null=True, storage=apps.resources.blobs.get_blob_storage, upload_to='identity_documents/', verbose_name="pièce d'identité"),
+        ),
+    ]
@@ -5,6 +5,9 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.resources.blobs import get_blob_storage
+from .search import SEARCH_KEY_FIELDS, search_keys
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -100,7 +103,7 @@ class User(AbstractUser, PermissionsMixin):
     country = models.CharField(_('pays'), max_length=100, blank=True)
     
     # Identité et documents
-    identity_document = models.FileField(_('pièce d\'identité'), upload_to='identity_documents/', blank=True, null=True)
+    identity_document = models.FileField(_('pièce d\'identité'), upload_to='identity_documents/', storage=get_blob_storage, blank=True, null=True)
     
     # Consentements
     data_processing_consent = models.BooleanField(_('consentement au traitement des données'), default=False)
@@ -132,6 +135,11 @@ class User(AbstractUser, PermissionsMixin):
     verification_completed_date = models.DateTimeField(_('date de vérification complétée'), null=True, blank=True)
     verification_notes = models.TextField(_('notes de vérification'), blank=True)
 
+    # Clés de recherche normalisées (voir apps.accounts.search), tenues à jour par save()
+    search_first_name = models.CharField(max_length=150, blank=True, editable=False)
+    search_last_name = models.CharField(max_length=150, blank=True, editable=False)
+    search_key = models.CharField(max_length=600, blank=True, editable=False)
+
     objects = CustomUserManager()
 
     USERNAME_FIELD = 'email'
@@ -141,12 +149,51 @@ class User(AbstractUser, PermissionsMixin):
         verbose_name = _('utilisateur')
         verbose_name_plural = _('utilisateurs')
         ordering = ['-date_joined']
+        indexes = [
+            # Recherches par préfixe ; l'index de trigrammes de search_key
+            # (PostgreSQL uniquement) est créé par la migration 0008
+            models.Index(fields=['search_last_name'], name='user_search_last_name_idx',
+                         opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['search_first_name'], name='user_search_first_name_idx',
+                         opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
+    def refresh_search_keys(self):
+        """Recalcule les clés de recherche à partir du nom et de l'email."""
+        for name, value in search_keys(self).items():
+            setattr(self, name, value)
+    
+    def cached_changed_fields(self):
+        """
+        Champs modifiés depuis la reconstruction de l'utilisateur à partir du
+        cache d'authentification (voir apps.accounts.authentication).
+        """
+        deferred = self.get_deferred_fields()
+        return [
+            field.attname for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in deferred and (
+                field.attname not in self._cached_values
+                or getattr(self, field.attname) != self._cached_values[field.attname]
+            )
+        ]
+    
     def save(self, *args, **kwargs):
         created = not self.pk  # Vérifie si c'est une nouvelle création
+        
+        # Utilisateur issu du cache : ne jamais réécrire des valeurs potentiellement obsolètes
+        if getattr(self, '_cached_values', None) is not None and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = self.cached_changed_fields()
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_search_keys()
+        elif set(update_fields) & {'first_name', 'last_name', 'email'}:
+            self.refresh_search_keys()
+            kwargs['update_fields'] = set(update_fields) | set(SEARCH_KEY_FIELDS)
+        
         super().save(*args, **kwargs)
         
         if created and not self.is_staff:  # Pour les nouveaux utilisateurs non-admins
@@ -338,6 +385,7 @@ class Teacher(models.Model):
     degree_document = models.FileField(
         _('document du diplôme'), 
         upload_to='teacher_degrees/%Y/%m/%d/',
+        storage=get_blob_storage,
         blank=True,
         null=True,
         help_text=_("Document scanné du diplôme (PDF ou image)"),
@@ -357,6 +405,7 @@ class Teacher(models.Model):
     cv = models.FileField(
         _('CV complet'), 
         upload_to='teacher_cvs/%Y/%m/%d/',
+        storage=get_blob_storage,
         blank=True,
         null=True,
         help_text=_("Curriculum Vitae du professeur"),
@@ -366,6 +415,7 @@ class Teacher(models.Model):
     identity_document = models.FileField(
         _('document d\'identité'), 
         upload_to='teacher_identity/%Y/%m/%d/',
+        storage=get_blob_storage,
         blank=True,
         null=True,
         help_text=_("Document d'identité scanné (PDF ou image)"),
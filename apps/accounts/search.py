@@ -0,0 +1,125 @@
+"""
+Recherche indexée dans l'annuaire des utilisateurs.
+
+Chaque utilisateur porte des clés de recherche normalisées (minuscules, sans
+accents ni ponctuation), tenues à jour par User.save() :
+- search_key : prénom, nom et email, couvert sous PostgreSQL par un index GIN
+  pg_trgm qui sert les recherches de sous-chaînes (LIKE '%…%') ;
+- search_first_name / search_last_name : couverts par des index B-tree, qui
+  servent les recherches par préfixe (mots de moins de trois caractères sous
+  PostgreSQL, toutes les recherches sous SQLite).
+
+Sous PostgreSQL, les résultats sont classés par similarité de trigrammes
+(word_similarity) ; ailleurs, les candidats sont classés en Python.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, Value
+
+# Nombre de résultats de l'autocomplétion
+TYPEAHEAD_LIMIT = 10
+
+# Longueur minimale d'un mot pour l'index de trigrammes
+TRIGRAM_MIN_LENGTH = 3
+
+# Candidats classés en Python par résultat demandé (hors PostgreSQL)
+CANDIDATES_PER_RESULT = 5
+
+SEARCH_KEY_FIELDS = ('search_first_name', 'search_last_name', 'search_key')
+
+NON_SEARCHABLE_RE = re.compile(r'[^a-z0-9@._]+')
+
+
+def fold(value):
+    """
+    Forme normalisée d'un texte : minuscules, sans accents, ponctuation
+    remplacée par des espaces. « Jean-Loïc » donne « jean loic ».
+    """
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(character for character in value if not unicodedata.combining(character))
+    return NON_SEARCHABLE_RE.sub(' ', value.lower()).strip()
+
+
+def search_keys(user):
+    """Valeurs des clés de recherche d'un utilisateur."""
+    first_name, last_name = fold(user.first_name), fold(user.last_name)
+    return {
+        'search_first_name': first_name[:150],
+        'search_last_name': last_name[:150],
+        'search_key': ' '.join(part for part in (first_name, last_name, (user.email or '').lower()) if part),
+    }
+
+
+def _uses_trigrams():
+    return connection.vendor == 'postgresql'
+
+
+def _prefix(field, prefix):
+    if _uses_trigrams():
+        # LIKE 'abc%' servi par l'index varchar_pattern_ops
+        return Q(**{f'{field}__startswith': prefix})
+    # Intervalle servi par un index B-tree ordinaire (le LIKE de SQLite ne l'est pas)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '\uffff'})
+
+
+def _word_filter(word):
+    if _uses_trigrams() and len(word) >= TRIGRAM_MIN_LENGTH:
+        return Q(search_key__contains=word)
+    return _prefix('search_first_name', word) | _prefix('search_last_name', word) | _prefix('email', word)
+
+
+def search_users(queryset, query):
+    """
+    Filtre un queryset d'utilisateurs : chaque mot de la requête doit
+    correspondre (sous-chaîne ou préfixe selon la base).
+    """
+    words = fold(query).split()
+    for word in words:
+        queryset = queryset.filter(_word_filter(word))
+    return queryset
+
+
+class WordSimilarity(Func):
+    """Fonction word_similarity de pg_trgm."""
+    function = 'word_similarity'
+    output_field = FloatField()
+
+
+def rank_users(queryset, query, limit=TYPEAHEAD_LIMIT):
+    """
+    Meilleures correspondances pour l'autocomplétion, de la plus proche à la
+    moins proche.
+
+    Returns:
+        Liste de tuples (utilisateur, score entre 0 et 1)
+    """
+    folded = fold(query)
+    if not folded:
+        return []
+
+    queryset = search_users(queryset, folded)
+    if _uses_trigrams():
+        queryset = queryset.annotate(
+            score=WordSimilarity(Value(folded), F('search_key'))
+        ).order_by('-score', 'search_last_name', 'pk')[:limit]
+        return [(user, user.score) for user in queryset]
+
+    candidates = queryset.order_by('search_last_name', 'search_first_name', 'pk')[:limit * CANDIDATES_PER_RESULT]
+    scored = [(user, _similarity(folded, user)) for user in candidates]
+    scored.sort(key=lambda item: -item[1])
+    return scored[:limit]
+
+
+def _similarity(folded, user):
+    """Proximité entre la requête et le nom (dans les deux ordres) ou l'email."""
+    first_name, last_name = user.search_first_name, user.search_last_name
+    return max(
+        SequenceMatcher(None, folded, value).ratio()
+        for value in (first_name, last_name, f'{first_name} {last_name}', f'{last_name} {first_name}',
+                      user.email.lower())
+        if value
+    )
@@ -4,6 +4,7 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.password_validation import validate_password
 
+from apps.resources.derivatives import ImageDerivativesField
 from ..models import User, Student, Teacher, Advisor, Pupil, Administrator
 from .base import (
     UserBaseSerializer, 
@@ -20,10 +21,11 @@ class UserSerializer(UserBaseSerializer):
     """
     verification_status_display = serializers.CharField(source='get_verification_status_display', read_only=True)
     type_display = serializers.CharField(source='get_type_display', read_only=True)
+    profile_picture_derivatives = ImageDerivativesField(source='profile_picture')
     
     class Meta(UserBaseSerializer.Meta):
         fields = UserBaseSerializer.Meta.fields + [
-            'phone_number', 'date_of_birth', 'profile_picture', 
+            'phone_number', 'date_of_birth', 'profile_picture', 'profile_picture_derivatives',
             'address', 'city', 'date_joined', 'verification_status_display',
             'type_display', 'is_active'
         ]
@@ -1,6 +1,12 @@
 # apps/accounts/services.py
-from venv import logger
-from django.db import IntegrityError
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.core.exceptions import ValidationError
+from django.contrib.contenttypes.models import ContentType
+from django.template import Context, Template
+from django.utils.translation import gettext as _
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
@@ -9,7 +15,14 @@ from django.utils.encoding import force_bytes
 from django.conf import settings
 
 from .models import User, Student, Teacher, Advisor, Administrator
+from .imports import (
+    IMPORT_BATCH_SIZE, PROFILE_MODELS, ImportReport, RowValidator,
+    hash_passwords, password_pool, read_rows
+)
 from apps.notifications.models import Notification  # À importer si le modèle existe
+from apps.notifications.models import NotificationType, UserNotificationPreference
+
+logger = logging.getLogger(__name__)
 
 
 class AccountService:
@@ -394,4 +407,238 @@ class AccountService:
             'rejected_count': rejected_count,
             'unverified_count': unverified_count,
             'new_users_this_month': new_users_this_month,
-        }
\ No newline at end of file
+        }
+
+
+class UserImportService:
+    """
+    Service d'import en masse de comptes depuis le tableur d'un établissement.
+
+    Les comptes sont créés par lots avec bulk_create, sans passer par
+    create_user ni par les signaux post_save : les préférences de notification,
+    la notification de bienvenue et les activités que ces signaux produiraient
+    sont créées une seule fois par lot (voir create_welcome_records).
+    Les comptes importés sont inactifs et non vérifiés, comme à l'inscription.
+    """
+
+    @classmethod
+    def import_file(cls, file, filename, default_type=None, defaults=None,
+                    batch_size=IMPORT_BATCH_SIZE, workers=None, dry_run=False, max_rows=None):
+        """
+        Importe les comptes décrits par un fichier CSV ou XLSX.
+
+        Args:
+            file: Le fichier, ouvert en mode binaire
+            filename: Le nom du fichier (l'extension détermine le format)
+            default_type: Type des comptes pour les lignes sans colonne « type »
+            defaults: Valeurs des colonnes absentes ou vides (ex. {'school_id': 3})
+            batch_size: Nombre de comptes créés par transaction
+            workers: Nombre de processus de hachage (par défaut USER_IMPORT_WORKERS
+                ou le nombre de processeurs)
+            dry_run: Si True, valide le fichier sans rien créer
+            max_rows: Nombre maximal de lignes, vérifié avant toute création
+
+        Returns:
+            ImportReport: Comptes créés et erreurs par ligne
+
+        Raises:
+            ValueError: Si le format du fichier n'est pas pris en charge ou s'il
+                dépasse max_rows lignes
+        """
+        if max_rows is not None:
+            if sum(1 for row in read_rows(file, filename)) > max_rows:
+                raise ValueError(_(
+                    "Le fichier dépasse %(max_rows)d lignes : utilisez la commande d'import."
+                ) % {'max_rows': max_rows})
+            file.seek(0)
+
+        report = ImportReport(dry_run=dry_run)
+        validator = RowValidator(default_type, defaults)
+        batch = []
+
+        # Pas de groupe de processus pour une simple validation
+        with password_pool(1 if dry_run else workers) as pool:
+            for line, row in read_rows(file, filename):
+                try:
+                    user_values, profile_values, password = validator.clean(row)
+                except ValidationError as e:
+                    report.add_error(line, row.get('email'), e.message_dict)
+                    continue
+
+                batch.append((line, user_values, profile_values, password))
+                if len(batch) >= batch_size:
+                    cls.create_batch(batch, report, pool)
+                    batch = []
+
+            if batch:
+                cls.create_batch(batch, report, pool)
+
+        return report
+
+    @classmethod
+    def create_batch(cls, batch, report, pool=None):
+        """
+        Crée un lot de comptes validés et leurs profils dans une transaction.
+
+        Args:
+            batch: Liste de tuples (ligne, valeurs utilisateur, valeurs profil, mot de passe)
+            report: L'ImportReport à compléter
+            pool: Groupe de processus de hachage, ou None
+        """
+        rows = cls.exclude_existing(batch, report)
+        if report.dry_run:
+            report.created += len(rows)
+            return
+        if not rows:
+            return
+
+        passwords = hash_passwords([password for line, user_values, profile_values, password in rows], pool)
+        rows = [
+            (line, user_values, profile_values, hashed)
+            for (line, user_values, profile_values, password), hashed in zip(rows, passwords)
+        ]
+        try:
+            users = cls.insert_batch(rows)
+        except IntegrityError:
+            # Adresse enregistrée entre la vérification et l'insertion (inscription concurrente)
+            rows = cls.exclude_existing(rows, report)
+            try:
+                users = cls.insert_batch(rows) if rows else []
+            except IntegrityError as e:
+                logger.error(f"Échec de la création d'un lot de comptes importés : {str(e)}")
+                for line, user_values, profile_values, hashed in rows:
+                    report.add_error(line, user_values['email'], {
+                        'email': [_("Le compte n'a pas pu être créé : importez de nouveau cette ligne.")]
+                    })
+                return
+
+        report.created += len(users)
+
+    @classmethod
+    def exclude_existing(cls, batch, report):
+        """
+        Écarte les lignes dont l'adresse email (sans tenir compte de la casse)
+        appartient déjà à un compte, en les signalant dans le rapport.
+
+        Returns:
+            Les lignes restantes du lot
+        """
+        existing = set(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=[user_values['email'].lower() for line, user_values, *rest in batch])
+            .order_by().values_list('email_lower', flat=True)
+        )
+        rows = []
+        for row in batch:
+            line, user_values = row[0], row[1]
+            if user_values['email'].lower() in existing:
+                report.add_error(line, user_values['email'], {
+                    'email': [_("Un compte existe déjà avec cette adresse email.")]
+                })
+            else:
+                rows.append(row)
+        return rows
+
+    @classmethod
+    def insert_batch(cls, rows):
+        """
+        Insère les comptes et leurs profils dans une transaction.
+
+        Args:
+            rows: Liste de tuples (ligne, valeurs utilisateur, valeurs profil, mot de passe haché)
+
+        Returns:
+            Les utilisateurs créés
+
+        Raises:
+            IntegrityError: Si une adresse email a été enregistrée entre-temps
+        """
+        users = [
+            User(password=hashed, verification_status='unverified', **user_values)
+            for line, user_values, profile_values, hashed in rows
+        ]
+        # bulk_create n'appelle pas save() : les clés de recherche sont calculées ici
+        for user in users:
+            user.refresh_search_keys()
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+
+            profiles = {}
+            for user, (line, user_values, profile_values, hashed) in zip(users, rows):
+                model = PROFILE_MODELS[user.type]
+                profiles.setdefault(model, []).append(model(user=user, **profile_values))
+            for model, instances in profiles.items():
+                model.objects.bulk_create(instances)
+
+            cls.create_welcome_records(users)
+        return users
+
+    @classmethod
+    def create_welcome_records(cls, users):
+        """
+        Crée en quelques requêtes ce que les signaux post_save produisent pour
+        chaque nouveau compte : préférences de notification, notification de
+        bienvenue (dans l'application uniquement, sans email ni push) et
+        activités de création.
+        """
+        notification_types = list(NotificationType.objects.filter(is_active=True))
+        UserNotificationPreference.objects.bulk_create([
+            UserNotificationPreference(
+                user=user,
+                notification_type=notification_type,
+                email_enabled=notification_type.default_user_preference,
+                in_app_enabled=notification_type.default_user_preference,
+                push_enabled=notification_type.default_user_preference
+            )
+            for user in users
+            for notification_type in notification_types
+        ])
+
+        welcome = next((t for t in notification_types if t.code == 'welcome'), None)
+        if welcome is not None:
+            title_template = Template(welcome.title_template)
+            body_template = Template(welcome.body_template)
+            notifications = []
+            for user in users:
+                context = Context({'first_name': user.first_name, 'user': user})
+                notifications.append(Notification(
+                    user=user,
+                    notification_type=welcome,
+                    title=title_template.render(context),
+                    body=body_template.render(context),
+                    action_url='/profile/',
+                    action_text=_('Voir mon profil'),
+                    data={'first_name': user.first_name}
+                ))
+            Notification.objects.bulk_create(notifications)
+
+        if getattr(settings, 'TRACK_USER_ACTIVITY', False):
+            from apps.analytics.models import AnalyticsEvent, UserActivity
+
+            content_type = ContentType.objects.get_for_model(User)
+            UserActivity.objects.bulk_create([
+                UserActivity(
+                    user=user,
+                    action_type='create',
+                    action_detail="Utilisateur créé",
+                    content_type=content_type,
+                    object_id=user.pk
+                )
+                for user in users
+            ])
+            AnalyticsEvent.objects.bulk_create([
+                AnalyticsEvent(
+                    event_name='user_create',
+                    user=user,
+                    properties={
+                        'user_id': user.pk,
+                        'email': user.email,
+                        'is_staff': user.is_staff,
+                        'is_active': user.is_active,
+                        'date_joined': user.date_joined.isoformat(),
+                        'source': 'import'
+                    }
+                )
+                for user in users
+            ])
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user
+from apps.analytics.side_effects import defer
 from .models import User, Student, Teacher, Advisor, Pupil, Administrator
 from apps.notifications.models import Notification  # Importation supposée, peut nécessiter un ajustement
 
@@ -126,13 +131,28 @@ def notify_admin_profile_creation(sender, instance, created, **kwargs):
 
 
 
+def invalidate_cached_users(user_ids):
+    """
+    Gestionnaire d'effets de bord : retire les utilisateurs du cache d'authentification.
+    """
+    for user_id in user_ids:
+        invalidate_user(user_id)
+
+
 @receiver(post_save, sender=User)
-def handle_new_user_verification(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
     """
-    Gère le statut de vérification pour les nouveaux utilisateurs.
+    Retire l'utilisateur du cache d'authentification après validation de la
+    transaction, une seule fois par requête.
     """
-    if created:
-        # Pour les nouveaux utilisateurs non-admins, définir le statut 'unverified'
-        if not instance.is_staff and not instance.is_superuser:
-            instance.verification_status = 'unverified'
-            instance.save(update_fields=['verification_status'])
\ No newline at end of file
+    defer(invalidate_cached_users, instance.pk, key=instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Retire un token supprimé (déconnexion, renouvellement) du cache d'authentification.
+    """
+    key, user_id = instance.key, instance.user_id
+    transaction.on_commit(lambda: invalidate_token(key, user_id))
@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.authentication import CachedTokenAuthentication, invalidate_user, local_cache
+from apps.accounts.models import User
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedTokenAuthenticationTest(TestCase):
+    """
+    Tests pour l'authentification par token mise en cache.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def test_cache_hit_skips_database(self):
+        """
+        Test qu'un token en cache authentifie sans requête, y compris depuis le cache partagé.
+        """
+        # Token puis utilisateur
+        with self.assertNumQueries(2):
+            self.authentication.authenticate_credentials(self.token.key)
+
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, 'student@example.com')
+        self.assertEqual(user.type, 'student')
+        self.assertEqual(token.pk, self.token.key)
+
+        # Le mot de passe n'est pas mis en cache : il est chargé à la demande
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('securepass123'))
+
+    def test_signals_invalidate_entries(self):
+        """
+        Test que l'enregistrement de l'utilisateur et la suppression du token invalident le cache.
+        """
+        self.authentication.authenticate_credentials(self.token.key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.verification_status = 'verified'
+            self.user.save()
+
+        with self.assertNumQueries(1):
+            user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.verification_status, 'verified')
+
+        key = self.token.key
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(key)
+
+    def test_concurrent_invalidation_discards_fill(self):
+        """
+        Test qu'une entrée chargée avant une invalidation n'est pas réutilisée.
+        """
+        authenticate = TokenAuthentication.authenticate_credentials
+
+        def invalidated_during_load(authentication, key):
+            result = authenticate(authentication, key)
+            User.objects.filter(pk=self.user.pk).update(verification_status='verified')
+            invalidate_user(self.user.pk)
+            return result
+
+        with patch.object(TokenAuthentication, 'authenticate_credentials', invalidated_during_load):
+            self.authentication.authenticate_credentials(self.token.key)
+
+        local_cache.clear()
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.verification_status, 'verified')
+
+    def test_cached_user_saves_only_changes(self):
+        """
+        Test qu'un utilisateur issu du cache n'écrase pas les champs modifiés entre-temps.
+        """
+        self.authentication.authenticate_credentials(self.token.key)
+        user, _ = self.authentication.authenticate_credentials(self.token.key)
+        User.objects.filter(pk=self.user.pk).update(verification_status='verified')
+
+        with self.assertNumQueries(0):
+            user.save()
+
+        user.first_name = 'Nouveau'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Nouveau')
+        self.assertEqual(self.user.search_first_name, 'nouveau')
+        self.assertEqual(self.user.verification_status, 'verified')
@@ -0,0 +1,96 @@
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.accounts.search import fold, rank_users, search_users
+
+
+class UserSearchTest(TestCase):
+    """
+    Tests pour la recherche indexée dans l'annuaire des utilisateurs.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            password='adminpass123',
+            first_name='Admin',
+            last_name='User',
+            type='administrator',
+            is_staff=True,
+            is_active=True
+        )
+        self.elodie = User.objects.create_user(
+            email='e.muller@example.com',
+            password='securepass123',
+            first_name='Élodie',
+            last_name='Müller',
+            type='student'
+        )
+        self.eloise = User.objects.create_user(
+            email='eloise@example.com',
+            password='securepass123',
+            first_name='Éloïse',
+            last_name='Martin',
+            type='teacher',
+            is_active=True
+        )
+        self.mullins = User.objects.create_user(
+            email='jmullins@example.com',
+            password='securepass123',
+            first_name='Jean-Loïc',
+            last_name='Mullins',
+            type='student'
+        )
+
+    def test_search_keys_are_folded(self):
+        """
+        Test que les clés de recherche sont normalisées et tenues à jour par save().
+        """
+        self.assertEqual(fold('Jean-Loïc  MÜLLER'), 'jean loic muller')
+        self.assertEqual(self.elodie.search_key, 'elodie muller e.muller@example.com')
+
+        self.elodie.last_name = 'Lefèvre'
+        self.elodie.save(update_fields=['last_name'])
+        self.elodie.refresh_from_db()
+        self.assertEqual(self.elodie.search_last_name, 'lefevre')
+
+    def test_search_ignores_accents_and_case(self):
+        """
+        Test que chaque mot de la requête doit correspondre, sans tenir compte des accents.
+        """
+        queryset = User.objects.all()
+        self.assertEqual(set(search_users(queryset, 'elo')), {self.elodie, self.eloise})
+        self.assertEqual(set(search_users(queryset, 'Élo MÜLL')), {self.elodie})
+        self.assertEqual(set(search_users(queryset, 'jmull')), {self.mullins})
+        self.assertFalse(search_users(queryset, 'durand').exists())
+
+    def test_rank_users_orders_closest_first(self):
+        """
+        Test que les correspondances les plus proches sont classées en premier.
+        """
+        ranked = rank_users(User.objects.all(), 'mull')
+        self.assertEqual([user for user, score in ranked][0], self.elodie)
+        self.assertEqual({user for user, score in ranked}, {self.elodie, self.mullins})
+        self.assertGreaterEqual(ranked[0][1], ranked[1][1])
+        self.assertEqual(rank_users(User.objects.all(), '  '), [])
+
+    def test_search_api(self):
+        """
+        Test de la vue API d'autocomplétion.
+        """
+        self.client.force_login(self.admin)
+        response = self.client.get('/api/accounts/users/search/', {'q': 'elo', 'type': 'teacher'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['email'] for result in results], ['eloise@example.com'])
+        self.assertEqual(results[0]['first_name'], 'Éloïse')
+
+        response = self.client.get('/api/accounts/users/search/', {'q': 'mull', 'limit': 1})
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.client.force_login(self.eloise)
+        response = self.client.get('/api/accounts/users/search/', {'q': 'elo'})
+        self.assertEqual(response.status_code, 403)
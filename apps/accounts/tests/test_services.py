@@ -1,10 +1,15 @@
 from django.test import TestCase
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
-from datetime import timedelta
+from datetime import date, timedelta
+from io import BytesIO
+
+import openpyxl
 
 from apps.accounts.models import User, Student, Teacher, Advisor, Administrator
-from apps.accounts.services import AccountService
+from apps.accounts.imports import hash_passwords
+from apps.accounts.services import AccountService, UserImportService
+from apps.notifications.models import NotificationType
 
 
 class AccountServiceTest(TestCase):
@@ -337,3 +342,110 @@ class AccountServiceTest(TestCase):
         self.assertEqual(stats['verified_count'], 2)
         self.assertEqual(stats['pending_count'], 1)
         self.assertEqual(stats['unverified_count'], 1)
+
+
+class UserImportServiceTest(TestCase):
+    """
+    Tests pour l'import en masse de comptes.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        User.objects.create_user(
+            email='existing@example.com',
+            password='securepass123',
+            first_name='Déjà',
+            last_name='Inscrit',
+            type='student'
+        )
+        NotificationType.objects.update_or_create(code='welcome', defaults={
+            'name': 'Bienvenue',
+            'title_template': 'Bienvenue {{ first_name }}',
+            'body_template': 'Votre compte a été créé.',
+            'is_active': True
+        })
+
+    def test_import_csv_in_batches(self):
+        """
+        Test de l'import d'un CSV : comptes, profils et notifications créés par lots, erreurs par ligne.
+        """
+        rows = ['Prénom;Nom;Courriel;type;current_level;Mot de passe;date_de_naissance;institution_name;highest_degree;qualifications']
+        rows += [f'Élève{index};Test;pupil{index}@example.com;pupil;6e;;01/09/2012;;;' for index in range(5)]
+        rows += [
+            'Prof;Test;teacher@example.com;teacher;;secret-pass;;Lycée du Parc;Master;Agrégation',
+            'Sans;Adresse;;pupil;;;;;;',
+            'Déjà;Inscrit;Existing@Example.com;student;;;;;;',
+            'Doublon;Test;pupil0@example.com;pupil;;;;;;',
+            'Mauvais;Type;advisor@example.com;advisor;;;;;;',
+            'Prof;Incomplet;teacher2@example.com;teacher;;;;;Master;Agrégation',
+        ]
+        upload = BytesIO('\n'.join(rows).encode('utf-8-sig'))
+
+        with self.assertNumQueries(18):
+            report = UserImportService.import_file(upload, 'eleves.csv', batch_size=3, workers=1)
+
+        self.assertEqual(report.created, 6)
+        errors = {error['line']: error['errors'] for error in report.errors}
+        self.assertEqual(sorted(errors), [8, 9, 10, 11, 12])
+        self.assertEqual(errors[9], {'email': ['Un compte existe déjà avec cette adresse email.']})
+        self.assertIn('type', errors[11])
+        self.assertEqual(errors[12], {'institution_name': ['Ce champ est obligatoire.']})
+
+        pupil = User.objects.get(email='pupil3@example.com')
+        self.assertEqual(pupil.pupil_profile.current_level, '6e')
+        self.assertEqual(pupil.date_of_birth, date(2012, 9, 1))
+        self.assertFalse(pupil.is_active)
+        self.assertFalse(pupil.has_usable_password())
+        self.assertEqual(pupil.notifications.get().title, 'Bienvenue Élève3')
+
+        teacher = User.objects.get(email='teacher@example.com')
+        self.assertTrue(teacher.check_password('secret-pass'))
+        self.assertTrue(Teacher.objects.filter(user=teacher).exists())
+
+    def test_concurrent_registration_is_reported(self):
+        """
+        Test qu'une adresse enregistrée pendant l'import est signalée sans faire échouer le lot.
+        """
+        rows = ['email;first_name;last_name']
+        rows += [f'pupil{index}@example.com;Élève{index};Test' for index in range(3)]
+        upload = BytesIO('\n'.join(rows).encode('utf-8'))
+
+        def register_then_hash(passwords, pool=None):
+            User.objects.create_user(email='pupil1@example.com', first_name='Inscrit', last_name='Entre-temps')
+            return hash_passwords(passwords, pool)
+
+        with patch('apps.accounts.services.hash_passwords', side_effect=register_then_hash):
+            report = UserImportService.import_file(upload, 'eleves.csv', default_type='pupil', workers=1)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual([error['line'] for error in report.errors], [3])
+        self.assertTrue(User.objects.filter(email='pupil2@example.com').exists())
+
+        upload.seek(0)
+        with self.assertRaises(ValueError):
+            UserImportService.import_file(upload, 'eleves.csv', default_type='pupil', max_rows=2)
+
+    def test_import_xlsx_dry_run(self):
+        """
+        Test de la validation d'un fichier XLSX sans création de compte.
+        """
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['email', 'first_name', 'last_name', 'phone_number', 'student_id'])
+        sheet.append(['student1@example.com', 'Test', 'Student', 612345678, 'E-001'])
+        sheet.append(['student2@example.com', 'Test', None, None, None])
+        upload = BytesIO()
+        workbook.save(upload)
+        upload.seek(0)
+
+        report = UserImportService.import_file(
+            upload, 'etudiants.xlsx', default_type='student', defaults={'school_id': 4}, dry_run=True
+        )
+
+        self.assertEqual(report.as_dict()['created'], 1)
+        self.assertEqual(report.errors, [{'line': 3, 'email': 'student2@example.com', 'errors': {
+            'last_name': ['Ce champ est obligatoire.']
+        }}])
+        self.assertFalse(User.objects.filter(email='student1@example.com').exists())
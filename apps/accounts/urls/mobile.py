@@ -20,6 +20,8 @@ from ..views.mobile import (
     UserTypeListView,
     VerificationStatusView,
     UserListView,
+    UserImportView,
+    UserSearchView,
     PasswordResetRequestView,
     PasswordResetConfirmView,
 )
@@ -40,6 +42,8 @@ urlpatterns = [
     path('register/advisor/', AdvisorRegistrationView.as_view(), name='api_register_advisor'),
 
     path('users/', UserListView.as_view(), name='api_user_list'),
+    path('users/import/', UserImportView.as_view(), name='api_user_import'),
+    path('users/search/', UserSearchView.as_view(), name='api_user_search'),
     path('users/type/<str:user_type>/', UserTypeListView.as_view(), name='api_user_type_list'),
     path('users/profile/<int:pk>/', UserDetailAPIView.as_view(), name='api_user_detail'),
     
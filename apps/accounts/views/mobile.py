@@ -14,6 +14,7 @@ from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 
 from ..models import User, Student, Teacher, Advisor, Pupil
 from ..serializers.mobile import (
@@ -27,7 +28,10 @@ from ..permissions import (
     IsOwnerOrAdmin, IsAdministrator, IsVerified,
     IsStudent, IsTeacher, IsAdvisor, IsPupil
 )
-from ..services import AccountService
+from ..imports import WEB_IMPORT_MAX_ROWS
+from ..services import AccountService, UserImportService
+from ..search import TYPEAHEAD_LIMIT, rank_users, search_users
+from apps.analytics.instrumentation import query_budget
 
 
 
@@ -545,17 +549,85 @@ class UserListView(generics.ListAPIView):
         # Recherche par nom ou email
         search_query = self.request.query_params.get('search')
         if search_query:
-            queryset = queryset.filter(
-                first_name__icontains=search_query
-            ) | queryset.filter(
-                last_name__icontains=search_query
-            ) | queryset.filter(
-                email__icontains=search_query
-            )
+            queryset = search_users(queryset, search_query)
         
         return queryset
 
 
+@query_budget(4)
+class UserSearchView(APIView):
+    """
+    Vue API d'autocomplétion de l'annuaire des utilisateurs : meilleures
+    correspondances du paramètre « q » (préfixes de noms, fautes de frappe
+    tolérées sous PostgreSQL), classées par similarité.
+    """
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', TYPEAHEAD_LIMIT)), 1), 50)
+        except ValueError:
+            limit = TYPEAHEAD_LIMIT
+
+        queryset = User.objects.only('id', 'first_name', 'last_name', 'email', 'type',
+                                     'search_first_name', 'search_last_name', 'search_key')
+        user_type = request.query_params.get('type')
+        if user_type:
+            queryset = queryset.filter(type=user_type)
+
+        results = [
+            {
+                'id': user.id,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'email': user.email,
+                'type': user.type,
+                'score': round(score, 3),
+            }
+            for user, score in rank_users(queryset, query, limit)
+        ]
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class UserImportView(APIView):
+    """
+    Vue API pour importer en masse les comptes d'un établissement depuis un
+    fichier CSV ou XLSX (champ « file »), avec un rapport d'erreurs par ligne.
+
+    L'import s'exécute dans la requête, sans groupe de processus : il est
+    limité à USER_IMPORT_WEB_MAX_ROWS lignes, les fichiers plus grands
+    passant par la commande import_users.
+    """
+    permission_classes = [IsAdministrator]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': _("Aucun fichier fourni.")}, status=status.HTTP_400_BAD_REQUEST)
+
+        defaults = {}
+        school_id = request.data.get('school_id')
+        if school_id:
+            defaults['school_id'] = school_id
+
+        try:
+            report = UserImportService.import_file(
+                upload,
+                upload.name,
+                default_type=request.data.get('type') or None,
+                defaults=defaults,
+                dry_run=request.data.get('dry_run') in ('1', 'true', 'True'),
+                workers=1,
+                max_rows=getattr(settings, 'USER_IMPORT_WEB_MAX_ROWS', WEB_IMPORT_MAX_ROWS)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
 
 
 class PasswordResetRequestView(APIView):
@@ -742,8 +814,7 @@ class MarkNotificationAsReadView(APIView):
         
         try:
             notification = Notification.objects.get(id=notification_id, user=request.user)
-            notification.is_read = True
-            notification.save()
+            notification.mark_as_read()
             
             return Response(
                 {"message": _("Notification marquée comme lue.")},
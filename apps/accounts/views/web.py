@@ -13,7 +13,6 @@ from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.utils.translation import gettext as _
 from django.contrib.auth import authenticate, login
-from django.db.models import Q
 from django.http import HttpResponseRedirect
 
 from ..models import User, Student, Teacher, Advisor
@@ -28,6 +27,8 @@ from ..forms import (
     SetPasswordForm
 )
 from ..services import AccountService
+from ..search import search_users
+from apps.analytics.pagination import EstimatedCountPaginator
 from ..permissions import IsAdministratorMixin, AdminRequiredMixin
 
 
@@ -185,6 +186,7 @@ class UserListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'dashboard/pages/user_list.html'
     context_object_name = 'users'
     paginate_by = 10  # Pagination avec 10 utilisateurs par page
+    paginator_class = EstimatedCountPaginator
     
     def test_func(self):
         # Vérifie si l'utilisateur connecté est autorisé à voir cette page
@@ -202,11 +204,7 @@ class UserListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         
         # Appliquer la recherche si une requête est fournie
         if search_query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) | 
-                Q(last_name__icontains=search_query) | 
-                Q(email__icontains=search_query)
-            )
+            queryset = search_users(queryset, search_query)
         
         # Filtrer par type d'utilisateur si spécifié
         if user_type:
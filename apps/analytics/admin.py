@@ -3,7 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from .models import (
     UserActivity, Report, Dashboard, DashboardWidget,
-    Metric, MetricValue, AnalyticsEvent
+    Metric, MetricValue, AnalyticsEvent, AssessmentTypeStats, AssessmentQuestionStats
 )
 
 @admin.register(UserActivity)
@@ -298,4 +298,30 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
         return False
     
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+@admin.register(AssessmentTypeStats)
+class AssessmentTypeStatsAdmin(admin.ModelAdmin):
+    list_display = ('assessment_type', 'school_id', 'completed_count', 'passed_count', 'mean_score', 'updated_at')
+    list_filter = ('assessment_type',)
+    search_fields = ('assessment_type__name',)
+    readonly_fields = [field.name for field in AssessmentTypeStats._meta.fields]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(AssessmentQuestionStats)
+class AssessmentQuestionStatsAdmin(admin.ModelAdmin):
+    list_display = ('question', 'school_id', 'answered_count', 'correct_count', 'difficulty', 'updated_at')
+    list_filter = ('question__assessment_type',)
+    search_fields = ('question__text',)
+    readonly_fields = [field.name for field in AssessmentQuestionStats._meta.fields]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,109 @@
+"""
+Compression négociée des réponses (brotli ou gzip).
+
+CompressionMiddleware compresse les réponses textuelles (JSON, HTML, texte,
+JavaScript, XML) dépassant RESPONSE_COMPRESSION_MIN_SIZE octets, avec le
+meilleur encodage accepté par le client : brotli lorsque le module brotli est
+installé, gzip sinon. Les réponses en flux (téléchargements de fichiers,
+flux d'événements) et les fichiers statiques (servis précompressés par
+WhiteNoise) ne sont pas concernés.
+"""
+
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Taille minimale (octets) d'une réponse compressée
+MIN_SIZE = 1024
+
+# Qualité brotli : un bon compromis taux / temps pour des réponses dynamiques
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'application/xml',
+    'text/', 'image/svg+xml',
+)
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.I)
+
+
+def accepted_encodings(header):
+    """
+    Encodages acceptés par le client, avec leur poids (q).
+
+    Returns:
+        Dictionnaire {encodage: poids}
+    """
+    encodings = {}
+    for item in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(item)
+        if not match:
+            continue
+        try:
+            weight = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        encodings[match.group(1).lower()] = weight
+    return encodings
+
+
+def choose_encoding(header):
+    """Meilleur encodage disponible accepté par le client, ou None."""
+    encodings = accepted_encodings(header)
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    candidates = [
+        (encodings.get(encoding, encodings.get('*', 0)), -index, encoding)
+        for index, encoding in enumerate(available)
+    ]
+    weight, index, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    # compress_string ajoute des octets aléatoires au nom de fichier contre BREACH
+    return compress_string(content, max_random_bytes=100)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Middleware de compression brotli / gzip au-delà d'une taille minimale.
+    """
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', MIN_SIZE):
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # La représentation compressée n'est plus identique octet pour octet
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
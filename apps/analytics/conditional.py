@@ -0,0 +1,122 @@
+"""
+Réponses conditionnelles (ETag / 304) pour les vues API de consultation.
+
+Les catalogues que l'application mobile recharge à chaque lancement (villes,
+types d'établissement, établissements, catégories et ressources) changent
+rarement. Chaque modèle de VERSIONED_MODELS a un numéro de version conservé
+dans le cache partagé, incrémenté après validation de la transaction par les
+signaux de l'application (post_save, post_delete et m2m_changed).
+
+Les vues utilisant ConditionalResponseMixin calculent un ETag à partir de ces
+versions, de l'URL complète (chemin et paramètres) et de l'en-tête Accept,
+sans aucune requête SQL. Lorsque l'en-tête If-None-Match correspond, la vue
+répond 304 sans construire ni sérialiser le queryset.
+
+Les enregistrements ne modifiant que des compteurs (COUNTER_FIELDS) ne
+changent pas la version : ces valeurs peuvent rester en retard jusqu'à la
+modification suivante du modèle.
+"""
+
+import hashlib
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+# Modèles dont les modifications sont comptées
+VERSIONED_MODELS = (
+    'schools.School',
+    'schools.SchoolType',
+    'schools.City',
+    'schools.SchoolReview',
+    'resources.Resource',
+    'resources.ResourceCategory',
+)
+
+# Champs mis à jour à chaque consultation, sans effet sur la version
+COUNTER_FIELDS = {
+    'resources.Resource': frozenset({'view_count', 'download_count', 'like_count'}),
+}
+
+
+def versioned_models():
+    """Renvoie les modèles enregistrés dans VERSIONED_MODELS."""
+    return [apps.get_model(label) for label in VERSIONED_MODELS]
+
+
+def _version_key(label):
+    return f'model_version:{label}'
+
+
+def model_versions(labels):
+    """
+    Versions courantes des modèles indiqués, en un seul aller-retour vers le
+    cache. Une version absente (premier accès, éviction) est initialisée à
+    partir de l'horloge, pour ne jamais redonner un ETag déjà émis.
+
+    Returns:
+        Dictionnaire {label: version}
+    """
+    keys = {_version_key(label): label for label in labels}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    for key, label in keys.items():
+        if label not in versions:
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[label] = version
+    return versions
+
+
+def bump_model_versions(labels):
+    """
+    Rend obsolètes les ETag dépendant des modèles indiqués.
+    Gestionnaire d'effets de bord (voir apps.analytics.side_effects).
+    """
+    for label in set(labels):
+        try:
+            cache.incr(_version_key(label))
+        except ValueError:
+            # Version absente : la prochaine lecture en initialise une nouvelle
+            pass
+
+
+class ConditionalResponseMixin:
+    """
+    Mixin pour les vues DRF en lecture : ETag calculé à partir des versions de
+    `version_models`, réponse 304 sans sérialisation si le client possède déjà
+    la représentation, et en-tête Cache-Control défini par `cache_control`
+    (mêmes arguments que django.utils.cache.patch_cache_control).
+
+    L'ETag est faible : la représentation est équivalente, pas forcément
+    identique octet pour octet (compression, ordre des clés).
+    """
+    version_models = ()
+    cache_control = {'private': True, 'no_cache': True}
+
+    def get_validator_parts(self):
+        """Éléments dont dépend la représentation renvoyée."""
+        request = self.request
+        versions = model_versions(self.version_models)
+        return [
+            request.get_host(),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ] + [f'{label}:{versions[label]}' for label in self.version_models]
+
+    def get_etag(self):
+        validator = '|'.join(str(part) for part in self.get_validator_parts())
+        return 'W/"%s"' % hashlib.md5(validator.encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, **self.cache_control)
+            patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+        return response
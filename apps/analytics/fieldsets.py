@@ -0,0 +1,104 @@
+"""
+Champs à la demande pour les sérialiseurs de l'API mobile.
+
+Sans paramètre, une réponse contient tous les champs du sérialiseur. Pour une
+requête de lecture (GET), le client peut restreindre la représentation :
+
+- ?fields=id,title,slug : ne renvoie que ces champs ;
+- ?expand=reviews,comments : ajoute les relations imbriquées indiquées.
+
+Dès que l'un des deux paramètres est présent, les champs listés dans
+Meta.expandable_fields (relations imbriquées, champs calculés coûteux) ne
+sont renvoyés que s'ils sont demandés. Un champ retiré n'est jamais calculé.
+
+Les jointures et préchargements nécessaires à chaque champ sont déclarés dans
+Meta.select_related_fields et Meta.prefetch_related_fields ;
+SparseFieldsetViewMixin ne les applique au queryset de la vue que pour les
+champs effectivement renvoyés.
+"""
+
+from django.db.models import QuerySet
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def parse_names(value):
+    """Noms d'une liste séparée par des virgules (« a, b,c »)."""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def requested_fields(request):
+    """
+    Champs demandés par une requête de lecture.
+
+    Returns:
+        Tuple (champs de ?fields= ou None, champs de ?expand=), ou None si la
+        représentation complète est demandée
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+    fields = parse_names(params.get('fields')) if 'fields' in params else None
+    return fields, parse_names(params.get('expand'))
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin pour les sérialiseurs : retire les champs non demandés par
+    ?fields= et les champs de Meta.expandable_fields absents de ?expand=.
+
+    Seul le sérialiseur racine (ou l'enfant d'une liste) lit la requête : les
+    sérialiseurs imbriqués renvoient toujours leur représentation complète.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self._context.get('request'))
+        if requested is None:
+            return
+
+        fields, expand = requested
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        if fields is None:
+            kept = (set(self.fields) - expandable) | expand
+        else:
+            kept = fields | expand
+        for name in set(self.fields) - kept:
+            self.fields.pop(name)
+
+    @classmethod
+    def optimize_queryset(cls, queryset, context):
+        """
+        Applique au queryset les jointures et préchargements des seuls champs
+        renvoyés pour cette requête.
+        """
+        meta = cls.Meta
+        select_related_fields = getattr(meta, 'select_related_fields', {})
+        prefetch_related_fields = getattr(meta, 'prefetch_related_fields', {})
+
+        select_related, prefetch_related = [], []
+        for name in cls(context=context).fields:
+            select_related.extend(select_related_fields.get(name, ()))
+            for lookup in prefetch_related_fields.get(name, ()):
+                if lookup not in prefetch_related:
+                    prefetch_related.append(lookup)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class SparseFieldsetViewMixin:
+    """
+    Mixin pour les vues génériques DRF : adapte le queryset aux champs
+    demandés lorsque le sérialiseur utilise SparseFieldsetMixin.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if isinstance(queryset, QuerySet) and issubclass(serializer_class, SparseFieldsetMixin):
+            queryset = serializer_class.optimize_queryset(queryset, self.get_serializer_context())
+        return queryset
@@ -0,0 +1,285 @@
+"""
+Instrumentation des requêtes : requêtes SQL, temps SQL et Python, taille des réponses.
+
+RequestInstrumentationMiddleware mesure chaque requête synchrone et :
+- ajoute un en-tête Server-Timing (lisible dans les outils du navigateur),
+  uniquement en mode DEBUG ou pour les membres du personnel ;
+- agrège les mesures par route dans le processus (voir PerformanceMetricsAPIView) ;
+- repère les requêtes SQL répétées, signature habituelle d'un problème N+1 :
+  même texte paramétré, ou même texte aux valeurs littérales près (cette
+  normalisation n'est faite qu'en mode DEBUG, en cas de dépassement de budget
+  et à la consultation des mesures) ;
+- vérifie le budget de requêtes déclaré sur la vue avec @query_budget.
+
+Un dépassement de budget est journalisé ; il lève une exception lorsque le
+paramètre QUERY_BUDGETS_ENFORCE est actif, ce que les tests obtiennent avec le
+décorateur enforce_query_budgets.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+
+# Nombre de signatures de requêtes répétées conservées par route
+TOP_DUPLICATES = 5
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Une vue a exécuté plus de requêtes SQL que son budget."""
+
+
+def query_budget(max_queries):
+    """
+    Déclare le nombre maximal de requêtes SQL d'une vue (fonction, vue
+    générique ou ViewSet). La vue est renvoyée inchangée.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def enforce_query_budgets(test_item):
+    """
+    Décorateur de test (classe ou méthode) : tout dépassement de budget fait
+    échouer le test.
+    """
+    return override_settings(QUERY_BUDGETS_ENFORCE=True)(test_item)
+
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def normalize(sql):
+    """Texte SQL sans ses valeurs littérales : `id = 3` et `id = 4` se confondent."""
+    return LITERAL_RE.sub('?', sql)
+
+
+def fingerprint(sql):
+    """Signature courte d'un texte SQL normalisé."""
+    return hashlib.md5(normalize(sql).encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def duplicate_queries(queries, limit=TOP_DUPLICATES, normalized=True):
+    """
+    Requêtes dont le même texte SQL a été exécuté plusieurs fois.
+
+    Args:
+        normalized: Confondre les textes aux valeurs littérales près
+
+    Returns:
+        Liste de tuples (nombre d'exécutions, texte SQL), les plus fréquentes d'abord
+    """
+    counts = Counter(normalize(sql) for sql in queries) if normalized else Counter(queries)
+    return [(count, sql) for sql, count in counts.most_common(limit) if count > 1]
+
+
+class QueryRecorder:
+    """
+    Enveloppe d'exécution SQL (connection.execute_wrapper) mesurant chaque requête.
+    """
+    def __init__(self):
+        self.statements = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.statements.append(sql)
+
+
+class MetricsRegistry:
+    """
+    Agrégats des mesures par route, propres au processus.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, queries, sql_time, python_time, size, duplicates):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'requests': 0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'sql_time': 0.0,
+                    'python_time': 0.0,
+                    'max_time': 0.0,
+                    'bytes': 0,
+                    'duplicates': Counter(),
+                }
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['sql_time'] += sql_time
+            stats['python_time'] += python_time
+            stats['max_time'] = max(stats['max_time'], sql_time + python_time)
+            stats['bytes'] += size or 0
+            for count, sql in duplicates:
+                stats['duplicates'][sql] += count
+
+    def snapshot(self):
+        """
+        Mesures agrégées, routes les plus coûteuses (temps total) en premier.
+        Les durées sont exprimées en millisecondes.
+        """
+        with self._lock:
+            routes = [(route, dict(stats, duplicates=stats['duplicates'].copy())) for route, stats in self._routes.items()]
+
+        result = []
+        for route, stats in routes:
+            requests = stats['requests']
+            result.append({
+                'route': route,
+                'requests': requests,
+                'avg_queries': round(stats['queries'] / requests, 1),
+                'max_queries': stats['max_queries'],
+                'avg_sql_ms': round(stats['sql_time'] * 1000 / requests, 2),
+                'avg_python_ms': round(stats['python_time'] * 1000 / requests, 2),
+                'max_total_ms': round(stats['max_time'] * 1000, 2),
+                'avg_bytes': stats['bytes'] // requests,
+                'duplicate_queries': [
+                    {'fingerprint': fingerprint(sql), 'count': count, 'sql': normalize(sql)}
+                    for sql, count in stats['duplicates'].most_common(TOP_DUPLICATES)
+                ],
+                'total_ms': round((stats['sql_time'] + stats['python_time']) * 1000, 2),
+            })
+        result.sort(key=lambda route: route['total_ms'], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def get_route(request):
+    """Identifiant de route agrégé : méthode et motif d'URL (sans les identifiants)."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <non résolue>'
+    return f'{request.method} /{match.route}'
+
+
+def shows_server_timing(request):
+    """L'en-tête Server-Timing n'est envoyé qu'en DEBUG ou aux membres du personnel."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_staff)
+
+
+def get_view_budget(request):
+    """Budget de requêtes déclaré sur la vue résolue, ou None."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    func = match.func
+    for candidate in (func, getattr(func, 'view_class', None), getattr(func, 'cls', None)):
+        budget = getattr(candidate, 'query_budget', None)
+        if budget is not None:
+            return budget
+    return None
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Mesure les requêtes SQL et le temps de traitement de chaque requête HTTP.
+
+    Les requêtes traitées en mode asynchrone (flux SSE) ne sont pas mesurées.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.get_response(request)
+
+        if not getattr(settings, 'REQUEST_INSTRUMENTATION', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        python_time = max(total - recorder.duration, 0.0)
+        queries = len(recorder.statements)
+        budget = get_view_budget(request)
+        exceeded = budget is not None and queries > budget
+        # Normalisation des textes SQL seulement lorsqu'elle sert un diagnostic
+        duplicates = duplicate_queries(recorder.statements, normalized=exceeded or settings.DEBUG)
+        size = None if response.streaming else len(response.content)
+
+        if shows_server_timing(request):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={recorder.duration * 1000:.1f};desc="{queries} SQL"',
+                f'app;dur={python_time * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+
+        route = get_route(request)
+        metrics.record(route, queries, recorder.duration, python_time, size, duplicates)
+
+        if exceeded:
+            message = f"{route} : {queries} requêtes SQL pour un budget de {budget}"
+            if duplicates:
+                message += '. Requêtes répétées : ' + '; '.join(f'{count}x {sql}' for count, sql in duplicates)
+            if getattr(settings, 'QUERY_BUDGETS_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+
+class QueryBudgetMixin:
+    """
+    Mixin de TestCase : assertMaxQueries vérifie une borne supérieure du nombre
+    de requêtes SQL et affiche les requêtes répétées en cas d'échec.
+    """
+    def assertMaxQueries(self, max_queries, using='default'):
+        return _AssertMaxQueriesContext(self, max_queries, using)
+
+
+class _AssertMaxQueriesContext(CaptureQueriesContext):
+    def __init__(self, test_case, max_queries, using):
+        self.test_case = test_case
+        self.max_queries = max_queries
+        super().__init__(connections[using])
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        statements = [query['sql'] for query in self.captured_queries]
+        if len(statements) > self.max_queries:
+            details = '\n'.join(f'{count}x {sql}' for count, sql in duplicate_queries(statements))
+            self.test_case.fail(
+                f"{len(statements)} requêtes SQL exécutées pour un budget de {self.max_queries}"
+                + (f"\nRequêtes répétées :\n{details}" if details else '')
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.services import AssessmentAnalyticsService
+
+
+class Command(BaseCommand):
+    """
+    Recalcule les agrégats d'évaluation depuis les évaluations terminées.
+    """
+    help = "Reconstruit les statistiques précalculées des évaluations (distributions, taux de réussite, difficulté)."
+
+    def handle(self, *args, **options):
+        count = AssessmentAnalyticsService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Statistiques reconstruites à partir de {count} évaluation(s) terminée(s)."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-19 02:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('orientation', '0002_assessmenttype_question_set_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentQuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_id', models.PositiveIntegerField(default=0, help_text='0 pour tous les établissements', verbose_name="ID de l'école")),
+                ('answered_count', models.PositiveIntegerField(default=0, verbose_name='réponses')),
+                ('correct_count', models.PositiveIntegerField(default=0, verbose_name='réponses correctes')),
+                ('value_count', models.PositiveIntegerField(default=0, verbose_name='valeurs numériques')),
+                ('value_sum', models.FloatField(default=0, verbose_name='somme des valeurs')),
+                ('option_counts', models.JSONField(blank=True, default=dict, verbose_name='sélections par option')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='mis à jour le')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='orientation.assessmentquestion', verbose_name='question')),
+            ],
+            options={
+                'verbose_name': 'statistiques de question',
+                'verbose_name_plural': 'statistiques de questions',
+                'unique_together': {('question', 'school_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AssessmentTypeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_id', models.PositiveIntegerField(default=0, help_text='0 pour tous les établissements', verbose_name="ID de l'école")),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='évaluations terminées')),
+                ('passed_count', models.PositiveIntegerField(default=0, verbose_name='évaluations réussies')),
+                ('score_sum', models.PositiveBigIntegerField(default=0, verbose_name='somme des scores')),
+                ('score_squares_sum', models.PositiveBigIntegerField(default=0, verbose_name='somme des carrés des scores')),
+                ('time_spent_sum', models.PositiveBigIntegerField(default=0, verbose_name='temps passé cumulé (secondes)')),
+                ('score_histogram', models.JSONField(blank=True, default=list, verbose_name='distribution des scores')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='mis à jour le')),
+                ('assessment_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='orientation.assessmenttype', verbose_name="type d'évaluation")),
+            ],
+            options={
+                'verbose_name': "statistiques de type d'évaluation",
+                'verbose_name_plural': "statistiques de types d'évaluation",
+                'unique_together': {('assessment_type', 'school_id')},
+            },
+        ),
+    ]
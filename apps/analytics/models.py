@@ -491,4 +491,119 @@ class AnalyticsEvent(models.Model):
             ip = x_forwarded_for.split(',')[0]
         else:
             ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        return ip
+
+class AssessmentTypeStats(models.Model):
+    """
+    Agrégats précalculés des évaluations terminées d'un type d'évaluation,
+    pour l'ensemble des établissements (school_id = 0) ou pour un établissement.
+    Mis à jour de façon incrémentale à chaque évaluation terminée.
+    """
+    HISTOGRAM_BUCKETS = 10
+    
+    assessment_type = models.ForeignKey(
+        'orientation.AssessmentType',
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name=_('type d\'évaluation')
+    )
+    school_id = models.PositiveIntegerField(_('ID de l\'école'), default=0,
+                                            help_text=_('0 pour tous les établissements'))
+    
+    completed_count = models.PositiveIntegerField(_('évaluations terminées'), default=0)
+    passed_count = models.PositiveIntegerField(_('évaluations réussies'), default=0)
+    score_sum = models.PositiveBigIntegerField(_('somme des scores'), default=0)
+    score_squares_sum = models.PositiveBigIntegerField(_('somme des carrés des scores'), default=0)
+    time_spent_sum = models.PositiveBigIntegerField(_('temps passé cumulé (secondes)'), default=0)
+    
+    # Répartition des scores par tranches de 10 % du score maximal
+    score_histogram = models.JSONField(_('distribution des scores'), default=list, blank=True)
+    
+    updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('statistiques de type d\'évaluation')
+        verbose_name_plural = _('statistiques de types d\'évaluation')
+        unique_together = ('assessment_type', 'school_id')
+    
+    def __str__(self):
+        return f"{self.assessment_type_id} / école {self.school_id} ({self.completed_count})"
+    
+    @property
+    def mean_score(self):
+        if not self.completed_count:
+            return None
+        return self.score_sum / self.completed_count
+    
+    @property
+    def score_stddev(self):
+        if not self.completed_count:
+            return None
+        mean = self.score_sum / self.completed_count
+        return max(self.score_squares_sum / self.completed_count - mean ** 2, 0) ** 0.5
+    
+    @property
+    def pass_rate(self):
+        if not self.completed_count:
+            return None
+        return self.passed_count / self.completed_count
+    
+    @property
+    def average_time_spent(self):
+        if not self.completed_count:
+            return None
+        return self.time_spent_sum / self.completed_count
+
+
+class AssessmentQuestionStats(models.Model):
+    """
+    Agrégats précalculés des réponses à une question d'évaluation,
+    pour l'ensemble des établissements (school_id = 0) ou pour un établissement.
+    """
+    question = models.ForeignKey(
+        'orientation.AssessmentQuestion',
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name=_('question')
+    )
+    school_id = models.PositiveIntegerField(_('ID de l\'école'), default=0,
+                                            help_text=_('0 pour tous les établissements'))
+    
+    answered_count = models.PositiveIntegerField(_('réponses'), default=0)
+    correct_count = models.PositiveIntegerField(_('réponses correctes'), default=0)
+    
+    # Questions numériques et échelles
+    value_count = models.PositiveIntegerField(_('valeurs numériques'), default=0)
+    value_sum = models.FloatField(_('somme des valeurs'), default=0)
+    
+    # Nombre de sélections par option (questions à choix et échelles)
+    option_counts = models.JSONField(_('sélections par option'), default=dict, blank=True)
+    
+    updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('statistiques de question')
+        verbose_name_plural = _('statistiques de questions')
+        unique_together = ('question', 'school_id')
+    
+    def __str__(self):
+        return f"{self.question_id} / école {self.school_id} ({self.answered_count})"
+    
+    @property
+    def correct_rate(self):
+        if not self.answered_count:
+            return None
+        return self.correct_count / self.answered_count
+    
+    @property
+    def difficulty(self):
+        """Indice de difficulté : part des réponses incorrectes."""
+        if not self.answered_count:
+            return None
+        return 1 - self.correct_count / self.answered_count
+    
+    @property
+    def mean_value(self):
+        if not self.value_count:
+            return None
+        return self.value_sum / self.value_count
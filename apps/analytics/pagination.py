@@ -0,0 +1,210 @@
+"""
+Pagination sans COUNT(*) exact sur les grandes tables.
+
+Un paginateur classique compte toutes les lignes filtrées à chaque page ; sur
+les tables d'activités ou de notifications, ce comptage coûte plus cher que la
+page elle-même. Ce module propose :
+
+- estimated_count() : sous PostgreSQL, l'estimation du planificateur
+  (pg_class.reltuples sans filtre, EXPLAIN sinon) est utilisée au-delà de
+  PAGINATION_ESTIMATE_THRESHOLD lignes ; en deçà, le nombre exact est calculé
+  et mis en cache quelques instants par empreinte de requête SQL ;
+- EstimatedCountPaginator / UncountedPaginator : paginateurs Django
+  (attribut paginator_class des ListView) ;
+- EstimatedCountPagination, EstimatedLimitOffsetPagination et
+  CursorResultsSetPagination : classes de pagination DRF, la dernière ne
+  comptant jamais les lignes.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination, PageNumberPagination
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de ce nombre de lignes estimées, l'estimation remplace le comptage
+ESTIMATE_THRESHOLD = 100000
+
+# Nombre exact mis en cache à partir de ce nombre de lignes, pour cette durée (secondes)
+COUNT_CACHE_MIN = 1000
+COUNT_CACHE_TIMEOUT = 60
+
+
+def count_cache_key(queryset):
+    """Clé de cache du nombre de lignes : empreinte du SQL et de ses paramètres."""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode(), usedforsecurity=False).hexdigest()
+    return f'pagination:count:{digest}'
+
+
+def planner_estimate(queryset):
+    """
+    Nombre de lignes estimé par le planificateur PostgreSQL, ou None (autre
+    base, table jamais analysée ou échec de l'EXPLAIN).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    query = queryset.query
+    if not query.where and not query.distinct and len(query.alias_map) <= 1:
+        # Table entière : statistique tenue à jour par ANALYZE / autovacuum
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return int(row[0])
+
+    try:
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Estimation du nombre de lignes impossible: {str(e)}")
+        return None
+
+
+def estimated_count(queryset):
+    """
+    Nombre de lignes d'un queryset, estimé lorsqu'il est grand.
+
+    Returns:
+        Tuple (nombre de lignes, True s'il s'agit d'une estimation)
+    """
+    queryset = queryset.order_by()
+    try:
+        key = count_cache_key(queryset)
+    except EmptyResultSet:
+        return 0, False
+
+    count = cache.get(key)
+    if count is not None:
+        return count, False
+
+    estimate = planner_estimate(queryset)
+    if estimate is not None and estimate >= getattr(settings, 'PAGINATION_ESTIMATE_THRESHOLD', ESTIMATE_THRESHOLD):
+        return estimate, True
+
+    count = queryset.count()
+    if count >= getattr(settings, 'PAGINATION_COUNT_CACHE_MIN', COUNT_CACHE_MIN):
+        cache.set(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', COUNT_CACHE_TIMEOUT))
+    return count, False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginateur Django dont le nombre de lignes provient de estimated_count().
+
+    Lorsque le nombre est estimé, les pages au-delà de la dernière page
+    estimée restent accessibles (éventuellement vides).
+    """
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.count_is_estimate = estimated_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_estimate and int(number) > 1:
+                return int(number)
+            raise
+
+
+class UncountedPaginator(Paginator):
+    """
+    Paginateur Django qui ne compte jamais les lignes : une ligne de plus que
+    la page est lue pour savoir s'il existe une page suivante. Le nombre de
+    pages et de lignes n'est connu qu'au-delà de la page courante.
+    """
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage(_("That page contains no results"))
+
+        # Bornes connues à partir de la page lue
+        self.__dict__['count'] = bottom + len(rows) + has_more
+        self.__dict__['num_pages'] = number + has_more
+        return Page(rows, number, self)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Pagination DRF par numéro de page, avec nombre de lignes estimé sur les
+    grandes tables (count_is_estimate).
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_estimate', self.page.paginator.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class EstimatedLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Pagination DRF par limite et décalage, avec nombre de lignes estimé.
+    """
+    max_limit = 100
+    count_is_estimate = False
+
+    def get_count(self, queryset):
+        if not isinstance(queryset, QuerySet):
+            return super().get_count(queryset)
+        count, self.count_is_estimate = estimated_count(queryset)
+        return count
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_estimate', self.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class CursorResultsSetPagination(CursorPagination):
+    """
+    Pagination DRF par curseur, sans aucun comptage : adaptée aux journaux
+    (activités, événements) parcourus du plus récent au plus ancien. L'ordre
+    est celui de l'attribut « ordering » de la vue, sinon la date de création.
+    """
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,88 @@
+"""
+Rendu JSON des réponses de l'API.
+
+FastJSONRenderer produit un JSON compact avec orjson lorsqu'il est installé
+(plusieurs fois plus rapide que le module json), et avec l'encodeur de DRF
+sinon. L'indentation n'est produite que sur demande : paramètre ?pretty=1,
+paramètre indent du type de média accepté, ou API navigable (qui utilise
+PrettyJSONRenderer).
+"""
+
+import json
+
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRETTY_INDENT = 4
+
+PRETTY_VALUES = ('1', 'true', 'yes')
+
+
+def wants_pretty(renderer_context):
+    """Indique si la requête demande un JSON indenté (?pretty=1)."""
+    request = (renderer_context or {}).get('request')
+    if request is None:
+        return False
+    return request.query_params.get('pretty', '').lower() in PRETTY_VALUES
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Rendu JSON compact, accéléré par orjson lorsqu'il est disponible.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if wants_pretty(renderer_context):
+            renderer_context = dict(renderer_context, indent=PRETTY_INDENT)
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=JSONEncoder().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        # Comme JSONRenderer : ces séparateurs sont valides en JSON mais pas en JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class PrettyJSONRenderer(JSONRenderer):
+    """
+    Rendu JSON avec indentation pour une meilleure lisibilité.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(
+            data,
+            cls=self.encoder_class,
+            indent=PRETTY_INDENT,
+            ensure_ascii=False,
+            sort_keys=True
+        ).encode('utf-8')
+
+
+class CustomBrowsableAPIRenderer(BrowsableAPIRenderer):
+    """
+    Rendu d'API navigable personnalisé.
+    """
+    def get_default_renderer(self, view):
+        # Utiliser le rendu JSON indenté dans l'API navigable
+        return PrettyJSONRenderer()
+
+    def get_context(self, data, accepted_media_type, renderer_context):
+        context = super().get_context(data, accepted_media_type, renderer_context)
+
+        # Personnaliser le contexte si nécessaire
+        context['brand_name'] = 'Plateforme Éducative'
+        context['api_name'] = 'API de la Plateforme Éducative'
+
+        return context
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from calendar import monthrange
 from collections import defaultdict
 
+from django.db import transaction
 from django.db.models import Count, Sum, Avg, F, Q, DateTimeField
 from django.db.models.functions import TruncDate, TruncMonth, TruncWeek, TruncDay, TruncHour
 from django.utils import timezone
@@ -20,9 +21,13 @@ from openpyxl.utils import get_column_letter
 from apps.accounts.models import User, Student, Teacher, Advisor
 from apps.appointments.models import Appointment
 from apps.resources.models import Resource, ResourceReview
-from apps.orientation.models import Assessment, OrientationPath
+from apps.orientation.models import Assessment, AssessmentAnswer, AssessmentType, OrientationPath
+from apps.orientation.question_sets import get_question_set
 
-from .models import MetricValue, Report, DashboardWidget, Metric, UserActivity, AnalyticsEvent
+from .models import (
+    MetricValue, Report, DashboardWidget, Metric, UserActivity, AnalyticsEvent,
+    AssessmentTypeStats, AssessmentQuestionStats
+)
 
 class MetricService:
     """
@@ -1256,6 +1261,41 @@ class ReportService:
                 'parameters': parameters
             }
         
+        elif parameters.get('group_by') == 'score_distribution':
+            # Agrégats précalculés : indépendants de la période du rapport
+            by_type = AssessmentAnalyticsService.get_type_stats(
+                assessment_type_id, parameters.get('school_id')
+            )
+            
+            return {
+                'title': "Rapport de distribution des scores par type d'évaluation",
+                'description': "Taux de réussite, score moyen et distribution des scores (toutes périodes)",
+                'data': by_type,
+                'total': sum(item['completed_count'] for item in by_type),
+                'columns': ['assessment_type_name', 'completed_count', 'passed_count', 'pass_rate', 'mean_score', 'score_stddev', 'score_histogram'],
+                'column_names': ["Type d'évaluation", "Terminées", "Réussies", "Taux de réussite", "Score moyen", "Écart type", "Distribution"],
+                'start_date': start_date,
+                'end_date': end_date,
+                'parameters': parameters
+            }
+        
+        elif parameters.get('group_by') == 'question_difficulty' and assessment_type_id:
+            by_question = AssessmentAnalyticsService.get_question_stats(
+                assessment_type_id, parameters.get('school_id')
+            )
+            
+            return {
+                'title': "Rapport de difficulté des questions",
+                'description': "Taux de bonnes réponses et répartition des réponses par question (toutes périodes)",
+                'data': by_question,
+                'total': len(by_question),
+                'columns': ['question_id', 'question_text', 'answered_count', 'correct_rate', 'difficulty', 'mean_value', 'option_counts'],
+                'column_names': ["ID", "Question", "Réponses", "Taux de bonnes réponses", "Difficulté", "Valeur moyenne", "Réponses par option"],
+                'start_date': start_date,
+                'end_date': end_date,
+                'parameters': parameters
+            }
+        
         elif parameters.get('group_by') == 'day':
             # Tronquer les dates par jour
             by_day = assessments.annotate(
@@ -1893,8 +1933,277 @@ class StatsService:
             'total_paths': total_paths,
             'new_paths': new_paths,
             'assessments_by_day': assessments_by_day,
+            'assessment_type_stats': AssessmentAnalyticsService.get_type_stats(),
             'start_date': start_date,
             'end_date': end_date
         }
+
+
+class AssessmentAnalyticsService:
+    """
+    Service pour les agrégats de résultats d'évaluation (distributions de scores,
+    taux de réussite, difficulté des questions) par type d'évaluation et par école.
+    
+    Les agrégats sont mis à jour de façon incrémentale à chaque évaluation terminée ;
+    les tableaux de bord et rapports les lisent sans parcourir les réponses.
+    """
+    
+    @staticmethod
+    def get_school_id(student_id):
+        """
+        Retourne l'identifiant d'école de l'étudiant, ou None.
+        """
+        return Student.objects.filter(user_id=student_id).values_list('school_id', flat=True).first()
+    
+    @staticmethod
+    def get_scopes(school_id):
+        """
+        Retourne les portées d'agrégation : tous établissements (0) et l'école éventuelle.
+        """
+        return [0, school_id] if school_id else [0]
+    
+    @staticmethod
+    def accumulate_assessment(stats, assessment):
+        """
+        Ajoute une évaluation terminée aux agrégats de son type.
+        """
+        score = assessment.score or 0
+        max_score = assessment.assessment_type.max_score or 1
+        
+        histogram = list(stats.score_histogram) or [0] * AssessmentTypeStats.HISTOGRAM_BUCKETS
+        bucket = min(int(score * len(histogram) / max_score), len(histogram) - 1)
+        histogram[bucket] += 1
+        
+        stats.score_histogram = histogram
+        stats.completed_count += 1
+        stats.score_sum += score
+        stats.score_squares_sum += score * score
+        stats.time_spent_sum += assessment.time_spent_seconds or 0
+        if assessment.is_passed():
+            stats.passed_count += 1
+    
+    @staticmethod
+    def accumulate_answer(stats, question, answer_data):
+        """
+        Ajoute une réponse aux agrégats de sa question (question compilée).
+        """
+        stats.answered_count += 1
+        if question.is_correct(answer_data):
+            stats.correct_count += 1
+        
+        selected = []
+        if question.question_type == 'single_choice':
+            selected = [answer_data.get('selected_option')]
+        elif question.question_type == 'multiple_choice':
+            selected = answer_data.get('selected_options', [])
+        elif question.question_type == 'scale':
+            selected = [answer_data.get('value')]
+        
+        if selected:
+            option_counts = dict(stats.option_counts)
+            for option in selected:
+                if option is not None:
+                    option_counts[str(option)] = option_counts.get(str(option), 0) + 1
+            stats.option_counts = option_counts
+        
+        if question.question_type in ['numeric', 'scale']:
+            value = answer_data.get('value')
+            if isinstance(value, (int, float)):
+                stats.value_count += 1
+                stats.value_sum += value
+    
+    @classmethod
+    def record_completion(cls, assessment):
+        """
+        Met à jour les agrégats avec une évaluation qui vient d'être terminée.
+        
+        Le coût ne dépend que du nombre de réponses de cette évaluation : les lignes
+        d'agrégats concernées sont verrouillées, mises à jour en mémoire puis
+        enregistrées en une seule requête par modèle.
+        
+        Le type d'évaluation est verrouillé d'abord pour attendre une reconstruction
+        en cours, et le marqueur stats_recorded garantit qu'une évaluation déjà
+        comptée (par une reconstruction ou un appel précédent) ne l'est pas deux fois.
+        """
+        if assessment.status != 'completed':
+            return
+        
+        scopes = cls.get_scopes(cls.get_school_id(assessment.student_id))
+        question_set = get_question_set(assessment.assessment_type)
+        answers = [
+            (question_set.get(question_id), answer_data)
+            for question_id, answer_data in AssessmentAnswer.objects.filter(
+                assessment=assessment
+            ).values_list('question_id', 'answer_data')
+        ]
+        answers = [(question, answer_data) for question, answer_data in answers if question is not None]
+        question_ids = [question.id for question, answer_data in answers]
+        
+        with transaction.atomic():
+            list(AssessmentType.objects.select_for_update().filter(
+                pk=assessment.assessment_type_id
+            ).values_list('pk', flat=True))
+            if not Assessment.objects.filter(pk=assessment.pk, stats_recorded=False).update(stats_recorded=True):
+                return
+            assessment.stats_recorded = True
+            
+            AssessmentTypeStats.objects.bulk_create([
+                AssessmentTypeStats(assessment_type_id=assessment.assessment_type_id, school_id=school_id)
+                for school_id in scopes
+            ], ignore_conflicts=True)
+            
+            type_stats = list(AssessmentTypeStats.objects.select_for_update().filter(
+                assessment_type_id=assessment.assessment_type_id,
+                school_id__in=scopes
+            ))
+            for stats in type_stats:
+                cls.accumulate_assessment(stats, assessment)
+                stats.updated_at = timezone.now()
+            AssessmentTypeStats.objects.bulk_update(type_stats, [
+                'completed_count', 'passed_count', 'score_sum', 'score_squares_sum',
+                'time_spent_sum', 'score_histogram', 'updated_at'
+            ])
+            
+            if not answers:
+                return
+            
+            AssessmentQuestionStats.objects.bulk_create([
+                AssessmentQuestionStats(question_id=question_id, school_id=school_id)
+                for question_id in question_ids
+                for school_id in scopes
+            ], ignore_conflicts=True)
+            
+            question_stats = {
+                (stats.question_id, stats.school_id): stats
+                for stats in AssessmentQuestionStats.objects.select_for_update().filter(
+                    question_id__in=question_ids,
+                    school_id__in=scopes
+                )
+            }
+            for question, answer_data in answers:
+                for school_id in scopes:
+                    cls.accumulate_answer(question_stats[(question.id, school_id)], question, answer_data)
+            
+            cls._save_question_stats(question_stats.values(), update=True)
+    
+    @staticmethod
+    def _save_question_stats(stats, update=False):
+        stats = list(stats)
+        for item in stats:
+            item.updated_at = timezone.now()
+        if update:
+            AssessmentQuestionStats.objects.bulk_update(stats, [
+                'answered_count', 'correct_count', 'value_count', 'value_sum',
+                'option_counts', 'updated_at'
+            ], batch_size=500)
+        else:
+            AssessmentQuestionStats.objects.bulk_create(stats, batch_size=500)
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recalcule tous les agrégats depuis les évaluations terminées, en une passe.
+        
+        Tout se fait dans une transaction qui verrouille d'abord les types d'évaluation :
+        les mises à jour incrémentales (record_completion) attendent la fin de la
+        reconstruction. Les réponses ne sont lues que pour les évaluations de la
+        première passe, qui sont marquées comme comptées ; une évaluation terminée
+        entre-temps sera ajoutée par son propre record_completion.
+        
+        Returns:
+            Nombre d'évaluations prises en compte
+        """
+        schools = dict(Student.objects.exclude(school_id=None).values_list('user_id', 'school_id'))
+        type_stats = {}
+        question_stats = {}
+        scopes_by_assessment = {}
+        
+        with transaction.atomic():
+            list(AssessmentType.objects.select_for_update().order_by('pk').values_list('pk', flat=True))
+            
+            assessments = Assessment.objects.filter(status='completed').select_related('assessment_type')
+            for assessment in assessments.iterator(chunk_size=2000):
+                scopes = cls.get_scopes(schools.get(assessment.student_id))
+                scopes_by_assessment[assessment.id] = (assessment.assessment_type, scopes)
+                for school_id in scopes:
+                    key = (assessment.assessment_type_id, school_id)
+                    if key not in type_stats:
+                        type_stats[key] = AssessmentTypeStats(
+                            assessment_type_id=assessment.assessment_type_id, school_id=school_id
+                        )
+                    cls.accumulate_assessment(type_stats[key], assessment)
+            
+            assessment_ids = list(scopes_by_assessment)
+            for offset in range(0, len(assessment_ids), 2000):
+                chunk = assessment_ids[offset:offset + 2000]
+                Assessment.objects.filter(id__in=chunk).update(stats_recorded=True)
+                
+                answers = AssessmentAnswer.objects.filter(
+                    assessment_id__in=chunk
+                ).values_list('assessment_id', 'question_id', 'answer_data')
+                for assessment_id, question_id, answer_data in answers.iterator(chunk_size=5000):
+                    assessment_type, scopes = scopes_by_assessment[assessment_id]
+                    question = get_question_set(assessment_type).get(question_id)
+                    if question is None:
+                        continue
+                    for school_id in scopes:
+                        key = (question_id, school_id)
+                        if key not in question_stats:
+                            question_stats[key] = AssessmentQuestionStats(question_id=question_id, school_id=school_id)
+                        cls.accumulate_answer(question_stats[key], question, answer_data)
+            
+            AssessmentTypeStats.objects.all().delete()
+            AssessmentQuestionStats.objects.all().delete()
+            AssessmentTypeStats.objects.bulk_create(type_stats.values(), batch_size=500)
+            cls._save_question_stats(question_stats.values())
+        
+        return len(scopes_by_assessment)
+    
+    @staticmethod
+    def serialize_type_stats(stats):
+        return {
+            'assessment_type_id': stats.assessment_type_id,
+            'assessment_type_name': stats.assessment_type.name,
+            'school_id': stats.school_id or None,
+            'completed_count': stats.completed_count,
+            'passed_count': stats.passed_count,
+            'pass_rate': stats.pass_rate,
+            'mean_score': stats.mean_score,
+            'score_stddev': stats.score_stddev,
+            'average_time_spent': stats.average_time_spent,
+            'score_histogram': stats.score_histogram,
+        }
+    
+    @classmethod
+    def get_type_stats(cls, assessment_type_id=None, school_id=None):
+        """
+        Retourne les agrégats par type d'évaluation (tous établissements par défaut).
+        """
+        stats = AssessmentTypeStats.objects.select_related('assessment_type').filter(
+            school_id=school_id or 0
+        ).order_by('assessment_type__name')
+        if assessment_type_id:
+            stats = stats.filter(assessment_type_id=assessment_type_id)
+        return [cls.serialize_type_stats(item) for item in stats]
     
-    
\ No newline at end of file
+    @staticmethod
+    def get_question_stats(assessment_type_id, school_id=None):
+        """
+        Retourne la difficulté et la répartition des réponses de chaque question d'un type.
+        """
+        stats = AssessmentQuestionStats.objects.select_related('question').filter(
+            question__assessment_type_id=assessment_type_id,
+            school_id=school_id or 0
+        ).order_by('question__order', 'question_id')
+        
+        return [{
+            'question_id': item.question_id,
+            'question_text': item.question.text,
+            'question_type': item.question.question_type,
+            'answered_count': item.answered_count,
+            'correct_count': item.correct_count,
+            'correct_rate': item.correct_rate,
+            'difficulty': item.difficulty,
+            'mean_value': item.mean_value,
+            'option_counts': item.option_counts,
+        } for item in stats]
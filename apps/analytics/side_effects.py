@@ -0,0 +1,194 @@
+"""
+Effets de bord différés et regroupés des récepteurs de signaux de modèles.
+
+Un récepteur post_save qui écrit une ligne d'activité, des préférences ou une
+notification le fait à chaque enregistrement, de façon synchrone, y compris
+lorsqu'un même objet est enregistré plusieurs fois dans la même requête. Avec
+defer(), le récepteur confie ce travail au répartiteur :
+
+- dans une transaction, le travail est conservé jusqu'à sa validation
+  (transaction.on_commit) et abandonné en cas d'annulation, y compris d'un
+  point de sauvegarde ;
+- pendant une requête HTTP (SideEffectsMiddleware), le travail validé est
+  conservé jusqu'à la fin de la requête ;
+- les travaux de même clé sont fusionnés (le premier est conservé), puis
+  chaque gestionnaire est appelé une seule fois avec la liste de ses travaux,
+  ce qui lui permet d'écrire par lots (bulk_create).
+
+Hors transaction et hors requête, le travail est exécuté immédiatement. Le
+paramètre SIDE_EFFECTS_SYNC exécute tout travail immédiatement (tests).
+"""
+
+import logging
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_state = Local()
+
+
+class Batch:
+    """
+    Travaux en attente, regroupés par gestionnaire puis par clé.
+    """
+    def __init__(self):
+        self.work = {}
+        self.done = False
+        self.callbacks = None
+        self._anonymous = 0
+
+    def add(self, handler, payload, key=None):
+        items = self.work.setdefault(handler, {})
+        if key is None:
+            # Travail sans clé : jamais fusionné
+            self._anonymous += 1
+            key = (Batch, self._anonymous)
+        items.setdefault(key, payload)
+
+    def merge(self, other):
+        for handler, items in other.work.items():
+            for key, payload in items.items():
+                self.add(handler, payload, key)
+
+    def run(self):
+        work, self.work = self.work, {}
+        for handler, items in work.items():
+            _call(handler, list(items.values()))
+
+    def __call__(self):
+        """Rappel on_commit : appelé à la validation de la transaction."""
+        if self.done:
+            return
+        self.done = True
+        scope = getattr(_state, 'scope', None)
+        if scope is not None:
+            scope.merge(self)
+            self.work = {}
+        else:
+            self.run()
+
+
+def _call(handler, payloads):
+    try:
+        handler(payloads)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exécution de l'effet de bord {handler.__qualname__}: {str(e)}")
+
+
+def _transaction_batch(connection):
+    """
+    Lot du point de sauvegarde courant : l'annulation d'un point de sauvegarde
+    retire son rappel on_commit et abandonne donc ses travaux.
+
+    Le lot est inscrit à nouveau à chaque travail (seul le premier appel
+    l'exécute) : captureOnCommitCallbacks, qui n'exécute que les rappels
+    inscrits dans son bloc, exécute ainsi les travaux programmés dans le bloc.
+    """
+    batches = getattr(_state, 'transactions', None)
+    if batches is None:
+        batches = _state.transactions = {}
+
+    # Toute annulation remplace la liste des rappels de la connexion : un lot
+    # inscrit dans une autre liste a été annulé (ou validé s'il est terminé)
+    for key in [key for key, batch in batches.items()
+                if batch.done or batch.callbacks is not connection.run_on_commit]:
+        del batches[key]
+
+    key = (connection.alias, tuple(connection.savepoint_ids))
+    batch = batches.get(key)
+    if batch is None:
+        batch = batches[key] = Batch()
+    connection.on_commit(batch)
+    batch.callbacks = connection.run_on_commit
+    return batch
+
+
+def defer(handler, payload, key=None, using=DEFAULT_DB_ALIAS):
+    """
+    Programme un travail pour le gestionnaire.
+
+    Args:
+        handler: Fonction appelée avec la liste des travaux d'un lot
+        payload: Données du travail (identifiants de préférence aux instances)
+        key: Clé de fusion : un seul travail est conservé par clé et par lot
+        using: Alias de la base de données dont la transaction est suivie
+    """
+    if getattr(settings, 'SIDE_EFFECTS_SYNC', False):
+        _call(handler, [payload])
+        return
+
+    connection = connections[using]
+    if connection.in_atomic_block:
+        batch = _transaction_batch(connection)
+    else:
+        batch = getattr(_state, 'scope', None)
+        if batch is None:
+            _call(handler, [payload])
+            return
+    batch.add(handler, payload, key)
+
+
+@contextmanager
+def collect():
+    """
+    Conserve les travaux validés jusqu'à la sortie du bloc, puis les exécute
+    par lots. Les blocs imbriqués partagent le lot du bloc englobant.
+    """
+    if getattr(_state, 'scope', None) is not None:
+        yield
+        return
+
+    batch = _state.scope = Batch()
+    try:
+        yield
+    finally:
+        _state.scope = None
+        batch.run()
+
+
+class SideEffectsMiddleware:
+    """
+    Regroupe les effets de bord des signaux de toute la requête.
+
+    Les requêtes traitées en mode asynchrone (flux SSE) ne sont pas regroupées.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.get_response(request)
+
+        with collect():
+            return self.get_response(request)
+
+
+def remember_previous_state(instance, update_fields=None, fields=None):
+    """
+    À appeler depuis le premier récepteur pre_save d'un modèle : lit une seule
+    fois la ligne enregistrée et la conserve dans instance._old_instance pour
+    tous les récepteurs pre_save et post_save.
+
+    Args:
+        instance: L'instance en cours d'enregistrement
+        update_fields: L'argument update_fields reçu par le récepteur
+        fields: Champs comparés par les récepteurs ; si l'enregistrement se
+            limite à d'autres champs, la ligne n'est pas lue
+    """
+    instance._old_instance = None
+    if not instance.pk or instance._state.adding:
+        return
+    if fields is not None and update_fields is not None and not set(fields) & set(update_fields):
+        return
+    instance._old_instance = type(instance)._default_manager.filter(pk=instance.pk).first()
@@ -1,12 +1,18 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import user_logged_in, user_logged_out
 from django.contrib.auth.signals import user_login_failed
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from apps.orientation.signals import assessment_completed
 
 from .models import UserActivity, AnalyticsEvent
+from .conditional import COUNTER_FIELDS, VERSIONED_MODELS, bump_model_versions, versioned_models
+from .side_effects import defer
 
 # Suivi des connexions/déconnexions
 @receiver(user_logged_in)
@@ -94,6 +100,36 @@ def log_user_login_failed(sender, credentials, request, **kwargs):
         )
 
 # Suivi des modifications utilisateur
+def record_activities(activities):
+    """
+    Gestionnaire d'effets de bord : écrit par lots les activités (et les
+    événements analytiques associés) programmées par les récepteurs.
+    """
+    UserActivity.objects.bulk_create([UserActivity(**activity['activity']) for activity in activities])
+    events = [AnalyticsEvent(**activity['event']) for activity in activities if activity.get('event')]
+    if events:
+        AnalyticsEvent.objects.bulk_create(events)
+
+
+def defer_activity(instance, user_id, action_type, action_detail, event=None):
+    """
+    Programme une activité sur un objet ; une seule activité est conservée par
+    objet et par requête (la première : une création l'emporte sur les mises à
+    jour qui la suivent).
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    defer(record_activities, {
+        'activity': {
+            'user_id': user_id,
+            'action_type': action_type,
+            'action_detail': action_detail,
+            'content_type': content_type,
+            'object_id': instance.pk,
+        },
+        'event': event,
+    }, key=(content_type.pk, instance.pk))
+
+
 @receiver(post_save, sender=get_user_model())
 def log_user_updated(sender, instance, created, **kwargs):
     """
@@ -103,25 +139,36 @@ def log_user_updated(sender, instance, created, **kwargs):
         action_type = 'create' if created else 'update'
         action_detail = f"Utilisateur {'créé' if created else 'mis à jour'}"
         
-        UserActivity.log(
-            user=instance,
-            action_type=action_type,
-            action_detail=action_detail,
-            related_object=instance
-        )
-        
-        # Suivre l'événement analytique
-        AnalyticsEvent.track(
-            event_name=f"user_{action_type}",
-            user=instance,
-            properties={
+        # Suivre également l'événement analytique
+        defer_activity(instance, instance.pk, action_type, action_detail, event={
+            'event_name': f"user_{action_type}",
+            'user_id': instance.pk,
+            'properties': {
                 'user_id': instance.id,
                 'email': instance.email,
                 'is_staff': instance.is_staff,
                 'is_active': instance.is_active,
                 'date_joined': instance.date_joined.isoformat()
             }
-        )
+        })
+
+# Agrégats des évaluations d'orientation
+@receiver(assessment_completed)
+def update_assessment_stats(sender, assessment, **kwargs):
+    """
+    Met à jour les agrégats d'évaluation une fois la transaction validée.
+    """
+    def record():
+        from .services import AssessmentAnalyticsService
+        
+        try:
+            AssessmentAnalyticsService.record_completion(assessment)
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.error(f"Erreur lors de la mise à jour des statistiques d'évaluation : {e}")
+    
+    transaction.on_commit(record)
 
 # Signal pour les autres modèles à suivre
 def log_object_activity(sender, instance, created, **kwargs):
@@ -134,25 +181,23 @@ def log_object_activity(sender, instance, created, **kwargs):
     if hasattr(settings, 'TRACK_USER_ACTIVITY') and settings.TRACK_USER_ACTIVITY:
         try:
             # Déterminer le responsable de l'action
-            user = None
+            user_id = None
             
             # Vérifier si l'instance a un attribut créateur ou modifieur
-            if hasattr(instance, 'created_by'):
-                user = instance.created_by
-            elif hasattr(instance, 'updated_by'):
-                user = instance.updated_by
-            elif hasattr(instance, 'user'):
-                user = instance.user
+            for attribute in ('created_by_id', 'updated_by_id', 'user_id'):
+                if hasattr(instance, attribute):
+                    user_id = getattr(instance, attribute)
+                    break
             
             # Déterminer le type d'action et le détail
             action_type = 'create' if created else 'update'
             model_name = instance._meta.verbose_name
             
-            UserActivity.log(
-                user=user,
-                action_type=action_type,
-                action_detail=f"{model_name} {'créé' if created else 'mis à jour'} - ID: {instance.pk}",
-                related_object=instance
+            defer_activity(
+                instance,
+                user_id,
+                action_type,
+                f"{model_name} {'créé' if created else 'mis à jour'} - ID: {instance.pk}"
             )
         except Exception as e:
             # Ne pas échouer si le suivi échoue
@@ -164,4 +209,37 @@ def log_object_activity(sender, instance, created, **kwargs):
 # Par exemple:
 # @receiver(post_save, sender=School)
 # def log_school_activity(sender, instance, created, **kwargs):
-#     log_object_activity(sender, instance, created, **kwargs)
\ No newline at end of file
+#     log_object_activity(sender, instance, created, **kwargs)
+
+
+# Versions des modèles servant aux réponses conditionnelles (voir conditional.py)
+def bump_model_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Rend obsolètes les ETag dépendant du modèle d'un objet modifié ou supprimé.
+    """
+    label = sender._meta.label
+    if update_fields and set(update_fields) <= COUNTER_FIELDS.get(label, frozenset()):
+        return
+    defer(bump_model_versions, label, key=label)
+
+
+def bump_related_model_versions(sender, action, **kwargs):
+    """
+    Rend obsolètes les ETag des modèles reliés par une relation plusieurs-à-plusieurs modifiée.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    for field in sender._meta.get_fields():
+        if field.many_to_one and field.related_model._meta.label in VERSIONED_MODELS:
+            label = field.related_model._meta.label
+            defer(bump_model_versions, label, key=label)
+
+
+for model in versioned_models():
+    post_save.connect(bump_model_version, sender=model, dispatch_uid=f'bump_model_version_{model._meta.label}')
+    post_delete.connect(bump_model_version, sender=model, dispatch_uid=f'bump_model_version_delete_{model._meta.label}')
+    for field in model._meta.many_to_many:
+        m2m_changed.connect(
+            bump_related_model_versions, sender=field.remote_field.through,
+            dispatch_uid=f'bump_related_model_versions_{field.remote_field.through._meta.label}'
+        )
@@ -1,3 +1,551 @@
-from django.test import TestCase
+import gzip
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.orientation.models import AssessmentType, AssessmentQuestion, Assessment
+from apps.orientation.forms import TakeAssessmentForm
+from apps.orientation.question_sets import clear_local_cache
+
+from apps.messaging.models import Message
+from apps.messaging.services import MessagingService
+from apps.messaging.views import mobile as messaging_views
+from apps.resources.models import Resource
+from apps.schools.models import City, Department, School, SchoolType
+from apps.schools.serializers.mobile import SchoolDetailSerializer
+
+from .compression import choose_encoding
+from .conditional import model_versions
+from .pagination import EstimatedCountPaginator, UncountedPaginator
+from .renderers import FastJSONRenderer
+from .instrumentation import QueryBudgetExceeded, QueryBudgetMixin, enforce_query_budgets, metrics
+from .models import AssessmentTypeStats, AssessmentQuestionStats, UserActivity
+from .side_effects import collect, defer
+from .services import AssessmentAnalyticsService
+
+
+class AssessmentAnalyticsServiceTest(TestCase):
+    """
+    Tests pour les agrégats précalculés des évaluations.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        clear_local_cache()
+        self.assessment_type = AssessmentType.objects.create(
+            name='Aptitudes',
+            description='Évaluation des aptitudes',
+            max_score=100,
+            passing_score=50
+        )
+        self.choice = AssessmentQuestion.objects.create(
+            assessment_type=self.assessment_type,
+            text='Question à choix',
+            question_type='single_choice',
+            order=0,
+            options={'choices': ['A', 'B'], 'correct_answer': 1}
+        )
+        self.scale = AssessmentQuestion.objects.create(
+            assessment_type=self.assessment_type,
+            text='Question échelle',
+            question_type='scale',
+            order=1,
+            scale_min=1,
+            scale_max=5
+        )
+
+    def _take_assessment(self, email, option, value, school_id=None):
+        student = User.objects.create_user(
+            email=email,
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        if school_id:
+            student.student_profile.school_id = school_id
+            student.student_profile.save()
+
+        assessment = Assessment.objects.create(student=student, assessment_type=self.assessment_type)
+        assessment.start()
+        form = TakeAssessmentForm({
+            f'question_{self.choice.id}': str(option),
+            f'question_{self.scale.id}': str(value),
+        }, assessment=Assessment.objects.get(pk=assessment.pk))
+        self.assertTrue(form.is_valid())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+
+    def test_completion_updates_aggregates(self):
+        """
+        Test de la mise à jour incrémentale des agrégats par type et par école.
+        """
+        self._take_assessment('first@example.com', option=1, value=4, school_id=7)
+        self._take_assessment('second@example.com', option=0, value=2)
+
+        overall = AssessmentTypeStats.objects.get(assessment_type=self.assessment_type, school_id=0)
+        self.assertEqual(overall.completed_count, 2)
+        self.assertEqual(overall.passed_count, 2)
+        self.assertEqual(overall.mean_score, 75)
+        self.assertEqual(overall.score_histogram[5], 1)
+        self.assertEqual(overall.score_histogram[9], 1)
+
+        school = AssessmentTypeStats.objects.get(assessment_type=self.assessment_type, school_id=7)
+        self.assertEqual(school.completed_count, 1)
+        self.assertEqual(school.mean_score, 100)
+
+        choice_stats = AssessmentQuestionStats.objects.get(question=self.choice, school_id=0)
+        self.assertEqual(choice_stats.answered_count, 2)
+        self.assertEqual(choice_stats.difficulty, 0.5)
+        self.assertEqual(choice_stats.option_counts, {'0': 1, '1': 1})
+
+        scale_stats = AssessmentQuestionStats.objects.get(question=self.scale, school_id=0)
+        self.assertEqual(scale_stats.mean_value, 3)
+
+    def test_rebuild_matches_incremental_aggregates(self):
+        """
+        Test que la reconstruction complète donne les mêmes agrégats.
+        """
+        self._take_assessment('first@example.com', option=1, value=4, school_id=7)
+        self._take_assessment('second@example.com', option=0, value=2)
+        incremental = AssessmentAnalyticsService.get_type_stats()
+
+        self.assertEqual(AssessmentAnalyticsService.rebuild(), 2)
+        self.assertEqual(AssessmentAnalyticsService.get_type_stats(), incremental)
+        self.assertEqual(
+            AssessmentAnalyticsService.get_question_stats(self.assessment_type.id, school_id=7)[0]['correct_count'],
+            1
+        )
+
+    def test_rebuild_marks_assessments_as_recorded(self):
+        """
+        Test qu'une évaluation comptée par la reconstruction ne l'est pas une seconde fois.
+        """
+        self._take_assessment('first@example.com', option=1, value=4)
+        assessment = Assessment.objects.get(status='completed')
+        Assessment.objects.filter(pk=assessment.pk).update(stats_recorded=False)
+
+        self.assertEqual(AssessmentAnalyticsService.rebuild(), 1)
+        AssessmentAnalyticsService.record_completion(assessment)
+
+        overall = AssessmentTypeStats.objects.get(assessment_type=self.assessment_type, school_id=0)
+        self.assertEqual(overall.completed_count, 1)
+        self.assertTrue(Assessment.objects.get(pk=assessment.pk).stats_recorded)
+
+
+class RequestInstrumentationTest(QueryBudgetMixin, TestCase):
+    """
+    Tests pour la mesure des requêtes et les budgets de requêtes SQL.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.advisor = User.objects.create_user(
+            email='advisor@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Advisor',
+            type='advisor'
+        )
+        self.conversation = MessagingService.create_direct_conversation(self.student, self.advisor)
+        for index in range(5):
+            Message.objects.create(conversation=self.conversation, sender=self.advisor, content=f'Message {index}')
+        self.url = f'/api/messaging/{self.conversation.id}/messages/'
+        self.client.force_login(self.student)
+
+    @enforce_query_budgets
+    def test_server_timing_and_metrics(self):
+        """
+        Test de l'en-tête Server-Timing et de l'agrégation par route, dans le budget de la vue.
+        """
+        with override_settings(DEBUG=True):
+            for _ in range(2):
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ SQL", app;dur=[\d.]+, total;dur=[\d.]+$')
+
+        # Hors DEBUG, l'en-tête est réservé aux membres du personnel
+        with override_settings(DEBUG=False):
+            self.assertFalse(self.client.get(self.url).has_header('Server-Timing'))
+
+        route = next(route for route in metrics.snapshot() if route['route'] == 'GET /api/messaging/<int:pk>/messages/')
+        self.assertEqual(route['requests'], 3)
+        self.assertLessEqual(route['max_queries'], messaging_views.message_history.query_budget)
+        self.assertEqual(route['avg_bytes'], len(response.content))
+
+        # Les mesures ne sont accessibles qu'aux administrateurs
+        self.assertEqual(self.client.get('/api/analytics/api/performance/').status_code, 403)
+        self.student.is_staff = True
+        self.student.save()
+        routes = self.client.get('/api/analytics/api/performance/').json()['routes']
+        self.assertIn('GET /api/messaging/<int:pk>/messages/', [route['route'] for route in routes])
+        with override_settings(DEBUG=False):
+            self.assertTrue(self.client.get(self.url).has_header('Server-Timing'))
+
+    @enforce_query_budgets
+    def test_budget_exceeded_fails(self):
+        """
+        Test qu'un dépassement de budget fait échouer la requête lorsque les budgets sont imposés.
+        """
+        with mock.patch.object(messaging_views.message_history, 'query_budget', 2):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.url)
+
+    def test_assert_max_queries_reports_repeated_queries(self):
+        """
+        Test que assertMaxQueries signale les requêtes répétées (N+1).
+        """
+        with self.assertMaxQueries(1):
+            Message.objects.count()
+
+        with self.assertRaises(AssertionError) as context:
+            with self.assertMaxQueries(2):
+                for message in Message.objects.all():
+                    User.objects.get(pk=message.sender_id)
+
+        self.assertIn('6 requêtes SQL', str(context.exception))
+        self.assertIn('5x SELECT', str(context.exception))
+
+
+# Les réglages de test exécutent les effets de bord immédiatement
+@override_settings(SIDE_EFFECTS_SYNC=False)
+class SideEffectsTest(TestCase):
+    """
+    Tests pour le répartiteur d'effets de bord des signaux.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.calls = []
+
+    def handler(self, payloads):
+        self.calls.append(payloads)
+
+    def test_work_is_coalesced_until_end_of_scope(self):
+        """
+        Test que les travaux validés sont fusionnés par clé et exécutés en un lot à la fin de la requête.
+        """
+        with collect():
+            with self.captureOnCommitCallbacks(execute=True):
+                defer(self.handler, 'a', key=1)
+                defer(self.handler, 'b', key=1)
+                defer(self.handler, 'c', key=2)
+            with self.captureOnCommitCallbacks(execute=True):
+                defer(self.handler, 'd', key=1)
+            self.assertEqual(self.calls, [])
+
+        self.assertEqual(self.calls, [['a', 'c']])
+
+    def test_rolled_back_work_is_dropped(self):
+        """
+        Test que le travail programmé dans un point de sauvegarde annulé n'est pas exécuté.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            defer(self.handler, 'kept')
+            try:
+                with transaction.atomic():
+                    defer(self.handler, 'dropped')
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(self.calls, [['kept']])
+
+        with override_settings(SIDE_EFFECTS_SYNC=True):
+            with transaction.atomic():
+                defer(self.handler, 'immediate')
+                self.assertEqual(self.calls[-1], ['immediate'])
+
+    @override_settings(TRACK_USER_ACTIVITY=True)
+    def test_one_activity_per_saved_user(self):
+        """
+        Test qu'une création suivie de mises à jour ne produit qu'une activité.
+        """
+        with collect():
+            with self.captureOnCommitCallbacks(execute=True):
+                user = User.objects.create_user(
+                    email='student@example.com',
+                    password='securepass123',
+                    first_name='Test',
+                    last_name='Student',
+                    type='student'
+                )
+                user.city = 'Lyon'
+                user.save()
+
+        activity = UserActivity.objects.get(object_id=user.pk)
+        self.assertEqual(activity.action_type, 'create')
+        self.assertEqual(activity.user, user)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PaginationTest(TestCase):
+    """
+    Tests pour les paginateurs sans comptage exact.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        for index in range(5):
+            User.objects.create_user(
+                email=f'student{index}@example.com',
+                password='securepass123',
+                first_name='Test',
+                last_name=f'Student {index}',
+                type='student'
+            )
+
+    @override_settings(PAGINATION_COUNT_CACHE_MIN=1)
+    def test_exact_count_is_cached_per_filter(self):
+        """
+        Test que le nombre exact est mis en cache par empreinte de requête.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(User.objects.filter(type='student'), 2).count, 5)
+        with self.assertNumQueries(0):
+            paginator = EstimatedCountPaginator(User.objects.filter(type='student').order_by('pk'), 2)
+            self.assertEqual(paginator.num_pages, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(User.objects.filter(type='teacher'), 2).count, 0)
+
+    def test_planner_estimate_above_threshold(self):
+        """
+        Test que l'estimation du planificateur remplace le comptage sur les grandes tables.
+        """
+        with mock.patch('apps.analytics.pagination.planner_estimate', return_value=250000):
+            paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 2)
+            with self.assertNumQueries(1):
+                self.assertEqual(len(paginator.page(3)), 1)
+
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(paginator.count, 250000)
+        # Au-delà des lignes réelles, la page est vide plutôt qu'en erreur
+        self.assertEqual(len(paginator.page(200000)), 0)
+
+    def test_uncounted_paginator(self):
+        """
+        Test que le paginateur sans comptage détecte la page suivante sans COUNT.
+        """
+        paginator = UncountedPaginator(User.objects.order_by('pk'), 2)
+        with self.assertNumQueries(1):
+            page = paginator.page(1)
+            self.assertEqual(len(page), 2)
+            self.assertTrue(page.has_next())
+
+        page = paginator.page(3)
+        self.assertEqual(len(page), 1)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 5)
+
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'conditional-tests'}},
+    SIDE_EFFECTS_SYNC=True
+)
+class ConditionalResponseTest(TestCase):
+    """
+    Tests pour les réponses conditionnelles des catalogues de l'API.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        self.city = City.objects.create(name='Lyon')
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.client.force_login(self.user)
+        self.url = '/api/schools/api/cities/'
+
+    def test_unchanged_list_is_not_modified(self):
+        """
+        Test qu'un ETag correspondant donne une réponse 304 sans requête sur les villes.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('max-age=3600', response['Cache-Control'])
+
+        # Seules la session et l'utilisateur sont lus
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, {'search': 'Lyon'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_renew_etag(self):
+        """
+        Test qu'une modification du modèle change l'ETag, sauf pour les compteurs.
+        """
+        etag = self.client.get(self.url)['ETag']
+        City.objects.create(name='Grenoble')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Le nombre d'établissements par ville fait partie de la représentation
+        etag = response['ETag']
+        school_type = SchoolType.objects.create(name='Lycée', slug='lycee')
+        School.objects.create(name='Lycée du Parc', slug='lycee-du-parc', school_type=school_type, city=self.city)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        versions = model_versions(['resources.Resource'])
+        resource = Resource.objects.create(
+            title='Fiche', description='Fiche de révision', resource_type='document', created_by=self.user
+        )
+        self.assertNotEqual(model_versions(['resources.Resource']), versions)
+
+        versions = model_versions(['resources.Resource'])
+        resource.increment_view_count()
+        self.assertEqual(model_versions(['resources.Resource']), versions)
+
+
+class RenderingTest(TestCase):
+    """
+    Tests pour le rendu JSON compact et la compression des réponses.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        City.objects.bulk_create([City(name=f'Ville {index}', region='Auvergne-Rhône-Alpes') for index in range(60)])
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.client.force_login(self.user)
+        self.url = '/api/schools/api/cities/'
+
+    def test_json_is_compact_unless_pretty(self):
+        """
+        Test que le JSON n'est indenté que sur demande.
+        """
+        data = {'name': 'Élodie', 'note': Decimal('4.5'), 'ligne': '\u2028'}
+        self.assertEqual(FastJSONRenderer().render(data), '{"name":"Élodie","note":4.5,"ligne":"\\u2028"}'.encode())
+
+        response = self.client.get(self.url, {'pretty': 1})
+        self.assertIn(b'\n    "count"', response.content)
+        response = self.client.get(self.url)
+        self.assertNotIn(b'\n', response.content)
+
+    @override_settings(RESPONSE_COMPRESSION_MIN_SIZE=1024)
+    def test_large_responses_are_compressed(self):
+        """
+        Test que les réponses au-delà du seuil sont compressées si le client l'accepte.
+        """
+        plain = self.client.get(self.url, {'page_size': 60})
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get(self.url, {'page_size': 60}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.content) * 3, len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        response = self.client.get(self.url, {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIsNone(choose_encoding('gzip;q=0, identity'))
+
+
+class SparseFieldsetTest(TestCase):
+    """
+    Tests pour la sélection des champs (?fields=) et l'expansion (?expand=).
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        school_type = SchoolType.objects.create(name='Lycée', slug='lycee')
+        self.school = School.objects.create(name='Lycée du Parc', slug='lycee-du-parc', school_type=school_type)
+        Department.objects.create(school=self.school, name='Sciences', slug='sciences')
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.client.force_login(self.user)
+        self.url = f'/api/schools/api/schools/{self.school.pk}/'
+
+    def test_fields_and_expand(self):
+        """
+        Test que seuls les champs demandés et les relations étendues sont renvoyés.
+        """
+        data = self.client.get(self.url).json()
+        self.assertEqual([department['name'] for department in data['departments']], ['Sciences'])
+
+        data = self.client.get(self.url, {'fields': 'id,name'}).json()
+        self.assertEqual(data, {'id': self.school.pk, 'name': 'Lycée du Parc'})
+
+        data = self.client.get(self.url, {'fields': 'name', 'expand': 'departments'}).json()
+        self.assertEqual(set(data), {'name', 'departments'})
+
+        data = self.client.get(self.url, {'expand': ''}).json()
+        self.assertIn('school_type', data)
+        self.assertNotIn('departments', data)
+
+    def test_queryset_follows_requested_fields(self):
+        """
+        Test que les relations non demandées ne sont ni jointes ni préchargées.
+        """
+        request = mock.Mock(method='GET', query_params={'fields': 'id,name,review_count'})
+        queryset = SchoolDetailSerializer.optimize_queryset(School.objects.all(), {'request': request})
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual([lookup.prefetch_to for lookup in queryset._prefetch_related_lookups], ['reviews'])
+
+        # Session, utilisateur, établissement et avis publics
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'fields': 'id,name,review_count'})
@@ -30,6 +30,7 @@ urlpatterns = [
     path('api/stats/<str:stat_type>/', views.StatsAPIView.as_view(), name='stats-api'),
     path('api/metrics/<int:pk>/value/', views.MetricValueAPIView.as_view(), name='metric-value-api'),
     path('api/track-event/', views.TrackEventAPIView.as_view(), name='track-event-api'),
+    path('api/performance/', views.PerformanceMetricsAPIView.as_view(), name='performance-api'),
     
     # URLs du routeur API
     path('api/', include(router.urls)),
@@ -18,6 +18,7 @@ from .mobile import (
     MetricValueAPIView,
     StatsAPIView,
     TrackEventAPIView,
+    PerformanceMetricsAPIView,
     UserActivityViewSet,
     ReportViewSet,
     MetricViewSet,
@@ -58,6 +59,7 @@ __all__ = [
     'MetricValueAPIView',
     'StatsAPIView',
     'TrackEventAPIView',
+    'PerformanceMetricsAPIView',
     'UserActivityViewSet',
     'ReportViewSet',
     'MetricViewSet',
@@ -25,6 +25,9 @@ from ..models import (
 )
 from ..services import MetricService, WidgetService, ReportService, StatsService
 from ..permissions import IsOwner, IsOwnDataOnly
+from apps.resources.downloads import serve_file
+from ..instrumentation import metrics
+from ..pagination import CursorResultsSetPagination, UncountedPaginator
 
 # Vue principale pour le tableau de bord analytics
 class AnalyticsDashboardView(LoginRequiredMixin, UserPassesTestMixin, View):
@@ -135,17 +138,14 @@ class ReportDownloadView(LoginRequiredMixin, UserPassesTestMixin, View):
             messages.error(request, _("Ce rapport n'a pas encore été généré."))
             return redirect('analytics:report-detail', pk=report.pk)
         
-        # Préparer la réponse HTTP
-        response = HttpResponse(
-            report.file.read(),
+        # Envoyer le fichier par blocs, sans le charger en mémoire
+        filename = f"{report.title}_{timezone.now().strftime('%Y%m%d')}.{report.report_format}"
+        return serve_file(
+            request,
+            report.file,
+            filename=filename,
             content_type=self._get_content_type(report.report_format)
         )
-        
-        # Définir le nom du fichier
-        filename = f"{report.title}_{timezone.now().strftime('%Y%m%d')}.{report.report_format}"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
     
     def _get_content_type(self, format):
         content_types = {
@@ -198,6 +198,7 @@ class UserActivityListView(LoginRequiredMixin, ListView):
     template_name = 'analytics/user_activity_list.html'
     context_object_name = 'activities'
     paginate_by = 50
+    paginator_class = UncountedPaginator
     
     def get_queryset(self):
         # Pour les administrateurs, afficher toutes les activités
@@ -562,6 +563,26 @@ class TrackEventAPIView(APIView):
                 'message': str(e)
             }, status=500)
 
+class PerformanceMetricsAPIView(APIView):
+    """
+    API des mesures de performance agrégées par route (requêtes SQL, temps,
+    taille des réponses) depuis le démarrage du processus qui répond.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'success': True,
+            'routes': metrics.snapshot()
+        })
+
+    def delete(self, request):
+        metrics.reset()
+        return Response({
+            'success': True,
+            'message': _("Mesures de performance réinitialisées.")
+        })
+
 # ViewSets pour l'API REST
 class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -569,6 +590,8 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = None  # À implémenter avec un serializer
     permission_classes = [IsAuthenticated, IsOwnDataOnly]
+    pagination_class = CursorResultsSetPagination
+    ordering = '-timestamp'
     
     def get_queryset(self):
         # Pour les administrateurs, afficher toutes les activités
@@ -700,6 +723,8 @@ class AnalyticsEventViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = None  # À implémenter avec un serializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = CursorResultsSetPagination
+    ordering = '-timestamp'
     
     def get_queryset(self):
         # Seuls les administrateurs peuvent voir tous les événements
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.appointments.services import AppointmentReminderService, REMINDER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Envoie les rappels de rendez-vous arrivés à échéance.
+    """
+    help = "Envoie les rappels de rendez-vous dus. Plusieurs instances peuvent tourner en parallèle."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE,
+                            help="Nombre maximal de rappels réservés par transaction")
+        parser.add_argument('--loop', action='store_true',
+                            help="Continuer à surveiller la file des rappels au lieu de s'arrêter")
+        parser.add_argument('--interval', type=float, default=30,
+                            help="Attente en secondes entre deux passages quand la file est vide (avec --loop)")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = AppointmentReminderService.dispatch_due(batch_size=options['batch_size'])
+            if sent or options['verbosity'] > 1:
+                self.stdout.write(self.style.SUCCESS(f"{sent} rappel(s) envoyé(s)."))
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
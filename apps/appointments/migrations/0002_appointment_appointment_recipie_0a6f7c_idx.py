@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['recipient', 'schedule_time', 'end_time'], name='appointment_recipie_0a6f7c_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-19 03:16
+
+import datetime
+
+from django.db import migrations, models
+
+ACTIVE_STATUSES = ('pending', 'confirmed', 'rescheduled')
+
+
+def compute_fire_times(apps, schema_editor):
+    """
+    Renseigne l'heure d'envoi des rappels non envoyés des rendez-vous actifs.
+    """
+    AppointmentReminder = apps.get_model('appointments', 'AppointmentReminder')
+
+    reminders = []
+    for reminder in AppointmentReminder.objects.filter(
+        sent=False,
+        appointment__status__in=ACTIVE_STATUSES
+    ).select_related('appointment').iterator(chunk_size=1000):
+        reminder.fire_at = reminder.appointment.schedule_time - datetime.timedelta(minutes=reminder.minutes_before)
+        reminders.append(reminder)
+
+    AppointmentReminder.objects.bulk_update(reminders, ['fire_at'], batch_size=1000)
+
+
+def create_reminder_notification_type(apps, schema_editor):
+    """
+    Crée le type de notification utilisé par l'envoi des rappels.
+    """
+    NotificationType = apps.get_model('notifications', 'NotificationType')
+    NotificationType.objects.get_or_create(
+        code='appointment_reminder',
+        defaults={
+            'name': 'Rappel de rendez-vous',
+            'title_template': 'Rappel : {{ title }}',
+            'body_template': 'Votre rendez-vous « {{ title }} » avec {{ other_name }} a lieu le {{ schedule_time }}.',
+            'has_push': True,
+            'icon': 'calendar',
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_appointment_appointment_recipie_0a6f7c_idx'),
+        ('notifications', '0002_notificationtype_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='fire_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='à envoyer le'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentreminder',
+            index=models.Index(condition=models.Q(('sent', False)), fields=['fire_at'], name='appointment_reminder_due_idx'),
+        ),
+        migrations.RunPython(compute_fire_times, migrations.RunPython.noop),
+        migrations.RunPython(create_reminder_notification_type, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointmentreminder_fire_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='tentatives échouées'),
+        ),
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='réservé le'),
+        ),
+    ]
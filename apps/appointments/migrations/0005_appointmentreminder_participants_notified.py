@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointmentreminder_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='recipient_notified',
+            field=models.BooleanField(default=False, verbose_name='destinataire prévenu'),
+        ),
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='requester_notified',
+            field=models.BooleanField(default=False, verbose_name='demandeur prévenu'),
+        ),
+    ]
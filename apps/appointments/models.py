@@ -1,9 +1,39 @@
-from django.db import models
+import datetime
+
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+# Statuts pour lesquels un rendez-vous occupe l'agenda du destinataire
+BLOCKING_STATUSES = ('pending', 'confirmed', 'rescheduled')
+
+
+class AppointmentQuerySet(models.QuerySet):
+    """
+    Requêtes spécifiques aux rendez-vous.
+    """
+    def overlapping(self, recipient, start, end, exclude_pk=None):
+        """
+        Rendez-vous du destinataire qui occupent une partie de l'intervalle [start, end[.
+
+        Deux intervalles se chevauchent si et seulement si chacun commence avant
+        la fin de l'autre : une seule requête par plage, servie par l'index
+        (destinataire, début, fin).
+        """
+        queryset = self.filter(
+            recipient=recipient,
+            status__in=BLOCKING_STATUSES,
+            schedule_time__lt=end,
+            end_time__gt=start
+        )
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return queryset
+
+
 class Appointment(models.Model):
     """
     Modèle représentant un rendez-vous entre deux utilisateurs.
@@ -76,6 +106,8 @@ class Appointment(models.Model):
     # Métadonnées
     reminder_sent = models.BooleanField(_('rappel envoyé'), default=False)
     
+    objects = AppointmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('rendez-vous')
         verbose_name_plural = _('rendez-vous')
@@ -85,6 +117,7 @@ class Appointment(models.Model):
             models.Index(fields=['recipient', 'status']),
             models.Index(fields=['schedule_time']),
             models.Index(fields=['status']),
+            models.Index(fields=['recipient', 'schedule_time', 'end_time']),
         ]
     
     def __str__(self):
@@ -103,18 +136,47 @@ class Appointment(models.Model):
         # Vérifier que l'heure de fin est après l'heure de début
         if self.end_time and self.end_time <= self.schedule_time:
             raise ValidationError(_('L\'heure de fin doit être après l\'heure de début.'))
+        
+        # Vérifier que le destinataire n'a pas déjà un rendez-vous sur cette plage
+        if self.has_conflict():
+            raise ValidationError(_('Le destinataire a déjà un rendez-vous sur cette plage horaire.'))
+    
+    def get_end_time(self):
+        """Retourne l'heure de fin, calculée à partir de la durée si besoin."""
+        if self.end_time:
+            return self.end_time
+        return self.schedule_time + datetime.timedelta(minutes=self.duration_minutes)
+    
+    def has_conflict(self):
+        """Indique si le rendez-vous chevauche un autre rendez-vous du destinataire."""
+        if self.status not in BLOCKING_STATUSES or not self.recipient_id or not self.schedule_time:
+            return False
+        return Appointment.objects.overlapping(
+            self.recipient_id, self.schedule_time, self.get_end_time(), exclude_pk=self.pk
+        ).exists()
     
     def save(self, *args, **kwargs):
-        """Surcharge de la méthode save pour calculer l'heure de fin."""
+        """
+        Surcharge de la méthode save pour calculer l'heure de fin et empêcher
+        les doubles réservations.
+        """
         # Si l'heure de fin n'est pas spécifiée, calculer à partir de la durée
         if not self.end_time and self.schedule_time:
-            import datetime
-            self.end_time = self.schedule_time + datetime.timedelta(minutes=self.duration_minutes)
+            self.end_time = self.get_end_time()
         
-        # Appel à la méthode clean() pour la validation
-        self.clean()
-        
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Verrouiller le destinataire : les réservations concurrentes sur son
+            # agenda sont sérialisées entre la vérification et l'écriture
+            if self.status in BLOCKING_STATUSES and self.recipient_id:
+                recipient_model = self._meta.get_field('recipient').related_model
+                recipient_model.objects.select_for_update().filter(
+                    pk=self.recipient_id
+                ).values_list('pk', flat=True).get()
+            
+            # Appel à la méthode clean() pour la validation
+            self.clean()
+            
+            super().save(*args, **kwargs)
     
     def confirm(self):
         """Confirme le rendez-vous."""
@@ -130,7 +192,6 @@ class Appointment(models.Model):
                 self.duration_minutes = new_duration_minutes
             
             # Recalculer l'heure de fin
-            import datetime
             self.end_time = self.schedule_time + datetime.timedelta(minutes=self.duration_minutes)
             
             self.status = 'rescheduled'
@@ -228,9 +289,10 @@ class AppointmentSlot(models.Model):
         if not self.recurring and self.start_date and self.end_date and self.end_date < self.start_date:
             raise ValidationError(_('La date de fin doit être après la date de début.'))
     
-    def is_available(self, date_time):
+    def is_available(self, date_time, end_time=None):
         """
         Vérifie si un créneau est disponible à une date et heure donnée.
+        Si end_time est fourni, toute la plage [date_time, end_time[ doit être libre.
         """
         if not self.is_active:
             return False
@@ -253,18 +315,10 @@ class AppointmentSlot(models.Model):
                 return False
         
         # Vérifier s'il y a déjà un rendez-vous à cette heure
-        existing_appointments = Appointment.objects.filter(
-            recipient=self.user,
-            schedule_time__date=date_time.date(),
-            status__in=['confirmed', 'rescheduled']
-        )
-        
-        for appointment in existing_appointments:
-            if (date_time >= appointment.schedule_time and 
-                date_time < appointment.end_time):
-                return False
+        if end_time is None:
+            end_time = date_time + datetime.timedelta(minutes=1)
         
-        return True
+        return not Appointment.objects.overlapping(self.user, date_time, end_time).exists()
 
 class AppointmentException(models.Model):
     """
@@ -343,6 +397,17 @@ class AppointmentReminder(models.Model):
     sent = models.BooleanField(_('envoyé'), default=False)
     sent_at = models.DateTimeField(_('envoyé le'), null=True, blank=True)
     
+    # Réservation par un worker d'envoi et nombre d'échecs d'envoi
+    claimed_at = models.DateTimeField(_('réservé le'), null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(_('tentatives échouées'), default=0)
+    
+    # Participants déjà prévenus : une nouvelle tentative ne concerne que les autres
+    requester_notified = models.BooleanField(_('demandeur prévenu'), default=False)
+    recipient_notified = models.BooleanField(_('destinataire prévenu'), default=False)
+    
+    # Heure d'envoi prévue ; vide si le rendez-vous n'est plus actif
+    fire_at = models.DateTimeField(_('à envoyer le'), null=True, blank=True)
+    
     created_at = models.DateTimeField(_('créé le'), auto_now_add=True)
     
     class Meta:
@@ -350,18 +415,50 @@ class AppointmentReminder(models.Model):
         verbose_name_plural = _('rappels de rendez-vous')
         ordering = ['appointment', 'minutes_before']
         unique_together = ('appointment', 'reminder_type', 'minutes_before')
+        indexes = [
+            # File des rappels à envoyer, triée par échéance
+            models.Index(fields=['fire_at'], condition=Q(sent=False), name='appointment_reminder_due_idx'),
+        ]
     
     def __str__(self):
         return f"Rappel {self.get_reminder_type_display()} pour {self.appointment} ({self.minutes_before} minutes avant)"
     
+    def save(self, *args, **kwargs):
+        """Surcharge de la méthode save pour calculer l'heure d'envoi."""
+        if kwargs.get('update_fields') is None:
+            self.fire_at = self.compute_fire_at(self.appointment)
+        super().save(*args, **kwargs)
+    
+    def compute_fire_at(self, appointment):
+        """Heure d'envoi du rappel pour un rendez-vous, ou None s'il n'est plus actif."""
+        if appointment.status not in BLOCKING_STATUSES:
+            return None
+        return appointment.schedule_time - datetime.timedelta(minutes=self.minutes_before)
+    
+    @classmethod
+    def refresh_fire_times(cls, appointment):
+        """
+        Recalcule l'heure d'envoi des rappels non envoyés d'un rendez-vous,
+        après une reprogrammation ou une annulation.
+        """
+        reminders = list(cls.objects.filter(appointment=appointment, sent=False))
+        for reminder in reminders:
+            reminder.fire_at = reminder.compute_fire_at(appointment)
+        cls.objects.bulk_update(reminders, ['fire_at'])
+        return len(reminders)
+    
     def mark_sent(self):
         """Marque le rappel comme envoyé."""
         self.sent = True
         self.sent_at = timezone.now()
         self.save(update_fields=['sent', 'sent_at'])
     
+    @classmethod
+    def mark_sent_bulk(cls, reminder_ids):
+        """Marque un lot de rappels comme envoyés en une seule requête."""
+        return cls.objects.filter(pk__in=reminder_ids).update(sent=True, sent_at=timezone.now())
+    
     @property
     def scheduled_time(self):
         """Calcule l'heure à laquelle le rappel doit être envoyé."""
-        import datetime
         return self.appointment.schedule_time - datetime.timedelta(minutes=self.minutes_before)
\ No newline at end of file
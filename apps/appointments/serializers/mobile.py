@@ -1,10 +1,17 @@
 from rest_framework import serializers
-from ..models import Appointment, AppointmentReminder
+from apps.analytics.fieldsets import SparseFieldsetMixin
+from ..models import Appointment, AppointmentReminder, BLOCKING_STATUSES
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
+from datetime import timedelta
 from .base import AppointmentReminderSerializer
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Sérialiseur des rendez-vous. En lecture, accepte ?fields= et ?expand=
+    (voir apps.analytics.fieldsets).
+    """
     requester_name = serializers.SerializerMethodField()
     recipient_name = serializers.SerializerMethodField()
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -22,6 +29,14 @@ class AppointmentSerializer(serializers.ModelSerializer):
                   'requester_feedback', 'recipient_feedback', 'created_at',
                   'updated_at', 'reminders', 'is_past', 'is_upcoming']
         read_only_fields = ['created_at', 'updated_at', 'is_past', 'is_upcoming']
+        expandable_fields = ('reminders',)
+        select_related_fields = {
+            'requester_name': ('requester',),
+            'recipient_name': ('recipient',),
+        }
+        prefetch_related_fields = {
+            'reminders': ('reminders',),
+        }
     
     def get_requester_name(self, obj):
         return obj.requester.get_full_name()
@@ -44,6 +59,17 @@ class AppointmentSerializer(serializers.ModelSerializer):
         if schedule_time and end_time and end_time <= schedule_time:
             raise serializers.ValidationError(_('L\'heure de fin doit être après l\'heure de début.'))
         
+        # Vérifier que le destinataire est libre sur cette plage
+        recipient = data.get('recipient', getattr(self.instance, 'recipient', None))
+        appointment_status = data.get('status', getattr(self.instance, 'status', 'pending'))
+        if schedule_time and recipient and appointment_status in BLOCKING_STATUSES:
+            duration = data.get('duration_minutes', getattr(self.instance, 'duration_minutes', 30))
+            end = end_time or schedule_time + timedelta(minutes=duration)
+            if Appointment.objects.overlapping(
+                recipient, schedule_time, end, exclude_pk=getattr(self.instance, 'pk', None)
+            ).exists():
+                raise serializers.ValidationError(_('Le destinataire a déjà un rendez-vous sur cette plage horaire.'))
+        
         return data
 
 class AppointmentCreateSerializer(AppointmentSerializer):
@@ -59,7 +85,11 @@ class AppointmentCreateSerializer(AppointmentSerializer):
     
     def create(self, validated_data):
         reminders_data = validated_data.pop('reminders', [])
-        appointment = Appointment.objects.create(**validated_data)
+        try:
+            appointment = Appointment.objects.create(**validated_data)
+        except DjangoValidationError as e:
+            # Conflit détecté sous verrou par une réservation concurrente
+            raise serializers.ValidationError(e.messages)
         
         # Créer les rappels
         for reminder_data in reminders_data:
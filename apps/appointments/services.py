@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Appointment, AppointmentReminder, BLOCKING_STATUSES
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre de rappels réservés par un worker à chaque passage
+REMINDER_BATCH_SIZE = 200
+
+REMINDER_NOTIFICATION_TYPE = 'appointment_reminder'
+
+# Au-delà de ce délai, une réservation est considérée comme abandonnée
+# (worker arrêté pendant l'envoi) et le rappel peut être repris
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Nouvelle tentative après un échec : délai multiplié par le nombre d'échecs
+RETRY_DELAY = timedelta(minutes=5)
+MAX_ATTEMPTS = 5
+
+
+class AppointmentReminderService:
+    """
+    Service d'envoi des rappels de rendez-vous arrivés à échéance.
+
+    Les rappels dus sont lus par l'index partiel sur fire_at et réservés
+    (claimed_at) dans une courte transaction avec SELECT ... FOR UPDATE SKIP
+    LOCKED : plusieurs workers peuvent tourner en parallèle sans envoyer deux
+    fois le même rappel. Les envois (email, push) ont lieu après la validation
+    de la réservation, hors transaction ; seuls les rappels envoyés sont
+    marqués comme tels, les autres sont reprogrammés pour une nouvelle
+    tentative, auprès des seuls participants qui ne l'ont pas reçu.
+    """
+
+    @classmethod
+    def due_reminders(cls, now=None):
+        """Rappels non envoyés ni réservés dont l'heure d'envoi est passée."""
+        now = now or timezone.now()
+        return AppointmentReminder.objects.filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT),
+            sent=False,
+            fire_at__lte=now,
+            appointment__status__in=BLOCKING_STATUSES
+        )
+
+    @classmethod
+    def claim_batch(cls, batch_size=REMINDER_BATCH_SIZE, now=None):
+        """
+        Réserve un lot de rappels dus et valide la réservation.
+
+        Returns:
+            Liste des rappels réservés
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            reminders = list(
+                cls.due_reminders(now)
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related('appointment__requester', 'appointment__recipient')
+                .order_by('fire_at')[:batch_size]
+            )
+            AppointmentReminder.objects.filter(
+                pk__in=[reminder.pk for reminder in reminders]
+            ).update(claimed_at=now)
+        return reminders
+
+    @classmethod
+    def dispatch_batch(cls, reminders, now=None):
+        """
+        Envoie un lot de rappels réservés, hors transaction, puis marque comme
+        envoyés ceux qui ont abouti et reprogramme les autres.
+
+        Args:
+            reminders: Rappels réservés par claim_batch
+            now: Date de référence (par défaut maintenant)
+
+        Returns:
+            Nombre de rappels envoyés
+        """
+        now = now or timezone.now()
+        sent, failed = [], []
+        for reminder in reminders:
+            (sent if cls.send_reminder(reminder) else failed).append(reminder)
+
+        if sent:
+            AppointmentReminder.mark_sent_bulk([reminder.pk for reminder in sent])
+            Appointment.objects.filter(
+                pk__in={reminder.appointment_id for reminder in sent}
+            ).update(reminder_sent=True)
+
+        for reminder in failed:
+            cls.record_failure(reminder, now)
+
+        return len(sent)
+
+    @classmethod
+    def record_failure(cls, reminder, now):
+        """
+        Libère un rappel dont l'envoi a échoué et le reprogramme, avec un délai
+        croissant ; il est abandonné (fire_at vide) après MAX_ATTEMPTS échecs.
+        """
+        attempts = reminder.attempts + 1
+        fire_at = now + RETRY_DELAY * attempts if attempts < MAX_ATTEMPTS else None
+        if fire_at is None:
+            logger.error(f"Rappel {reminder.pk} abandonné après {attempts} échecs")
+        AppointmentReminder.objects.filter(pk=reminder.pk).update(
+            claimed_at=None,
+            attempts=F('attempts') + 1,
+            fire_at=fire_at,
+            requester_notified=reminder.requester_notified,
+            recipient_notified=reminder.recipient_notified
+        )
+
+    @classmethod
+    def send_reminder(cls, reminder):
+        """
+        Envoie un rappel aux participants du rendez-vous qui ne l'ont pas encore
+        reçu, par le circuit de notifications, et note ceux qui l'ont reçu
+        (requester_notified, recipient_notified).
+
+        Returns:
+            True si le rappel a été remis aux deux participants
+        """
+        from apps.notifications.services import NotificationService
+
+        appointment = reminder.appointment
+        participants = (
+            ('requester_notified', appointment.requester, appointment.recipient),
+            ('recipient_notified', appointment.recipient, appointment.requester),
+        )
+        for flag, user, other in participants:
+            if getattr(reminder, flag):
+                continue
+            try:
+                notification = NotificationService.create_notification(
+                    user=user,
+                    notification_type_code=REMINDER_NOTIFICATION_TYPE,
+                    context={
+                        'appointment_id': appointment.id,
+                        'title': appointment.title,
+                        'other_name': other.get_full_name(),
+                        'schedule_time': timezone.localtime(appointment.schedule_time).strftime('%d/%m/%Y %H:%M'),
+                        'location': appointment.location,
+                        'meeting_link': appointment.meeting_link or '',
+                    },
+                    related_object=appointment
+                )
+                setattr(reminder, flag, notification is not None)
+            except Exception as e:
+                # Un échec d'envoi ne doit pas bloquer le reste du lot
+                logger.error(f"Erreur lors de l'envoi du rappel {reminder.pk} à l'utilisateur {user.pk}: {str(e)}")
+        return reminder.requester_notified and reminder.recipient_notified
+
+    @classmethod
+    def dispatch_due(cls, batch_size=REMINDER_BATCH_SIZE, now=None):
+        """
+        Envoie tous les rappels arrivés à échéance, lot par lot.
+
+        Returns:
+            Nombre total de rappels envoyés
+        """
+        total = 0
+        while True:
+            reminders = cls.claim_batch(batch_size=batch_size, now=now)
+            total += cls.dispatch_batch(reminders, now=now)
+            if len(reminders) < batch_size:
+                return total
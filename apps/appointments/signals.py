@@ -2,6 +2,7 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.conf import settings
+from apps.analytics.side_effects import remember_previous_state
 from .models import Appointment, AppointmentReminder
 
 @receiver(post_save, sender=Appointment)
@@ -24,20 +25,37 @@ def create_appointment_reminders(sender, instance, created, **kwargs):
             minutes_before=60  # 1 heure en minutes
         )
 
+# Capturer l'état précédent de l'instance pour les comparaisons.
+# Ce récepteur est enregistré en premier : les autres signaux réutilisent
+# l'instantané au lieu de relire la ligne chacun de leur côté. Un
+# enregistrement limité à d'autres champs ne relit pas la ligne.
+@receiver(pre_save, sender=Appointment)
+def store_old_instance(sender, instance, update_fields=None, **kwargs):
+    remember_previous_state(instance, update_fields, fields=('schedule_time', 'status'))
+
 @receiver(pre_save, sender=Appointment)
 def update_appointment_status_on_reschedule(sender, instance, **kwargs):
     """
     Met à jour le statut du rendez-vous si la date a été modifiée.
     """
-    if instance.pk:
-        try:
-            old_instance = Appointment.objects.get(pk=instance.pk)
-            if old_instance.schedule_time != instance.schedule_time:
-                # La date a été modifiée, marquer comme reporté
-                if instance.status == 'confirmed':
-                    instance.status = 'rescheduled'
-        except Appointment.DoesNotExist:
-            pass  # Nouvel objet, rien à faire
+    old_instance = getattr(instance, '_old_instance', None)
+    if old_instance and old_instance.schedule_time != instance.schedule_time:
+        # La date a été modifiée, marquer comme reporté
+        if instance.status == 'confirmed':
+            instance.status = 'rescheduled'
+
+@receiver(post_save, sender=Appointment)
+def refresh_reminder_fire_times(sender, instance, created, **kwargs):
+    """
+    Recalcule l'heure d'envoi des rappels si la date ou le statut du rendez-vous a changé.
+    """
+    old_instance = getattr(instance, '_old_instance', None)
+    if created or old_instance is None:
+        return
+    
+    if (old_instance.schedule_time != instance.schedule_time or
+            old_instance.status != instance.status):
+        AppointmentReminder.refresh_fire_times(instance)
 
 @receiver(pre_save, sender=Appointment)
 def calculate_end_time(sender, instance, **kwargs):
@@ -98,12 +116,3 @@ def notify_users_on_status_change(sender, instance, created, **kwargs):
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"Erreur lors de l'envoi des notifications de rendez-vous: {e}")
-
-# Capturer l'état précédent de l'instance pour les comparaisons
-@receiver(pre_save, sender=Appointment)
-def store_old_instance(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            instance._old_instance = Appointment.objects.get(pk=instance.pk)
-        except Appointment.DoesNotExist:
-            pass
\ No newline at end of file
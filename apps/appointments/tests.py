@@ -1,3 +1,204 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.notifications.models import Notification
+from apps.notifications.services import NotificationService
+from .models import Appointment, AppointmentReminder, AppointmentSlot
+from .services import AppointmentReminderService, RETRY_DELAY
+
+
+class AppointmentConflictTest(TestCase):
+    """
+    Tests pour la détection des chevauchements de rendez-vous.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.advisor = User.objects.create_user(
+            email='advisor@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Advisor',
+            type='advisor'
+        )
+        self.start = (timezone.now() + timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+        self.appointment = self._book(self.start, 60)
+
+    def _book(self, schedule_time, duration_minutes=30, **kwargs):
+        return Appointment.objects.create(
+            requester=self.student,
+            recipient=self.advisor,
+            title='Orientation',
+            schedule_time=schedule_time,
+            duration_minutes=duration_minutes,
+            **kwargs
+        )
+
+    def test_overlapping_booking_is_rejected(self):
+        """
+        Test qu'un rendez-vous chevauchant une plage occupée est refusé.
+        """
+        with self.assertRaises(ValidationError):
+            self._book(self.start + timedelta(minutes=30))
+
+        # Un rendez-vous qui commence à la fin du précédent est accepté
+        following = self._book(self.start + timedelta(minutes=60))
+        self.assertEqual(following.end_time, self.start + timedelta(minutes=90))
+
+    def test_cancelled_appointment_frees_the_slot(self):
+        """
+        Test qu'un rendez-vous annulé ne bloque plus la plage horaire.
+        """
+        self.appointment.cancel()
+        self._book(self.start + timedelta(minutes=15))
+
+        self.assertEqual(
+            Appointment.objects.overlapping(self.advisor, self.start, self.start + timedelta(hours=1)).count(),
+            1
+        )
+
+    def test_reschedule_uses_single_snapshot(self):
+        """
+        Test que la reprogrammation ne relit la ligne qu'une fois pour tous les signaux.
+        """
+        self.appointment.confirm()
+        new_start = self.start + timedelta(hours=3)
+
+        # Verrou du destinataire, vérification du chevauchement, instantané,
+        # mise à jour, points de sauvegarde de la transaction et recalcul des rappels
+        with self.assertNumQueries(8):
+            self.appointment.reschedule(new_start)
+
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.status, 'rescheduled')
+        self.assertEqual(self.appointment.end_time, new_start + timedelta(minutes=60))
+
+    def test_slot_availability(self):
+        """
+        Test de la disponibilité d'un créneau par requête de plage.
+        """
+        slot = AppointmentSlot.objects.create(
+            user=self.advisor,
+            day_of_week=self.start.weekday(),
+            start_time=(self.start - timedelta(hours=2)).time(),
+            end_time=(self.start + timedelta(hours=4)).time()
+        )
+
+        self.assertFalse(slot.is_available(self.start + timedelta(minutes=30)))
+        self.assertTrue(slot.is_available(self.start + timedelta(minutes=60)))
+        self.assertFalse(slot.is_available(self.start - timedelta(minutes=30), self.start + timedelta(minutes=1)))
+
+
+class AppointmentReminderServiceTest(TestCase):
+    """
+    Tests pour la file d'envoi des rappels de rendez-vous.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.advisor = User.objects.create_user(
+            email='advisor@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Advisor',
+            type='advisor'
+        )
+        self.start = (timezone.now() + timedelta(days=2)).replace(second=0, microsecond=0)
+        self.appointment = Appointment.objects.create(
+            requester=self.student,
+            recipient=self.advisor,
+            title='Orientation',
+            schedule_time=self.start
+        )
+
+    def test_fire_times_follow_reschedule_and_cancellation(self):
+        """
+        Test que l'heure d'envoi est recalculée à la reprogrammation et effacée à l'annulation.
+        """
+        reminder = self.appointment.reminders.get(minutes_before=60)
+        self.assertEqual(reminder.fire_at, self.start - timedelta(minutes=60))
+
+        new_start = self.start + timedelta(days=1)
+        self.appointment.reschedule(new_start)
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.fire_at, new_start - timedelta(minutes=60))
+
+        self.appointment.cancel()
+        self.assertFalse(self.appointment.reminders.filter(fire_at__isnull=False).exists())
+
+    def test_due_reminders_are_sent_once(self):
+        """
+        Test que seuls les rappels arrivés à échéance sont envoyés, une seule fois.
+        """
+        now = self.start - timedelta(minutes=30)
+
+        self.assertEqual(AppointmentReminderService.dispatch_due(batch_size=1, now=now), 2)
+        self.assertEqual(AppointmentReminderService.dispatch_due(now=now), 0)
+
+        self.assertFalse(AppointmentReminder.objects.filter(appointment=self.appointment, sent=False).exists())
+        self.assertEqual(
+            Notification.objects.filter(notification_type__code='appointment_reminder').count(),
+            4
+        )
+        self.appointment.refresh_from_db()
+        self.assertTrue(self.appointment.reminder_sent)
+
+    def test_failed_reminders_are_retried(self):
+        """
+        Test qu'un rappel non remis est libéré et reprogrammé au lieu d'être marqué comme envoyé.
+        """
+        now = self.start - timedelta(minutes=30)
+
+        with patch('apps.notifications.services.NotificationService.create_notification', side_effect=Exception('SMTP')):
+            self.assertEqual(AppointmentReminderService.dispatch_due(now=now), 0)
+
+        reminder = self.appointment.reminders.get(minutes_before=60)
+        self.assertFalse(reminder.sent)
+        self.assertIsNone(reminder.claimed_at)
+        self.assertEqual(reminder.attempts, 1)
+        self.assertEqual(reminder.fire_at, now + RETRY_DELAY)
+
+        self.assertEqual(AppointmentReminderService.dispatch_due(now=now + RETRY_DELAY), 2)
+
+    def test_retry_only_notifies_missed_participants(self):
+        """
+        Test qu'une nouvelle tentative ne prévient pas à nouveau le participant déjà prévenu.
+        """
+        now = self.start - timedelta(minutes=30)
+        create_notification = NotificationService.create_notification
+
+        def fail_for_advisor(user, *args, **kwargs):
+            if user == self.advisor:
+                raise Exception('Push indisponible')
+            return create_notification(user, *args, **kwargs)
+
+        with patch.object(NotificationService, 'create_notification', side_effect=fail_for_advisor):
+            self.assertEqual(AppointmentReminderService.dispatch_due(now=now), 0)
+        self.assertEqual(AppointmentReminderService.dispatch_due(now=now + RETRY_DELAY), 2)
 
-# Create your tests here.
+        reminders = Notification.objects.filter(notification_type__code='appointment_reminder')
+        self.assertEqual(reminders.filter(user=self.student).count(), 2)
+        self.assertEqual(reminders.filter(user=self.advisor).count(), 2)
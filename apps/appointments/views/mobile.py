@@ -8,6 +8,7 @@ from django.utils import timezone
 from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
@@ -18,6 +19,7 @@ from rest_framework.pagination import PageNumberPagination
 from datetime import datetime, timedelta, date
 import calendar
 
+from apps.analytics.fieldsets import SparseFieldsetViewMixin
 from ..models import Appointment, AppointmentException, AppointmentSlot
 from ..serializers import (
     AppointmentSerializer, AppointmentCreateSerializer, AppointmentUpdateSerializer,
@@ -352,11 +354,8 @@ class UserAvailabilityView(APIView):
                     continue
                 
                 # Vérifier s'il y a déjà un rendez-vous à cette heure
-                if Appointment.objects.filter(
-                    recipient=recipient,
-                    schedule_time__lte=current,
-                    end_time__gt=current,
-                    status__in=['confirmed', 'rescheduled']
+                if Appointment.objects.overlapping(
+                    recipient, current, current + timedelta(minutes=30)
                 ).exists():
                     current += timedelta(minutes=30)
                     continue
@@ -485,11 +484,8 @@ class NextAvailableSlotView(APIView):
                     continue
                 
                 # Vérifier s'il y a déjà un rendez-vous à cette heure
-                if Appointment.objects.filter(
-                    recipient=recipient,
-                    schedule_time__lte=current,
-                    end_time__gt=current,
-                    status__in=['confirmed', 'rescheduled']
+                if Appointment.objects.overlapping(
+                    recipient, current, current + timedelta(minutes=30)
                 ).exists():
                     current += timedelta(minutes=30)
                     continue
@@ -514,9 +510,10 @@ class NextAvailableSlotView(APIView):
             'available_slots': available_slots
         })
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
-    API endpoint pour les rendez-vous.
+    API endpoint pour les rendez-vous. En lecture, les relations chargées
+    suivent les champs demandés (?fields=, ?expand=).
     """
     permission_classes = [permissions.IsAuthenticated, IsRecipientOrRequester]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -634,7 +631,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         new_duration_minutes = request.data.get('duration_minutes', appointment.duration_minutes)
         
         # Reprogrammer le rendez-vous
-        appointment.reschedule(new_schedule_time, new_duration_minutes)
+        try:
+            appointment.reschedule(new_schedule_time, new_duration_minutes)
+        except DjangoValidationError as e:
+            return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
@@ -4,7 +4,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import (
     Conversation, ConversationParticipant, Message, 
-    MessageReaction, MessageRead
+    MessageReaction
 )
 
 
@@ -42,7 +42,7 @@ class ConversationAdmin(admin.ModelAdmin):
 
 
 class ConversationParticipantAdmin(admin.ModelAdmin):
-    list_display = ['user', 'conversation', 'is_admin', 'is_muted', 'notify_on_new_message', 'joined_at', 'last_read_at']
+    list_display = ['user', 'conversation', 'is_admin', 'is_muted', 'notify_on_new_message', 'joined_at', 'last_read_at', 'last_read_message_id']
     list_filter = ['is_admin', 'is_muted', 'notify_on_new_message', 'joined_at']
     search_fields = ['user__first_name', 'user__last_name', 'user__email', 'conversation__title']
     raw_id_fields = ['user', 'conversation']
@@ -55,12 +55,6 @@ class MessageReactionInline(admin.TabularInline):
     raw_id_fields = ['user']
 
 
-class MessageReadInline(admin.TabularInline):
-    model = MessageRead
-    extra = 0
-    raw_id_fields = ['user']
-
-
 class MessageAdmin(admin.ModelAdmin):
     list_display = ['id', 'conversation', 'sender', 'message_type', 'content_preview', 'created_at', 'is_edited', 'is_delivered']
     list_filter = ['message_type', 'is_edited', 'is_delivered', 'created_at']
@@ -68,7 +62,7 @@ class MessageAdmin(admin.ModelAdmin):
     raw_id_fields = ['sender', 'conversation', 'parent']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'created_at'
-    inlines = [MessageReactionInline, MessageReadInline]
+    inlines = [MessageReactionInline]
     
     def content_preview(self, obj):
         if obj.content and len(obj.content) > 50:
@@ -2,7 +2,8 @@ from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 
-from .models import Conversation, ConversationParticipant, Message, MessageReaction, MessageRead
+from .models import Conversation, ConversationParticipant, Message, MessageReaction
+from .services import MessagingService
 
 User = get_user_model()
 
@@ -56,6 +57,14 @@ class ConversationForm(forms.ModelForm):
         # Pour les messages directs, limiter à un seul participant
         if conversation_type == 'direct' and len(participants) > 1:
             self.add_error('participants', _("Les messages directs ne peuvent avoir qu'un seul destinataire."))
+        elif conversation_type == 'direct' and participants:
+            recipient = participants[0]
+            if recipient == self.user:
+                self.add_error('participants', _("Vous ne pouvez pas vous envoyer un message à vous-même."))
+            elif self.instance.pk and Conversation.objects.filter(
+                conversation_type='direct', **Conversation.direct_pair(self.user, recipient)
+            ).exclude(pk=self.instance.pk).exists():
+                self.add_error('participants', _("Une conversation directe existe déjà avec ce destinataire."))
         
         return cleaned_data
     
@@ -66,6 +75,15 @@ class ConversationForm(forms.ModelForm):
         if not instance.pk and self.user:
             instance.created_by = self.user
         
+        # Les conversations directes sont identifiées par leur paire d'utilisateurs
+        if instance.conversation_type == 'direct' and self.user and self.cleaned_data.get('participants'):
+            recipient = self.cleaned_data['participants'][0]
+            if not instance.pk and commit:
+                # Renvoie la conversation existante s'il y en a une
+                return MessagingService.create_direct_conversation(self.user, recipient)
+            for name, value in Conversation.direct_pair(self.user, recipient).items():
+                setattr(instance, name, value)
+        
         if commit:
             instance.save()
             
@@ -117,26 +135,8 @@ class DirectMessageForm(forms.Form):
         recipient = self.cleaned_data['recipient']
         message_content = self.cleaned_data['message']
         
-        # Vérifier s'il existe déjà une conversation directe entre ces utilisateurs
-        existing_conversations = Conversation.objects.filter(
-            conversation_type='direct',
-            participants__user=self.user
-        ).filter(
-            participants__user=recipient
-        ).distinct()
-        
-        if existing_conversations.exists():
-            conversation = existing_conversations.first()
-        else:
-            # Créer une nouvelle conversation
-            conversation = Conversation.objects.create(
-                conversation_type='direct',
-                created_by=self.user
-            )
-            
-            # Ajouter les participants
-            conversation.add_participant(self.user)
-            conversation.add_participant(recipient)
+        # Conversation directe existante ou nouvelle
+        conversation = MessagingService.create_direct_conversation(self.user, recipient)
         
         # Créer le message
         message = Message.objects.create(
@@ -224,16 +224,7 @@ class MessageForm(forms.ModelForm):
             # Mettre à jour la date de dernier message dans la conversation
             instance.conversation.update_last_message_time()
             
-            # Marquer le message comme lu par l'expéditeur
-            if self.user:
-                MessageRead.objects.create(message=instance, user=self.user)
-                
-                # Mettre à jour la date de dernière lecture pour l'expéditeur
-                participant = ConversationParticipant.objects.get(
-                    conversation=instance.conversation,
-                    user=self.user
-                )
-                participant.mark_as_read()
+            # Le curseur de lecture de l'expéditeur est avancé par le signal post_save
         
         return instance
 
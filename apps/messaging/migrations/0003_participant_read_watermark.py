@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-19 03:06
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def compact_message_reads(apps, schema_editor):
+    """
+    Convertit les lectures par message en curseurs de lecture par participant.
+    Les lignes MessageRead sont conservées : l'annulation de la migration
+    supprime simplement le champ, sans perte de données.
+    """
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+    MessageRead = apps.get_model('messaging', 'MessageRead')
+
+    # Curseur déduit de la date de dernière lecture (une seule requête)
+    ConversationParticipant.objects.update(
+        last_read_message_id=Subquery(
+            Message.objects.filter(
+                conversation_id=OuterRef('conversation_id'),
+                created_at__lte=OuterRef('last_read_at')
+            ).order_by('-id').values('id')[:1]
+        )
+    )
+
+    # Curseur déduit des lectures enregistrées, s'il est plus avancé
+    last_reads = {
+        (row['message__conversation_id'], row['user_id']): row['last_message_id']
+        for row in MessageRead.objects.values(
+            'message__conversation_id', 'user_id'
+        ).annotate(last_message_id=Max('message_id'))
+    }
+
+    participants = []
+    for participant in ConversationParticipant.objects.only(
+        'id', 'conversation_id', 'user_id', 'last_read_message_id'
+    ).iterator():
+        last_read = last_reads.get((participant.conversation_id, participant.user_id))
+        if last_read and last_read > (participant.last_read_message_id or 0):
+            participant.last_read_message_id = last_read
+            participants.append(participant)
+
+    ConversationParticipant.objects.bulk_update(participants, ['last_read_message_id'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_message_messaging_m_convers_f5b548_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_read_message_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='dernier message lu'),
+        ),
+        migrations.RunPython(compact_message_reads, migrations.RunPython.noop),
+    ]
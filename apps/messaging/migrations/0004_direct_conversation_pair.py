@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-19 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_direct_pairs(apps, schema_editor):
+    """
+    Renseigne la clé canonique des conversations directes à deux participants.
+    En cas de doublons, seule la conversation la plus récemment active reçoit
+    la clé ; les autres restent consultables mais ne sont plus proposées.
+    """
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+
+    members = {}
+    for conversation_id, user_id in ConversationParticipant.objects.filter(
+        conversation__conversation_type='direct'
+    ).values_list('conversation_id', 'user_id').iterator():
+        members.setdefault(conversation_id, []).append(user_id)
+
+    pairs = {}
+    conversations = Conversation.objects.filter(pk__in=members).only('id').order_by('-last_message_at', '-id')
+    for conversation in conversations.iterator():
+        user_ids = sorted(members[conversation.id])
+        if len(user_ids) != 2 or tuple(user_ids) in pairs:
+            continue
+        conversation.low_user_id, conversation.high_user_id = user_ids
+        pairs[tuple(user_ids)] = conversation
+
+    Conversation.objects.bulk_update(pairs.values(), ['low_user_id', 'high_user_id'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('messaging', '0003_participant_read_watermark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='high_user_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='low_user_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_direct_pairs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(condition=models.Q(('conversation_type', 'direct')), fields=('low_user_id', 'high_user_id'), name='unique_direct_conversation_pair'),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Case, F, Subquery, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -49,10 +52,22 @@ class Conversation(models.Model):
     object_id = models.PositiveIntegerField(null=True, blank=True)
     related_object = GenericForeignKey('content_type', 'object_id')
     
+    # Clé canonique des messages directs : identifiants des deux utilisateurs, le plus petit en premier
+    low_user_id = models.BigIntegerField(null=True, blank=True, editable=False)
+    high_user_id = models.BigIntegerField(null=True, blank=True, editable=False)
+    
     class Meta:
         verbose_name = _('conversation')
         verbose_name_plural = _('conversations')
         ordering = ['-last_message_at']
+        constraints = [
+            # Une seule conversation directe par paire d'utilisateurs
+            models.UniqueConstraint(
+                fields=['low_user_id', 'high_user_id'],
+                condition=models.Q(conversation_type='direct'),
+                name='unique_direct_conversation_pair'
+            ),
+        ]
     
     def __str__(self):
         if self.title:
@@ -66,6 +81,15 @@ class Conversation(models.Model):
         
         return f"Conversation #{self.id}"
     
+    @staticmethod
+    def direct_pair(user_1, user_2):
+        """
+        Renvoie la clé canonique (low_user_id, high_user_id) d'une conversation
+        directe entre deux utilisateurs (instances ou identifiants).
+        """
+        ids = sorted(getattr(user, 'pk', user) for user in (user_1, user_2))
+        return {'low_user_id': ids[0], 'high_user_id': ids[1]}
+    
     def get_participants(self):
         """
         Renvoie la liste des participants à la conversation.
@@ -103,14 +127,14 @@ class Conversation(models.Model):
         """
         return self.participants.count()
     
-    @property
     def unread_count(self, user):
         """
-        Renvoie le nombre de messages non lus pour un utilisateur.
+        Renvoie le nombre de messages non lus pour un utilisateur (au-delà de
+        son curseur de lecture).
         """
         try:
             participant = ConversationParticipant.objects.get(conversation=self, user=user)
-            return self.messages.filter(created_at__gt=participant.last_read_at).count()
+            return self.messages.filter(id__gt=participant.last_read_message_id or 0).count()
         except ConversationParticipant.DoesNotExist:
             return 0
 
@@ -142,6 +166,8 @@ class ConversationParticipant(models.Model):
     # Suivi de la lecture
     joined_at = models.DateTimeField(_('rejoint le'), auto_now_add=True)
     last_read_at = models.DateTimeField(_('dernier lu le'), auto_now_add=True)
+    # Curseur de lecture : tous les messages d'identifiant inférieur ou égal sont lus
+    last_read_message_id = models.BigIntegerField(_('dernier message lu'), null=True, blank=True)
     
     class Meta:
         verbose_name = _('participant de conversation')
@@ -151,18 +177,55 @@ class ConversationParticipant(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} dans {self.conversation}"
     
-    def mark_as_read(self):
+    def mark_as_read(self, message_id=None):
+        """
+        Marque la conversation comme lue pour ce participant, jusqu'au message
+        indiqué ou jusqu'au dernier message de la conversation.
+        
+        Le curseur de lecture n'avance jamais en arrière et la mise à jour est
+        une seule requête UPDATE, quel que soit le nombre de messages. La date
+        de dernière lecture n'avance que si le curseur atteint le dernier
+        message de la conversation.
+        """
+        latest = Coalesce(
+            Subquery(
+                Message.objects.filter(
+                    conversation_id=self.conversation_id
+                ).order_by('-id').values('id')[:1]
+            ),
+            Value(0)
+        )
+        now = timezone.now()
+        
+        if message_id is None:
+            self.last_read_at = now
+            ConversationParticipant.objects.filter(pk=self.pk).update(
+                last_read_at=now,
+                last_read_message_id=Greatest(Coalesce('last_read_message_id', Value(0)), latest)
+            )
+            return
+        
+        watermark = Greatest(Coalesce('last_read_message_id', Value(0)), Value(message_id))
+        ConversationParticipant.objects.filter(pk=self.pk).update(
+            last_read_at=Case(
+                When(GreaterThanOrEqual(watermark, latest), then=Value(now)),
+                default=F('last_read_at')
+            ),
+            last_read_message_id=watermark
+        )
+        self.last_read_message_id = max(self.last_read_message_id or 0, message_id)
+    
+    def has_read(self, message):
         """
-        Marque la conversation comme lue pour ce participant.
+        Indique si le participant a lu le message.
         """
-        self.last_read_at = timezone.now()
-        self.save(update_fields=['last_read_at'])
+        return self.last_read_message_id is not None and self.last_read_message_id >= message.id
     
     def has_unread_messages(self):
         """
         Vérifie si le participant a des messages non lus.
         """
-        return self.conversation.messages.filter(created_at__gt=self.last_read_at).exists()
+        return self.conversation.messages.filter(id__gt=self.last_read_message_id or 0).exists()
 
 
 class Message(models.Model):
@@ -235,6 +298,10 @@ class Message(models.Model):
         verbose_name = _('message')
         verbose_name_plural = _('messages')
         ordering = ['created_at']
+        indexes = [
+            # Pagination par clé de l'historique d'une conversation
+            models.Index(fields=['conversation', 'id']),
+        ]
     
     def __str__(self):
         if self.message_type == 'text':
@@ -271,6 +338,22 @@ class Message(models.Model):
             self.updated_at = timezone.now()
             self.save(update_fields=['content', 'is_edited', 'updated_at'])
     
+    def get_readers(self):
+        """
+        Renvoie les participants qui ont lu le message, par comparaison de
+        leur curseur de lecture avec l'identifiant du message.
+        """
+        return ConversationParticipant.objects.filter(
+            conversation_id=self.conversation_id,
+            last_read_message_id__gte=self.id
+        ).select_related('user')
+    
+    def is_read_by(self, user):
+        """
+        Indique si le message a été lu par l'utilisateur.
+        """
+        return self.get_readers().filter(user=user).exists()
+    
     @property
     def is_system_message(self):
         """
@@ -317,6 +400,11 @@ class MessageReaction(models.Model):
 class MessageRead(models.Model):
     """
     Modèle représentant la lecture d'un message par un utilisateur.
+    
+    Obsolète : les lectures sont suivies par le curseur
+    ConversationParticipant.last_read_message_id (voir Message.get_readers).
+    La table n'est plus alimentée ; ses lignes ont été compactées en curseurs
+    et sont conservées jusqu'à la suppression du modèle.
     """
     message = models.ForeignKey(
         Message,
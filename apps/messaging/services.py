@@ -6,11 +6,16 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 
 import logging
-from .models import Conversation, ConversationParticipant, Message, MessageRead
+from collections import Counter
+from .models import Conversation, ConversationParticipant, Message
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Nombre de messages renvoyés par page d'historique
+MESSAGE_HISTORY_PAGE_SIZE = 50
+MESSAGE_HISTORY_MAX_PAGE_SIZE = 200
+
 
 class MessagingService:
     """
@@ -29,30 +34,29 @@ class MessagingService:
         Returns:
             La conversation créée ou existante
         """
-        # Vérifier si une conversation directe existe déjà
-        direct_conversations = Conversation.objects.filter(
-            conversation_type='direct'
-        ).filter(
-            participants__user=user_1
-        ).filter(
-            participants__user=user_2
-        ).distinct()
-        
-        if direct_conversations.exists():
-            return direct_conversations.first()
-        
-        # Créer une nouvelle conversation
+        # Recherche par la clé canonique de la paire (index unique)
+        pair = Conversation.direct_pair(user_1, user_2)
+        try:
+            return Conversation.objects.get(conversation_type='direct', **pair)
+        except Conversation.DoesNotExist:
+            pass
+        
+        # La contrainte d'unicité départage deux créations simultanées
         with transaction.atomic():
-            conversation = Conversation.objects.create(
+            conversation, created = Conversation.objects.get_or_create(
                 conversation_type='direct',
-                created_by=user_1
+                **pair,
+                defaults={'created_by': user_1}
             )
             
             # Ajouter les participants
-            conversation.add_participant(user_1)
-            conversation.add_participant(user_2)
-            
-            return conversation
+            if created:
+                ConversationParticipant.objects.bulk_create([
+                    ConversationParticipant(conversation=conversation, user=user_1),
+                    ConversationParticipant(conversation=conversation, user=user_2),
+                ])
+        
+        return conversation
     
     @classmethod
     def send_direct_message(cls, sender, recipient, content, message_type='text'):
@@ -79,15 +83,7 @@ class MessagingService:
             content=content
         )
         
-        # Marquer comme lu par l'expéditeur
-        MessageRead.objects.create(message=message, user=sender)
-        
-        # Mettre à jour la dernière lecture de l'expéditeur
-        participant = ConversationParticipant.objects.get(
-            conversation=conversation,
-            user=sender
-        )
-        participant.mark_as_read()
+        # Le message est marqué comme lu par l'expéditeur par le signal post_save
         
         # Mettre à jour la date du dernier message
         conversation.update_last_message_time()
@@ -226,4 +222,63 @@ class MessagingService:
                 content=message
             )
             
-            return conversation
\ No newline at end of file
+            return conversation
+    
+    @classmethod
+    def get_message_history(cls, conversation, before=None, limit=MESSAGE_HISTORY_PAGE_SIZE):
+        """
+        Renvoie une page de l'historique d'une conversation, des plus récents
+        aux plus anciens, par pagination par clé (?before=<id de message>).
+        
+        Les réactions sont préchargées et les lectures déduites des curseurs
+        des participants : le nombre de requêtes ne dépend pas du nombre de messages.
+        
+        Args:
+            conversation: Conversation concernée
+            before: Identifiant du plus ancien message déjà chargé (facultatif)
+            limit: Nombre maximal de messages à renvoyer
+            
+        Returns:
+            Tuple (messages dans l'ordre chronologique, existence de messages plus anciens)
+        """
+        limit = max(1, min(limit, MESSAGE_HISTORY_MAX_PAGE_SIZE))
+        
+        queryset = Message.objects.filter(conversation=conversation)
+        if before is not None:
+            queryset = queryset.filter(id__lt=before)
+        
+        # Un message de plus pour savoir s'il reste un historique à charger
+        page = list(
+            queryset.select_related('sender').prefetch_related(
+                'reactions'
+            ).order_by('-id')[:limit + 1]
+        )
+        has_more = len(page) > limit
+        page = page[:limit]
+        page.reverse()
+        
+        participants = list(conversation.get_participants())
+        for message in page:
+            message.read_by = [participant for participant in participants if participant.has_read(message)]
+            message.all_reactions = message.reactions.all()
+        
+        return page, has_more
+    
+    @staticmethod
+    def serialize_message(message):
+        """
+        Prépare la représentation JSON d'un message de l'historique, avec le
+        nombre de lectures et le décompte des réactions.
+        """
+        return {
+            'id': message.id,
+            'content': message.content,
+            'created_at': message.created_at.isoformat(),
+            'sender_name': message.sender.get_full_name() if message.sender else None,
+            'sender_id': message.sender_id,
+            'message_type': message.message_type,
+            'is_edited': message.is_edited,
+            'parent_id': message.parent_id,
+            'read_count': len(message.read_by),
+            'reactions': dict(Counter(reaction.reaction for reaction in message.all_reactions)),
+        }
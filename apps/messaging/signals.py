@@ -2,36 +2,50 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Message, MessageRead
+from .models import Message
 
 
 @receiver(post_save, sender=Message)
 def handle_new_message(sender, instance, created, **kwargs):
     """
     Signal pour gérer les nouveaux messages.
-    - Marque automatiquement le message comme lu par l'expéditeur
-    - Met à jour la date de dernière lecture de l'expéditeur
+    - Diffuse le message en temps réel aux participants connectés
+    - Avance le curseur de lecture de l'expéditeur jusqu'à ce message
     - Envoie une notification aux autres participants si nécessaire
     """
     if created:
+        from .models import ConversationParticipant
+        
+        # Diffuser le message en temps réel à tous les participants
+        from apps.notifications.realtime import publish_to_users
+        publish_to_users(
+            ConversationParticipant.objects.filter(
+                conversation_id=instance.conversation_id
+            ).values_list('user_id', flat=True),
+            'message',
+            {
+                'id': instance.id,
+                'conversation_id': instance.conversation_id,
+                'sender_id': instance.sender_id,
+                'sender_name': instance.sender.get_full_name() if instance.sender else None,
+                'message_type': instance.message_type,
+                'content': instance.content,
+                'created_at': instance.created_at,
+            }
+        )
+        
         # Pour les messages systèmes, ne rien faire de spécial
         if instance.message_type == 'system' or not instance.sender:
             return
         
-        # Marquer le message comme lu par l'expéditeur
-        MessageRead.objects.get_or_create(message=instance, user=instance.sender)
-        
-        # Mettre à jour la date de dernière lecture de l'expéditeur
-        from .models import ConversationParticipant
-        try:
-            participant = ConversationParticipant.objects.get(
-                conversation=instance.conversation,
-                user=instance.sender
-            )
-            participant.last_read_at = timezone.now()
-            participant.save(update_fields=['last_read_at'])
-        except ConversationParticipant.DoesNotExist:
-            pass
+        # Marquer le message comme lu par l'expéditeur (une seule mise à jour)
+        ConversationParticipant.objects.filter(
+            conversation_id=instance.conversation_id,
+            user=instance.sender
+        ).update(
+            last_read_at=timezone.now(),
+            last_read_message_id=instance.id
+        )
         
         # Notifier les autres participants si nécessaire
         try:
@@ -1,3 +1,197 @@
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 
-# Create your tests here.
+from apps.accounts.models import User
+from .forms import ConversationForm, DirectMessageForm
+from .models import Conversation, Message, MessageReaction
+from .services import MessagingService
+
+
+class MessageHistoryTest(TestCase):
+    """
+    Tests pour l'historique des messages paginé par clé.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.advisor = User.objects.create_user(
+            email='advisor@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Advisor',
+            type='advisor'
+        )
+        self.conversation = MessagingService.create_direct_conversation(self.student, self.advisor)
+        self.messages = [
+            Message.objects.create(
+                conversation=self.conversation,
+                sender=self.student if index % 2 else self.advisor,
+                content=f'Message {index}'
+            )
+            for index in range(12)
+        ]
+        for message in self.messages:
+            MessageReaction.objects.create(message=message, user=self.advisor, reaction='👍')
+
+    def test_history_pages_are_keyset_paginated(self):
+        """
+        Test que les pages successives couvrent l'historique sans doublon.
+        """
+        with self.assertNumQueries(3):
+            latest, has_more = MessagingService.get_message_history(self.conversation, limit=5)
+            payload = [MessagingService.serialize_message(message) for message in latest]
+
+        self.assertTrue(has_more)
+        self.assertEqual([message.id for message in latest], [message.id for message in self.messages[-5:]])
+        self.assertEqual(payload[-1]['reactions'], {'👍': 1})
+        self.assertEqual(payload[-1]['read_count'], 1)
+
+        older, has_more = MessagingService.get_message_history(self.conversation, before=latest[0].id, limit=10)
+        self.assertFalse(has_more)
+        self.assertEqual([message.id for message in older], [message.id for message in self.messages[:7]])
+
+    def test_history_endpoint(self):
+        """
+        Test de l'API de chargement des messages plus anciens.
+        """
+        url = f'/api/messaging/{self.conversation.id}/messages/'
+        self.client.force_login(self.student)
+
+        response = self.client.get(url, {'limit': 10})
+        data = response.json()
+        self.assertEqual(len(data['messages']), 10)
+        self.assertEqual(data['next_before'], self.messages[2].id)
+
+        data = self.client.get(url, {'before': data['next_before']}).json()
+        self.assertEqual([message['content'] for message in data['messages']], ['Message 0', 'Message 1'])
+        self.assertFalse(data['has_more'])
+
+        outsider = User.objects.create_user(
+            email='outsider@example.com',
+            password='securepass123',
+            first_name='Other',
+            last_name='User',
+            type='student',
+            is_active=True
+        )
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_read_receipts_use_watermarks(self):
+        """
+        Test que la lecture d'une conversation avance un curseur en une seule requête.
+        """
+        participant = self.conversation.participants.get(user=self.advisor)
+        last_message = self.messages[-1]
+
+        # Envoyer un message vaut lecture de tout ce qui précède
+        self.assertTrue(self.messages[-2].is_read_by(self.advisor))
+        self.assertFalse(last_message.is_read_by(self.advisor))
+        self.assertTrue(participant.has_unread_messages())
+
+        # Lire un ancien message ne vaut pas lecture de la conversation
+        last_read_at = participant.last_read_at
+        participant.mark_as_read(self.messages[0].id)
+        participant.refresh_from_db()
+        self.assertEqual(participant.last_read_at, last_read_at)
+        self.assertEqual(self.conversation.unread_count(self.advisor), 1)
+
+        with self.assertNumQueries(1):
+            participant.mark_as_read()
+        self.assertEqual(self.conversation.unread_count(self.advisor), 0)
+
+        self.assertEqual(
+            sorted(reader.user_id for reader in last_message.get_readers()),
+            sorted([self.student.id, self.advisor.id])
+        )
+
+        # Le curseur ne recule jamais
+        participant.mark_as_read(self.messages[0].id)
+        participant.refresh_from_db()
+        self.assertEqual(participant.last_read_message_id, last_message.id)
+        self.assertFalse(participant.has_unread_messages())
+
+
+class DirectConversationTest(TestCase):
+    """
+    Tests pour la clé canonique des conversations directes.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.advisor = User.objects.create_user(
+            email='advisor@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Advisor',
+            type='advisor'
+        )
+
+    def test_direct_conversation_is_unique_per_pair(self):
+        """
+        Test qu'une paire d'utilisateurs n'a qu'une conversation directe, trouvée en une requête.
+        """
+        conversation = MessagingService.create_direct_conversation(self.student, self.advisor)
+        self.assertEqual(conversation.participants.count(), 2)
+        self.assertEqual(conversation.low_user_id, min(self.student.id, self.advisor.id))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(MessagingService.create_direct_conversation(self.advisor, self.student), conversation)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(
+                conversation_type='direct',
+                **Conversation.direct_pair(self.advisor, self.student)
+            )
+
+    def test_direct_message_form_reuses_conversation(self):
+        """
+        Test que le formulaire de message direct réutilise la conversation existante.
+        """
+        conversation = MessagingService.create_direct_conversation(self.student, self.advisor)
+        form = DirectMessageForm(
+            {'recipient': self.student.id, 'message': 'Bonjour'},
+            user=self.advisor
+        )
+        form.fields['recipient'].queryset = User.objects.all()
+        self.assertTrue(form.is_valid(), form.errors)
+
+        saved_conversation, message = form.save()
+        self.assertEqual(saved_conversation, conversation)
+        self.assertEqual(message.conversation, conversation)
+
+    def test_conversation_form_creates_direct_pair(self):
+        """
+        Test que le formulaire de conversation passe par la paire canonique des conversations directes.
+        """
+        data = {'conversation_type': 'direct', 'participants': [self.student.id]}
+        form = ConversationForm(data, user=self.advisor)
+        form.fields['participants'].queryset = User.objects.all()
+        self.assertTrue(form.is_valid(), form.errors)
+        conversation = form.save()
+        self.assertEqual(conversation.high_user_id, max(self.student.id, self.advisor.id))
+        self.assertEqual(conversation.participants.count(), 2)
+
+        form = ConversationForm(data, user=self.advisor)
+        form.fields['participants'].queryset = User.objects.all()
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save(), conversation)
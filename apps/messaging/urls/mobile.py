@@ -12,6 +12,7 @@ urlpatterns = [
     path('direct/', views.DirectMessageCreateView.as_view(), name='direct_message_create_no_recipient'),
     
     # Messages
+    path('<int:pk>/messages/', views.message_history, name='message_history'),
     path('<int:conversation_id>/messages/create/', views.MessageCreateView.as_view(), name='message_create'),
     path('messages/<int:pk>/mark-as-read/', views.mark_message_as_read, name='mark_message_as_read'),
     path('<int:pk>/mark-as-read/', views.mark_conversation_as_read, name='mark_conversation_as_read'),
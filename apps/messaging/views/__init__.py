@@ -7,6 +7,7 @@ from .mobile import (
     ConversationCreateView,
     DirectMessageCreateView,
     MessageCreateView,
+    message_history,
     mark_message_as_read,
     mark_conversation_as_read,
     add_reaction,
@@ -27,6 +28,7 @@ __all__ = [
     'ConversationCreateView',
     'DirectMessageCreateView',
     'MessageCreateView',
+    'message_history',
     'mark_message_as_read',
     'mark_conversation_as_read',
     'add_reaction',
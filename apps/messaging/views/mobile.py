@@ -14,16 +14,28 @@ from django.contrib.auth.decorators import login_required
 
 from ..models import (
     Conversation, ConversationParticipant, Message, 
-    MessageReaction, MessageRead
+    MessageReaction
 )
 from ..forms import (
     ConversationForm, DirectMessageForm, MessageForm, 
     MessageReactionForm
 )
+from ..services import MessagingService, MESSAGE_HISTORY_PAGE_SIZE
+from apps.analytics.instrumentation import query_budget
 
 User = get_user_model()
 
 
+def parse_int_param(value):
+    """
+    Convertit un paramètre de requête en entier, ou None s'il est absent ou invalide.
+    """
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
 class ConversationListView(LoginRequiredMixin, ListView):
     """
     Vue pour afficher la liste des conversations de l'utilisateur.
@@ -71,7 +83,7 @@ class ConversationListView(LoginRequiredMixin, ListView):
                 )
                 unread_count = Message.objects.filter(
                     conversation=conversation,
-                    created_at__gt=participant.last_read_at
+                    id__gt=participant.last_read_message_id or 0
                 ).exclude(sender=self.request.user).count()
             except ConversationParticipant.DoesNotExist:
                 unread_count = 0
@@ -112,17 +124,15 @@ class ConversationDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         conversation = self.object
         
-        # Récupérer les messages avec pagination
-        messages_list = Message.objects.filter(
-            conversation=conversation
-        ).select_related('sender').order_by('created_at')
-        
-        # Ajouter les lectures et réactions pour chaque message
-        for message in messages_list:
-            message.read_by = message.reads.all()
-            message.all_reactions = message.reactions.all()
+        # Récupérer les derniers messages, les plus anciens sont chargés à la demande
+        messages_list, has_more = MessagingService.get_message_history(
+            conversation,
+            before=parse_int_param(self.request.GET.get('before'))
+        )
         
         context['messages_list'] = messages_list
+        context['has_older_messages'] = has_more
+        context['oldest_message_id'] = messages_list[0].id if messages_list else None
         
         # Ajouter les participants
         context['participants'] = ConversationParticipant.objects.filter(
@@ -249,6 +259,33 @@ class MessageCreateView(LoginRequiredMixin, CreateView):
         return redirect('messaging:conversation_detail', pk=self.conversation.pk)
 
 
+@query_budget(7)
+@login_required
+def message_history(request, pk):
+    """
+    Vue API renvoyant l'historique d'une conversation par pages, pour le
+    défilement infini (?before=<id du plus ancien message chargé>&limit=<n>).
+    """
+    conversation = get_object_or_404(Conversation, pk=pk)
+    
+    # Vérifier que l'utilisateur est participant à la conversation
+    if not ConversationParticipant.objects.filter(conversation=conversation, user=request.user).exists():
+        return JsonResponse({'error': _("Vous n'êtes pas autorisé à accéder à cette conversation.")}, status=403)
+    
+    limit = parse_int_param(request.GET.get('limit')) or MESSAGE_HISTORY_PAGE_SIZE
+    messages_list, has_more = MessagingService.get_message_history(
+        conversation,
+        before=parse_int_param(request.GET.get('before')),
+        limit=limit
+    )
+    
+    return JsonResponse({
+        'messages': [MessagingService.serialize_message(message) for message in messages_list],
+        'has_more': has_more,
+        'next_before': messages_list[0].id if has_more else None,
+    })
+
+
 @login_required
 @require_POST
 def mark_message_as_read(request, pk):
@@ -258,15 +295,18 @@ def mark_message_as_read(request, pk):
     message = get_object_or_404(Message, pk=pk)
     
     # Vérifier que l'utilisateur est participant à la conversation
-    if not ConversationParticipant.objects.filter(conversation=message.conversation, user=request.user).exists():
+    participant = ConversationParticipant.objects.filter(
+        conversation_id=message.conversation_id,
+        user=request.user
+    ).first()
+    if participant is None:
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({'error': _("Vous n'êtes pas autorisé à accéder à ce message.")}, status=403)
         
         return HttpResponseForbidden()
     
-    # Marquer le message comme lu s'il ne l'est pas déjà
-    if not MessageRead.objects.filter(message=message, user=request.user).exists():
-        MessageRead.objects.create(message=message, user=request.user)
+    # Avancer le curseur de lecture jusqu'à ce message
+    participant.mark_as_read(message.id)
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'status': 'success'})
@@ -292,22 +332,7 @@ def mark_conversation_as_read(request, pk):
         messages.error(request, _("Vous n'êtes pas participant à cette conversation."))
         return redirect('messaging:conversation_list')
     
-    # Marquer tous les messages comme lus
-    messages_to_read = Message.objects.filter(
-        conversation=conversation
-    ).exclude(
-        reads__user=request.user
-    )
-    
-    reads_to_create = [
-        MessageRead(message=message, user=request.user)
-        for message in messages_to_read
-    ]
-    
-    if reads_to_create:
-        MessageRead.objects.bulk_create(reads_to_create)
-    
-    # Mettre à jour la date de dernière lecture
+    # Marquer tous les messages comme lus en avançant le curseur de lecture
     participant.mark_as_read()
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
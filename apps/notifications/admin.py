@@ -28,6 +28,9 @@ class NotificationTypeAdmin(admin.ModelAdmin):
         (_('Paramètres'), {
             'fields': ('is_active', 'default_user_preference')
         }),
+        (_('Conservation'), {
+            'fields': ('retention_days', 'max_per_user', 'collapse_unread')
+        }),
     )
 
 
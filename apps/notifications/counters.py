@@ -0,0 +1,96 @@
+"""
+Compteurs de notifications par utilisateur et par statut.
+
+Les trois compteurs (non lues, lues, archivées) sont conservés dans le cache et
+modifiés par incrément/décrément atomique après la validation de chaque
+transaction qui change le statut d'une notification. Le badge de notifications
+ne lit donc jamais la table Notification tant que les compteurs sont en cache ;
+en cas d'absence, ils sont reconstruits par une seule agrégation conditionnelle.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+STATUSES = ('unread', 'read', 'archived')
+
+# Durée de vie des compteurs : borne la durée d'une éventuelle dérive
+COUNTERS_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id, status):
+    return f'notification_count_{user_id}_{status}'
+
+
+def get_counts(user_id):
+    """
+    Renvoie les compteurs de notifications d'un utilisateur.
+
+    Returns:
+        Dictionnaire {'unread': n, 'read': n, 'archived': n}
+    """
+    keys = {status: _cache_key(user_id, status) for status in STATUSES}
+    cached = cache.get_many(keys.values())
+    if len(cached) == len(keys):
+        return {status: cached[key] for status, key in keys.items()}
+
+    return rebuild_counts(user_id)
+
+
+def rebuild_counts(user_id):
+    """
+    Recalcule les trois compteurs en une seule requête et les met en cache.
+    """
+    from .models import Notification
+
+    counts = Notification.objects.filter(user_id=user_id).aggregate(**{
+        status: Count('id', filter=Q(status=status))
+        for status in STATUSES
+    })
+    cache.set_many(
+        {_cache_key(user_id, status): counts[status] for status in STATUSES},
+        COUNTERS_TIMEOUT
+    )
+    return counts
+
+
+def invalidate_counts(user_id):
+    """Supprime les compteurs d'un utilisateur ; ils seront reconstruits à la lecture."""
+    cache.delete_many([_cache_key(user_id, status) for status in STATUSES])
+
+
+def invalidate_users_counts(user_ids):
+    """
+    Supprime les compteurs de plusieurs utilisateurs après validation de la
+    transaction en cours, par exemple après une suppression en masse.
+    """
+    keys = [_cache_key(user_id, status) for user_id in set(user_ids) for status in STATUSES]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def record_transition(user_id, old_status=None, new_status=None, count=1):
+    """
+    Reporte un changement de statut sur les compteurs après validation de la
+    transaction en cours.
+
+    Args:
+        user_id: Identifiant du destinataire des notifications
+        old_status: Statut précédent (None pour une création)
+        new_status: Nouveau statut (None pour une suppression)
+        count: Nombre de notifications concernées
+    """
+    if old_status == new_status or not count:
+        return
+
+    def apply():
+        try:
+            if old_status:
+                cache.decr(_cache_key(user_id, old_status), count)
+            if new_status:
+                cache.incr(_cache_key(user_id, new_status), count)
+        except ValueError:
+            # Compteur absent ou expiré : reconstruction complète à la prochaine lecture
+            invalidate_counts(user_id)
+
+    transaction.on_commit(apply)
@@ -16,7 +16,8 @@ class NotificationTypeForm(forms.ModelForm):
         fields = [
             'code', 'name', 'description', 'title_template', 'body_template',
             'has_email', 'has_in_app', 'has_push', 'icon', 'color',
-            'is_active', 'default_user_preference', 'order'
+            'is_active', 'default_user_preference', 'order',
+            'retention_days', 'max_per_user', 'collapse_unread'
         ]
         widgets = {
             'code': forms.TextInput(attrs={'class': 'form-control'}),
@@ -27,6 +28,9 @@ class NotificationTypeForm(forms.ModelForm):
             'icon': forms.TextInput(attrs={'class': 'form-control'}),
             'color': forms.TextInput(attrs={'class': 'form-control'}),
             'order': forms.NumberInput(attrs={'class': 'form-control', 'min': '0'}),
+            'retention_days': forms.NumberInput(attrs={'class': 'form-control', 'min': '0'}),
+            'max_per_user': forms.NumberInput(attrs={'class': 'form-control', 'min': '0'}),
+            'collapse_unread': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'has_email': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'has_in_app': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'has_push': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.models import NotificationType
+from apps.notifications.services import NotificationRetentionService, PURGE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Applique les politiques de conservation des types de notification.
+    """
+    help = "Regroupe les rafales de notifications non lues, supprime les notifications expirées et applique les plafonds par utilisateur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE,
+                            help="Nombre maximal de lignes supprimées par transaction")
+        parser.add_argument('--type', action='append', dest='types',
+                            help="Limiter la purge à ce code de type de notification (option répétable)")
+
+    def handle(self, *args, **options):
+        notification_types = None
+        if options['types']:
+            notification_types = NotificationType.objects.filter(code__in=options['types'])
+
+        report = NotificationRetentionService.purge(
+            notification_types=notification_types,
+            batch_size=options['batch_size']
+        )
+
+        total_rows = 0
+        total_bytes = 0
+        for code, stats in report.items():
+            rows = stats['collapsed'] + stats['expired'] + stats['capped']
+            total_rows += rows
+            total_bytes += stats['bytes']
+            self.stdout.write(
+                f"{code} : {stats['collapsed']} regroupée(s), {stats['expired']} expirée(s), "
+                f"{stats['capped']} au-delà du plafond, ~{stats['bytes']} octet(s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_rows} notification(s) supprimée(s), environ {total_bytes} octet(s) libéré(s)."
+        ))
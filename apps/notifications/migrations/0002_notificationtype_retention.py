@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationtype',
+            name='collapse_unread',
+            field=models.BooleanField(default=False, help_text="Les notifications non lues ayant la même URL d'action sont fusionnées en une seule.", verbose_name='regrouper les notifications non lues'),
+        ),
+        migrations.AddField(
+            model_name='notificationtype',
+            name='max_per_user',
+            field=models.PositiveIntegerField(blank=True, help_text='Seules les notifications les plus récentes sont conservées. Vide : pas de limite.', null=True, verbose_name='nombre maximal par utilisateur'),
+        ),
+        migrations.AddField(
+            model_name='notificationtype',
+            name='retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='Les notifications lues ou archivées plus anciennes sont supprimées. Vide : pas de limite.', null=True, verbose_name='conservation des notifications lues (jours)'),
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 
+from .counters import record_transition
+
 
 class NotificationType(models.Model):
     """
@@ -34,6 +36,25 @@ class NotificationType(models.Model):
     # Pour l'ordre d'affichage dans les paramètres
     order = models.PositiveIntegerField(_('ordre'), default=0)
     
+    # Politique de conservation (appliquée par la commande purge_notifications)
+    retention_days = models.PositiveIntegerField(
+        _('conservation des notifications lues (jours)'),
+        null=True,
+        blank=True,
+        help_text=_('Les notifications lues ou archivées plus anciennes sont supprimées. Vide : pas de limite.')
+    )
+    max_per_user = models.PositiveIntegerField(
+        _('nombre maximal par utilisateur'),
+        null=True,
+        blank=True,
+        help_text=_('Seules les notifications les plus récentes sont conservées. Vide : pas de limite.')
+    )
+    collapse_unread = models.BooleanField(
+        _('regrouper les notifications non lues'),
+        default=False,
+        help_text=_('Les notifications non lues ayant la même URL d\'action sont fusionnées en une seule.')
+    )
+    
     class Meta:
         verbose_name = _('type de notification')
         verbose_name_plural = _('types de notification')
@@ -146,6 +167,18 @@ class Notification(models.Model):
     def __str__(self):
         return f"{self.title} - {self.user.get_full_name()} ({self.get_status_display()})"
     
+    def delete(self, *args, **kwargs):
+        """
+        Supprime la notification et décrémente le compteur de l'utilisateur.
+        
+        Le compteur n'est pas suivi par un signal post_delete, qui empêcherait
+        les suppressions en masse (QuerySet.delete()) de s'exécuter en une
+        seule requête : elles invalident elles-mêmes les compteurs concernés.
+        """
+        result = super().delete(*args, **kwargs)
+        record_transition(self.user_id, old_status=self.status)
+        return result
+    
     def mark_as_read(self):
         """
         Marque la notification comme lue.
@@ -154,22 +187,27 @@ class Notification(models.Model):
             self.status = 'read'
             self.read_at = timezone.now()
             self.save(update_fields=['status', 'read_at'])
+            record_transition(self.user_id, 'unread', 'read')
     
     def mark_as_unread(self):
         """
         Marque la notification comme non lue.
         """
+        old_status = self.status
         self.status = 'unread'
         self.read_at = None
         self.save(update_fields=['status', 'read_at'])
+        record_transition(self.user_id, old_status, 'unread')
     
     def archive(self):
         """
         Archive la notification.
         """
+        old_status = self.status
         self.status = 'archived'
         self.archived_at = timezone.now()
         self.save(update_fields=['status', 'archived_at'])
+        record_transition(self.user_id, old_status, 'archived')
     
     @property
     def is_read(self):
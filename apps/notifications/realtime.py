@@ -0,0 +1,255 @@
+"""
+Diffusion en temps réel des messages et notifications.
+
+Les événements sont publiés sur un bus de publication/abonnement, un canal par
+utilisateur, et relayés aux clients connectés par Server-Sent Events à travers
+le point d'entrée ASGI (education_platform/asgi.py).
+
+Le bus par défaut fonctionne dans le processus courant. Le backend est choisi par
+le paramètre REALTIME_BACKEND (chemin d'une classe dérivée de BaseBackend) : un
+déploiement multi-processus peut y brancher un bus partagé, et les tests un
+substitut local.
+
+Un client inactif ne coûte aucune requête : il attend sur une file asyncio et ne
+reçoit qu'un commentaire de maintien de connexion périodique.
+
+Le flux exige un serveur ASGI (par exemple gunicorn avec des workers
+uvicorn.workers.UvicornWorker, ou daphne) : sous WSGI, Django consomme un
+itérateur asynchrone en entier avant de l'envoyer et un flux sans fin bloquerait
+le worker. Servie par WSGI, la vue répond 503 ; les clients se rabattent alors
+sur les points d'entrée de comptage.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'apps.notifications.realtime.InProcessBackend'
+
+# Intervalle entre deux commentaires de maintien de connexion (secondes)
+KEEPALIVE_INTERVAL = 15
+
+# Nombre maximal d'événements en attente par abonné avant de les abandonner
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    """Nom du canal d'un utilisateur."""
+    return f'user:{user_id}'
+
+
+class Subscription:
+    """
+    Abonnement d'un client à un canal : une file asyncio liée à la boucle
+    d'événements de la connexion.
+    """
+    def __init__(self, channel, loop=None):
+        self.channel = channel
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        """Dépose un événement dans la file, depuis n'importe quel thread."""
+        def put():
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"File d'événements pleine pour le canal {self.channel}, événement abandonné")
+
+        try:
+            self.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # La boucle de la connexion est fermée
+            pass
+
+    async def get(self, timeout=None):
+        """Attend le prochain événement ; renvoie None à l'expiration du délai."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BaseBackend:
+    """
+    Interface d'un bus de publication/abonnement.
+    """
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBackend(BaseBackend):
+    """
+    Bus local : les abonnés sont les connexions ouvertes dans ce processus.
+    """
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+        return len(subscriptions)
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self, channel):
+        """Nombre de connexions abonnées à un canal."""
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Renvoie le bus configuré, instancié une seule fois par processus."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_path = getattr(settings, 'REALTIME_BACKEND', DEFAULT_BACKEND)
+                _backend = import_string(backend_path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    """Réinitialise le bus quand REALTIME_BACKEND change (tests)."""
+    global _backend
+    if setting == 'REALTIME_BACKEND':
+        _backend = None
+
+
+def publish_to_users(user_ids, event_type, data):
+    """
+    Publie un événement sur le canal de chaque utilisateur, après la validation
+    de la transaction en cours pour ne jamais diffuser de données annulées.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    event = {'type': event_type, 'data': data}
+
+    def publish():
+        backend = get_backend()
+        for user_id in user_ids:
+            try:
+                backend.publish(user_channel(user_id), event)
+            except Exception as e:
+                logger.error(f"Erreur lors de la publication temps réel pour l'utilisateur {user_id}: {str(e)}")
+
+    transaction.on_commit(publish)
+
+
+def format_event(event):
+    """Formate un événement selon le protocole Server-Sent Events."""
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+async def stream_events(subscription, backend):
+    """Générateur asynchrone des événements d'un abonnement."""
+    try:
+        yield f"retry: {KEEPALIVE_INTERVAL * 1000}\n\n"
+        while True:
+            event = await subscription.get(timeout=KEEPALIVE_INTERVAL)
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield format_event(event)
+    finally:
+        backend.unsubscribe(subscription)
+
+
+def authenticate(request):
+    """
+    Identifie l'utilisateur comme les vues de l'API : par les authentificateurs
+    de DEFAULT_AUTHENTICATION_CLASSES (token, JWT) puis, à défaut, par la session.
+    
+    Returns:
+        L'utilisateur authentifié, ou None
+    
+    Raises:
+        AuthenticationFailed: si les identifiants fournis sont invalides
+    """
+    api_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        # La session est lue directement : pas de contrôle CSRF sur un GET
+        if issubclass(authentication_class, SessionAuthentication):
+            continue
+        result = authentication_class().authenticate(api_request)
+        if result is not None:
+            return result[0]
+
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+async def event_stream(request):
+    """
+    Vue SSE diffusant en continu les nouveaux messages et notifications de
+    l'utilisateur connecté. Seule l'authentification touche la base de données.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': _('Le flux temps réel exige un serveur ASGI.')}, status=503)
+
+    try:
+        user = await sync_to_async(authenticate)(request)
+    except exceptions.AuthenticationFailed as e:
+        return JsonResponse({'error': str(e.detail)}, status=401)
+    if user is None:
+        return JsonResponse({'error': _('Authentification requise.')}, status=401)
+
+    backend = get_backend()
+    subscription = backend.subscribe(user_channel(user.pk))
+
+    response = StreamingHttpResponse(
+        stream_events(subscription, backend),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Désactiver la mise en tampon des proxys (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
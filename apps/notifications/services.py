@@ -4,13 +4,25 @@ from django.template import Template, Context
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.core.mail import send_mail, EmailMultiAlternatives
+from django.contrib.contenttypes.models import ContentType
 from django.template.loader import render_to_string
 
+from django.db.models import Case, Count, IntegerField, Max, Q, Sum, TextField, When
+from django.db.models.functions import Cast, Length
+
+from .counters import invalidate_users_counts
 from .models import NotificationType, UserNotificationPreference, Notification, DeviceToken
+from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Nombre d'identifiants supprimés par lot, pour ne pas verrouiller la table longtemps
+PURGE_BATCH_SIZE = 2000
+
+# Estimation de la taille fixe d'une ligne (colonnes de taille fixe et entrées d'index)
+ESTIMATED_ROW_OVERHEAD = 120
+
 
 class NotificationService:
     """
@@ -43,9 +55,8 @@ class NotificationService:
         if not context:
             context = {}
         
-        # Ajouter l'utilisateur au contexte
-        context['user'] = user
-        django_context = Context(context)
+        # Ajouter l'utilisateur au contexte de rendu (non sérialisable en JSON)
+        django_context = Context({**context, 'user': user})
         
         # Rendre les templates
         title_template = Template(notification_type.title_template)
@@ -64,7 +75,7 @@ class NotificationService:
                 action_url=action_url,
                 action_text=action_text,
                 data=context,
-                content_type=related_object._meta.app_label + '.' + related_object.__class__.__name__ if related_object else None,
+                content_type=ContentType.objects.get_for_model(related_object) if related_object else None,
                 object_id=related_object.pk if related_object else None
             )
             
@@ -269,4 +280,160 @@ class NotificationService:
                 logger.error(f"Erreur d'envoi Firebase pour la notification {notification.pk}: {str(e)}")
                 
         except Exception as e:
-            logger.error(f"Erreur d'envoi push pour la notification {notification.pk}: {str(e)}")
\ No newline at end of file
+            logger.error(f"Erreur d'envoi push pour la notification {notification.pk}: {str(e)}")
+
+
+class NotificationRetentionService:
+    """
+    Service appliquant les politiques de conservation des types de notification :
+    regroupement des rafales non lues, suppression des notifications lues
+    anciennes et plafond par utilisateur.
+    """
+    @classmethod
+    def purge(cls, notification_types=None, batch_size=PURGE_BATCH_SIZE, now=None):
+        """
+        Applique les politiques de conservation.
+        
+        Args:
+            notification_types: Types à traiter (par défaut ceux qui ont une politique)
+            batch_size: Nombre maximal de lignes supprimées par transaction
+            now: Date de référence (maintenant par défaut)
+            
+        Returns:
+            Dictionnaire {code du type: {'collapsed', 'expired', 'capped', 'bytes'}}
+        """
+        now = now or timezone.now()
+        if notification_types is None:
+            notification_types = NotificationType.objects.filter(
+                Q(retention_days__isnull=False) | Q(max_per_user__isnull=False) | Q(collapse_unread=True)
+            )
+        
+        report = {}
+        for notification_type in notification_types:
+            stats = {'collapsed': 0, 'expired': 0, 'capped': 0, 'bytes': 0}
+            
+            if notification_type.collapse_unread:
+                cls.collapse_unread(notification_type, stats, batch_size)
+            
+            if notification_type.retention_days is not None:
+                cls.delete_expired(notification_type, stats, batch_size, now)
+            
+            if notification_type.max_per_user is not None:
+                cls.enforce_cap(notification_type, stats, batch_size)
+            
+            report[notification_type.code] = stats
+        
+        return report
+    
+    @classmethod
+    def delete_ids(cls, ids, stats, batch_size=PURGE_BATCH_SIZE):
+        """
+        Supprime des notifications par lots d'identifiants, chacun dans sa propre
+        transaction, en estimant l'espace libéré.
+        
+        Aucune table ne référence les notifications et aucun récepteur
+        post_delete n'est connecté : chaque lot est supprimé par un seul DELETE,
+        sans chargement des lignes. Les compteurs des utilisateurs concernés
+        sont invalidés une fois par lot.
+        
+        Returns:
+            Nombre de lignes supprimées
+        """
+        deleted = 0
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                queryset = Notification.objects.filter(id__in=ids[start:start + batch_size])
+                stats['bytes'] += cls.estimate_size(queryset)
+                invalidate_users_counts(queryset.values_list('user_id', flat=True).distinct())
+                deleted += queryset.delete()[1].get(Notification._meta.label, 0)
+        return deleted
+    
+    @staticmethod
+    def estimate_size(queryset):
+        """Estime la taille en octets des lignes d'un queryset."""
+        totals = queryset.aggregate(
+            rows=Count('id'),
+            text=Sum(
+                Length('title') + Length('body') + Length('action_url') +
+                Length('action_text') + Length(Cast('data', TextField()))
+            )
+        )
+        return (totals['text'] or 0) + totals['rows'] * ESTIMATED_ROW_OVERHEAD
+    
+    @classmethod
+    def delete_expired(cls, notification_type, stats, batch_size, now):
+        """Supprime les notifications lues ou archivées plus anciennes que la durée de conservation."""
+        queryset = Notification.objects.filter(
+            notification_type=notification_type,
+            status__in=['read', 'archived'],
+            created_at__lt=now - timedelta(days=notification_type.retention_days)
+        )
+        
+        while True:
+            ids = list(queryset.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            stats['expired'] += cls.delete_ids(ids, stats, batch_size)
+    
+    @classmethod
+    def enforce_cap(cls, notification_type, stats, batch_size):
+        """
+        Ne conserve que les notifications les plus récentes de chaque utilisateur,
+        en supprimant les lues et archivées avant les non lues.
+        """
+        cap = notification_type.max_per_user
+        queryset = Notification.objects.filter(notification_type=notification_type)
+        
+        over_cap = queryset.values('user_id').annotate(total=Count('id')).filter(total__gt=cap)
+        for row in over_cap:
+            ids = list(
+                queryset.filter(user_id=row['user_id']).annotate(
+                    is_unread=Case(When(status='unread', then=1), default=0, output_field=IntegerField())
+                ).order_by(
+                    '-is_unread', '-created_at', '-id'
+                ).values_list('id', flat=True)[cap:]
+            )
+            stats['capped'] += cls.delete_ids(ids, stats, batch_size)
+    
+    @classmethod
+    def collapse_unread(cls, notification_type, stats, batch_size):
+        """
+        Fusionne les rafales de notifications non lues d'un même utilisateur
+        vers une même URL d'action (par exemple les messages d'une conversation)
+        en une seule notification, la plus récente, qui porte leur nombre.
+        """
+        queryset = Notification.objects.filter(
+            notification_type=notification_type,
+            status='unread'
+        ).exclude(action_url='')
+        
+        groups = queryset.values('user_id', 'action_url').annotate(
+            total=Count('id'),
+            latest_id=Max('id')
+        ).filter(total__gt=1)
+        
+        for group in groups:
+            rows = list(queryset.filter(
+                user_id=group['user_id'],
+                action_url=group['action_url']
+            ).values_list('id', 'data'))
+            
+            count = sum(
+                data.get('collapsed_count', 1) if isinstance(data, dict) else 1
+                for notification_id, data in rows
+            )
+            
+            with transaction.atomic():
+                latest = Notification.objects.get(pk=group['latest_id'])
+                data = latest.data if isinstance(latest.data, dict) else {}
+                data['collapsed_count'] = count
+                original_title = data.setdefault('original_title', latest.title)
+                latest.title = _('%(count)d nouvelles notifications : %(title)s') % {
+                    'count': count,
+                    'title': original_title
+                }
+                latest.data = data
+                latest.save(update_fields=['title', 'data'])
+            
+            ids = [notification_id for notification_id, data in rows if notification_id != latest.id]
+            stats['collapsed'] += cls.delete_ids(ids, stats, batch_size)
@@ -4,42 +4,61 @@ from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
 from .models import NotificationType, UserNotificationPreference, Notification
+from .realtime import publish_to_users
+from .counters import record_transition
+from apps.analytics.side_effects import defer
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=User)
-def create_default_notification_preferences(sender, instance, created, **kwargs):
+def create_default_preferences(user_ids):
     """
-    Crée les préférences de notification par défaut pour un nouvel utilisateur.
+    Gestionnaire d'effets de bord : crée en une requête les préférences de
+    notification par défaut des nouveaux utilisateurs, puis leur envoie la
+    notification de bienvenue.
     """
-    if created:
-        # Créer des préférences pour tous les types de notification actifs
-        for notification_type in NotificationType.objects.filter(is_active=True):
-            UserNotificationPreference.objects.create(
-                user=instance,
-                notification_type=notification_type,
-                email_enabled=notification_type.default_user_preference,
-                in_app_enabled=notification_type.default_user_preference,
-                push_enabled=notification_type.default_user_preference
-            )
-        
-        # Envoyer une notification de bienvenue
+    users = list(User.objects.filter(pk__in=user_ids))
+    notification_types = list(NotificationType.objects.filter(is_active=True))
+    
+    # Créer des préférences pour tous les types de notification actifs
+    UserNotificationPreference.objects.bulk_create([
+        UserNotificationPreference(
+            user=user,
+            notification_type=notification_type,
+            email_enabled=notification_type.default_user_preference,
+            in_app_enabled=notification_type.default_user_preference,
+            push_enabled=notification_type.default_user_preference
+        )
+        for user in users
+        for notification_type in notification_types
+    ], ignore_conflicts=True)
+    
+    # Envoyer une notification de bienvenue si un type "welcome" existe
+    if any(notification_type.code == 'welcome' for notification_type in notification_types):
         from .services import NotificationService
         
-        # Si un type de notification "welcome" existe, l'utiliser
-        if NotificationType.objects.filter(code='welcome', is_active=True).exists():
+        for user in users:
             NotificationService.create_notification(
-                user=instance,
+                user=user,
                 notification_type_code='welcome',
                 context={
-                    'first_name': instance.first_name,
+                    'first_name': user.first_name,
                 },
                 action_url='/profile/',
                 action_text=_('Voir mon profil')
             )
 
 
+@receiver(post_save, sender=User)
+def create_default_notification_preferences(sender, instance, created, **kwargs):
+    """
+    Programme la création des préférences de notification par défaut d'un
+    nouvel utilisateur, après la validation de la transaction.
+    """
+    if created:
+        defer(create_default_preferences, instance.pk, key=instance.pk)
+
+
 @receiver(post_save, sender=NotificationType)
 def create_notification_preferences_for_new_type(sender, instance, created, **kwargs):
     """
@@ -65,4 +84,29 @@ def create_notification_preferences_for_new_type(sender, instance, created, **kw
         ]
         
         if preferences_to_create:
-            UserNotificationPreference.objects.bulk_create(preferences_to_create)
\ No newline at end of file
+            UserNotificationPreference.objects.bulk_create(preferences_to_create)
+
+
+@receiver(post_save, sender=Notification)
+def publish_new_notification(sender, instance, created, **kwargs):
+    """
+    Diffuse une nouvelle notification en temps réel à son destinataire.
+    """
+    if created:
+        publish_to_users([instance.user_id], 'notification', {
+            'id': instance.id,
+            'title': instance.title,
+            'body': instance.body,
+            'action_url': instance.action_url,
+            'action_text': instance.action_text,
+            'created_at': instance.created_at,
+        })
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """
+    Incrémente le compteur de l'utilisateur à la création d'une notification.
+    """
+    if created:
+        record_transition(instance.user_id, new_status=instance.status)
@@ -1,3 +1,269 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from .counters import get_counts, rebuild_counts
+from .models import Notification, NotificationType
+from .realtime import BaseBackend, InProcessBackend, get_backend, stream_events, user_channel
+from .services import NotificationRetentionService
+
+
+class RecordingBackend(BaseBackend):
+    """
+    Substitut local du bus temps réel qui enregistre les événements publiés.
+    """
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event))
+
+
+@override_settings(REALTIME_BACKEND='apps.notifications.tests.RecordingBackend')
+class RealtimePublishTest(TestCase):
+    """
+    Tests pour la publication des notifications sur le bus temps réel.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+
+    def test_notification_is_published_on_commit(self):
+        """
+        Test qu'une nouvelle notification est publiée sur le canal de l'utilisateur après validation.
+        """
+        backend = get_backend()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = Notification.objects.create(user=self.user, title='Bienvenue', body='Bonjour')
+            self.assertEqual(backend.published, [])
+
+        channel, event = backend.published[-1]
+        self.assertEqual(channel, user_channel(self.user.id))
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['data']['id'], notification.id)
+
+
+class EventStreamViewTest(TestCase):
+    """
+    Tests pour l'authentification et le serveur exigé par le flux SSE.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.user = User.objects.create_user(
+            email='mobile@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Mobile',
+            type='student',
+            is_active=True
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.url = '/api/notifications/stream/'
+
+    async def test_token_client_receives_stream(self):
+        """
+        Test qu'un client mobile authentifié par token reçoit le flux.
+        """
+        response = await AsyncClient().get(self.url, headers={'authorization': f'Token {self.token.key}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        await response.streaming_content.aclose()
+
+    async def test_invalid_token_is_rejected(self):
+        """
+        Test qu'un token invalide est refusé.
+        """
+        response = await AsyncClient().get(self.url, headers={'authorization': 'Token inconnu'})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_wsgi_request_is_refused(self):
+        """
+        Test que le flux n'est pas servi par WSGI.
+        """
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+
+
+class InProcessBackendTest(SimpleTestCase):
+    """
+    Tests pour le bus local et le flux Server-Sent Events.
+    """
+
+    async def test_event_is_streamed_to_subscriber(self):
+        """
+        Test qu'un événement publié depuis un autre thread arrive dans le flux de l'abonné.
+        """
+        backend = InProcessBackend()
+        subscription = backend.subscribe(user_channel(1))
+        stream = stream_events(subscription, backend)
+
+        self.assertTrue((await stream.__anext__()).startswith('retry:'))
+
+        delivered = await asyncio.to_thread(
+            backend.publish, user_channel(1), {'type': 'message', 'data': {'id': 42}}
+        )
+        self.assertEqual(delivered, 1)
+        self.assertEqual(await stream.__anext__(), 'event: message\ndata: {"id": 42}\n\n')
+
+        await stream.aclose()
+        self.assertEqual(backend.subscriber_count(user_channel(1)), 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class NotificationCountersTest(TestCase):
+    """
+    Tests pour les compteurs de notifications en cache.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.notifications = [
+            Notification.objects.create(user=self.user, title=f'Notification {index}', body='')
+            for index in range(3)
+        ]
+
+    def test_counters_follow_status_changes(self):
+        """
+        Test que les compteurs suivent les changements de statut sans relire la table.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(get_counts(self.user.id), {'unread': 3, 'read': 0, 'archived': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notifications[0].mark_as_read()
+            self.notifications[1].archive()
+            Notification.objects.create(user=self.user, title='Nouvelle', body='')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_counts(self.user.id), {'unread': 2, 'read': 1, 'archived': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notifications[0].mark_as_unread()
+            self.notifications[2].delete()
+
+        self.assertEqual(get_counts(self.user.id), rebuild_counts(self.user.id))
+
+    def test_badge_polling_uses_cache(self):
+        """
+        Test que le badge n'interroge pas la table des notifications quand les compteurs sont en cache.
+        """
+        self.user.is_active = True
+        self.user.save()
+        self.client.force_login(self.user)
+        get_counts(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/notifications/mark-all-as-read/', headers={'x-requested-with': 'XMLHttpRequest'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/count/')
+
+        self.assertEqual(response.json(), {'count': 0})
+        self.assertFalse(any('notifications_notification' in query['sql'] for query in queries.captured_queries))
+
+
+class NotificationRetentionServiceTest(TestCase):
+    """
+    Tests pour les politiques de conservation des notifications.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.notification_type = NotificationType.objects.create(
+            code='new_message',
+            name='Nouveau message',
+            title_template='Nouveau message',
+            body_template='{{ message_preview }}',
+            retention_days=30,
+            max_per_user=5,
+            collapse_unread=True
+        )
+
+    def _create(self, count, **kwargs):
+        return [
+            Notification.objects.create(
+                user=self.user,
+                notification_type=self.notification_type,
+                title='Nouveau message dans Orientation',
+                body=f'Message {index}',
+                **kwargs
+            )
+            for index in range(count)
+        ]
+
+    def test_purge_collapses_expires_and_caps(self):
+        """
+        Test du regroupement des rafales, de l'expiration et du plafond par utilisateur.
+        """
+        burst = self._create(12, action_url='/messaging/1/')
+        expired = self._create(3, status='read')
+        Notification.objects.filter(pk__in=[n.pk for n in expired]).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        self._create(6, status='archived')
+
+        get_counts(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            report = NotificationRetentionService.purge(batch_size=4)
+
+        # Suppressions en un seul DELETE par lot, sans relire les lignes
+        deletes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 5)
+
+        # Compteurs invalidés par lot puis reconstruits
+        self.assertEqual(get_counts(self.user.id), {'unread': 1, 'read': 0, 'archived': 4})
+
+        stats = report['new_message']
+        self.assertEqual(stats['collapsed'], 11)
+        self.assertEqual(stats['expired'], 3)
+        self.assertEqual(stats['capped'], 2)
+        self.assertGreater(stats['bytes'], 0)
+
+        collapsed = Notification.objects.get(status='unread')
+        self.assertEqual(collapsed.pk, burst[-1].pk)
+        self.assertEqual(collapsed.data['collapsed_count'], 12)
+        self.assertEqual(collapsed.title, '12 nouvelles notifications : Nouveau message dans Orientation')
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 5)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .. import views
+from .. import views, realtime
 
 app_name = 'notifications'
 
@@ -13,6 +13,7 @@ urlpatterns = [
     path('<int:pk>/archive/', views.archive_notification, name='archive_notification'),
     path('archive-all/', views.archive_all_notifications, name='archive_all_notifications'),
     path('count/', views.get_notification_count, name='get_notification_count'),
+    path('stream/', realtime.event_stream, name='event_stream'),
     
     # Préférences
     path('preferences/', views.NotificationPreferencesView.as_view(), name='notification_preferences'),
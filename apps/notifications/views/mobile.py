@@ -15,6 +15,9 @@ from ..models import (
     NotificationType, UserNotificationPreference, Notification, 
     NotificationTemplate, DeviceToken
 )
+from ..counters import get_counts, record_transition
+from apps.analytics.instrumentation import query_budget
+from apps.analytics.pagination import EstimatedCountPaginator
 from ..forms import (
     NotificationTypeForm, UserNotificationPreferenceForm, 
     NotificationTemplateForm, DeviceTokenForm, NotificationPreferencesUpdateForm
@@ -29,6 +32,7 @@ class NotificationListView(LoginRequiredMixin, ListView):
     template_name = 'notifications/notification_list.html'
     context_object_name = 'notifications'
     paginate_by = 20
+    paginator_class = EstimatedCountPaginator
     
     def get_queryset(self):
         queryset = Notification.objects.filter(user=self.request.user)
@@ -50,18 +54,11 @@ class NotificationListView(LoginRequiredMixin, ListView):
         # Ajouter le statut actif
         context['active_status'] = self.request.GET.get('status', 'unread')
         
-        # Ajouter les compteurs
-        context['unread_count'] = Notification.objects.filter(
-            user=self.request.user, status='unread'
-        ).count()
-        
-        context['read_count'] = Notification.objects.filter(
-            user=self.request.user, status='read'
-        ).count()
-        
-        context['archived_count'] = Notification.objects.filter(
-            user=self.request.user, status='archived'
-        ).count()
+        # Ajouter les compteurs (en cache, reconstruits en une requête si absents)
+        counts = get_counts(self.request.user.pk)
+        context['unread_count'] = counts['unread']
+        context['read_count'] = counts['read']
+        context['archived_count'] = counts['archived']
         
         return context
 
@@ -122,9 +119,10 @@ def mark_all_notifications_as_read(request):
     """
     Vue pour marquer toutes les notifications comme lues.
     """
-    Notification.objects.filter(
+    updated = Notification.objects.filter(
         user=request.user, status='unread'
     ).update(status='read', read_at=timezone.now())
+    record_transition(request.user.pk, 'unread', 'read', count=updated)
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'status': 'success'})
@@ -154,9 +152,10 @@ def archive_all_notifications(request):
     """
     Vue pour archiver toutes les notifications lues.
     """
-    Notification.objects.filter(
+    updated = Notification.objects.filter(
         user=request.user, status='read'
     ).update(status='archived', archived_at=timezone.now())
+    record_transition(request.user.pk, 'read', 'archived', count=updated)
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'status': 'success'})
@@ -165,15 +164,15 @@ def archive_all_notifications(request):
     return redirect('notifications:notification_list')
 
 
+@query_budget(3)
 @login_required
 @require_GET
 def get_notification_count(request):
     """
     Vue pour récupérer le nombre de notifications non lues.
     """
-    count = Notification.objects.filter(
-        user=request.user, status='unread'
-    ).count()
+    # Lu depuis le cache : le badge ne touche pas la table des notifications
+    count = get_counts(request.user.pk)['unread']
     
     return JsonResponse({'count': count})
 
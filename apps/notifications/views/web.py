@@ -11,6 +11,8 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q
 from django.core.paginator import Paginator
 
+from apps.analytics.pagination import EstimatedCountPaginator
+
 from ..models import (
     NotificationType, UserNotificationPreference, Notification, 
     NotificationTemplate, DeviceToken
@@ -192,6 +194,7 @@ class DeviceTokenListView(LoginRequiredMixin, IsAdminMixin, ListView):
     template_name = 'notifications/admin/device_token_list.html'
     context_object_name = 'device_tokens'
     paginate_by = 50
+    paginator_class = EstimatedCountPaginator
     
     def get_queryset(self):
         queryset = DeviceToken.objects.all().select_related('user')
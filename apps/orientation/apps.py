@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class OrientationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.orientation'  # Changez cette ligne
\ No newline at end of file
+    name = 'apps.orientation'  # Changez cette ligne
+    
+    def ready(self):
+        import apps.orientation.signals
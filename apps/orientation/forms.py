@@ -7,6 +7,7 @@ from .models import (
     SkillCategory, Skill, CareerField, CareerPath, OrientationPath,
     OrientationCareerPath, StudentSkill
 )
+from .services import AssessmentService
 
 
 class AssessmentTypeForm(forms.ModelForm):
@@ -350,6 +351,11 @@ class OrientationCareerPathForm(forms.ModelForm):
                 self.add_error('is_primary', _('Il existe déjà une filière principale pour ce parcours.'))
         
         return cleaned_data
+    
+    def save(self, commit=True):
+        # Une filière enregistrée par le conseiller n'est plus remplacée par le moteur
+        self.instance.is_automatic = False
+        return super().save(commit)
 
 
 class StudentSkillForm(forms.ModelForm):
@@ -407,18 +413,20 @@ class TakeAssessmentForm(forms.Form):
         self.assessment = kwargs.pop('assessment', None)
         super().__init__(*args, **kwargs)
         
+        # Questionnaire compilé partagé entre affichage, validation et notation
+        self.questions = None
+        
         if not self.assessment:
             return
         
+        self.questions = self.assessment.assessment_type.get_question_set()
+        
         # Ajouter dynamiquement un champ pour chaque question de l'évaluation
-        for question in AssessmentQuestion.objects.filter(
-            assessment_type=self.assessment.assessment_type,
-            is_active=True
-        ).order_by('order'):
+        for question in self.questions:
             field_name = f'question_{question.id}'
             
             if question.question_type == 'single_choice':
-                choices = [(idx, text) for idx, text in enumerate(question.options.get('choices', []))]
+                choices = list(enumerate(question.choices))
                 self.fields[field_name] = forms.ChoiceField(
                     label=question.text,
                     choices=choices,
@@ -427,7 +435,7 @@ class TakeAssessmentForm(forms.Form):
                 )
             
             elif question.question_type == 'multiple_choice':
-                choices = [(idx, text) for idx, text in enumerate(question.options.get('choices', []))]
+                choices = list(enumerate(question.choices))
                 self.fields[field_name] = forms.MultipleChoiceField(
                     label=question.text,
                     choices=choices,
@@ -469,34 +477,11 @@ class TakeAssessmentForm(forms.Form):
         if not self.assessment:
             return
         
-        # Parcourir tous les champs du formulaire et enregistrer les réponses
-        for field_name, value in self.cleaned_data.items():
-            if not field_name.startswith('question_'):
-                continue
-            
-            question_id = int(field_name.split('_')[1])
-            question = AssessmentQuestion.objects.get(id=question_id)
-            
-            # Préparer les données de réponse en fonction du type de question
-            answer_data = {}
-            
-            if question.question_type == 'single_choice':
-                answer_data = {'selected_option': int(value)}
-            elif question.question_type == 'multiple_choice':
-                answer_data = {'selected_options': [int(v) for v in value]}
-            elif question.question_type == 'text':
-                answer_data = {'text': value}
-            elif question.question_type == 'numeric':
-                answer_data = {'value': value}
-            elif question.question_type == 'scale':
-                answer_data = {'value': int(value)}
-            
-            # Créer ou mettre à jour la réponse
-            AssessmentAnswer.objects.update_or_create(
-                assessment=self.assessment,
-                question=question,
-                defaults={'answer_data': answer_data}
-            )
+        answers = {
+            int(field_name.split('_')[1]): value
+            for field_name, value in self.cleaned_data.items()
+            if field_name.startswith('question_')
+        }
         
-        # Marquer l'évaluation comme terminée
-        self.assessment.complete()
\ No newline at end of file
+        # Enregistrer les réponses en bloc et terminer l'évaluation
+        return AssessmentService.submit_answers(self.assessment, answers, questions=self.questions)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.orientation.recommendations import CareerRecommendationEngine
+
+
+class Command(BaseCommand):
+    """
+    Calcule les filières recommandées des étudiants à partir de leurs compétences.
+    """
+    help = "Calcule les scores de compatibilité étudiants × filières et enregistre les meilleures recommandations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=5,
+                            help="Nombre de filières recommandées par étudiant")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Nombre d'étudiants traités par lot")
+        parser.add_argument('--student', type=int, action='append', dest='students',
+                            help="Limiter le calcul à cet étudiant (option répétable)")
+
+    def handle(self, *args, **options):
+        engine = CareerRecommendationEngine(top_n=options['top'], batch_size=options['batch_size'])
+        written = engine.run(student_ids=options['students'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{written} recommandation(s) enregistrée(s) pour {len(engine.get_career_matrix())} filière(s) active(s)."
+        ))
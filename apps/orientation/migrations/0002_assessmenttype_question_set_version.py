@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orientation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmenttype',
+            name='question_set_version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='version du questionnaire'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 05:19
+
+from django.db import migrations, models
+
+# Raison écrite par le moteur de recommandation avant l'ajout du champ
+AUTOMATIC_REASON = "Recommandation automatique basée sur les compétences de l'étudiant."
+
+
+def mark_automatic_recommendations(apps, schema_editor):
+    """
+    Marque comme automatiques les recommandations écrites par le moteur.
+    """
+    OrientationCareerPath = apps.get_model('orientation', 'OrientationCareerPath')
+    OrientationCareerPath.objects.filter(recommendation_reason=AUTOMATIC_REASON).update(is_automatic=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orientation', '0002_assessmenttype_question_set_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orientationcareerpath',
+            name='is_automatic',
+            field=models.BooleanField(default=False, verbose_name='recommandation automatique'),
+        ),
+        migrations.RunPython(mark_automatic_recommendations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+def mark_recorded_assessments(apps, schema_editor):
+    """
+    Les évaluations déjà terminées ont été comptées par les mises à jour incrémentales.
+    """
+    Assessment = apps.get_model('orientation', 'Assessment')
+    Assessment.objects.filter(status='completed').update(stats_recorded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orientation', '0003_orientationcareerpath_is_automatic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='stats_recorded',
+            field=models.BooleanField(default=False, editable=False, verbose_name='comptée dans les statistiques'),
+        ),
+        migrations.RunPython(mark_recorded_assessments, migrations.RunPython.noop),
+    ]
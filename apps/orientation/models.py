@@ -20,6 +20,9 @@ class AssessmentType(models.Model):
     passing_score = models.PositiveIntegerField(_('score de validation'), default=50)
     time_limit_minutes = models.PositiveIntegerField(_('temps limite (minutes)'), null=True, blank=True)
     
+    # Incrémentée à chaque modification des questions pour invalider les questionnaires compilés
+    question_set_version = models.PositiveIntegerField(_('version du questionnaire'), default=1, editable=False)
+    
     # États
     is_active = models.BooleanField(_('actif'), default=True)
     created_at = models.DateTimeField(_('créé le'), auto_now_add=True)
@@ -38,9 +41,14 @@ class AssessmentType(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
     
+    def get_question_set(self):
+        """Retourne le questionnaire compilé (mis en cache) de ce type d'évaluation."""
+        from .question_sets import get_question_set
+        return get_question_set(self)
+    
     def get_question_count(self):
-        """Retourne le nombre de questions pour ce type d'évaluation."""
-        return self.questions.count()
+        """Retourne le nombre de questions actives pour ce type d'évaluation."""
+        return len(self.get_question_set())
 
 
 class AssessmentQuestion(models.Model):
@@ -140,6 +148,9 @@ class Assessment(models.Model):
     end_time = models.DateTimeField(_('heure de fin'), null=True, blank=True)
     time_spent_seconds = models.PositiveIntegerField(_('temps passé (secondes)'), null=True, blank=True)
     
+    # Prise en compte dans les agrégats de résultats (analytics)
+    stats_recorded = models.BooleanField(_('comptée dans les statistiques'), default=False, editable=False)
+    
     # Dates
     created_at = models.DateTimeField(_('créé le'), auto_now_add=True)
     updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
@@ -169,17 +180,19 @@ class Assessment(models.Model):
             question = answer.question
             total_points += question.points
             
-            if answer.is_correct():
+            if AssessmentAnswer.check_answer(question, answer.answer_data):
                 earned_points += question.points
         
-        if total_points > 0:
-            self.score = int((earned_points / total_points) * self.assessment_type.max_score)
-        else:
-            self.score = 0
-        
+        self.score = self.compute_score(earned_points, total_points)
         self.save(update_fields=['score'])
         return self.score
     
+    def compute_score(self, earned_points, total_points):
+        """Ramène les points obtenus sur le barème du type d'évaluation."""
+        if total_points > 0:
+            return int((earned_points / total_points) * self.assessment_type.max_score)
+        return 0
+    
     def start(self):
         """Marque l'évaluation comme commencée."""
         from django.utils import timezone
@@ -189,8 +202,13 @@ class Assessment(models.Model):
             self.start_time = timezone.now()
             self.save(update_fields=['status', 'start_time'])
     
-    def complete(self):
-        """Marque l'évaluation comme terminée."""
+    def complete(self, score=None):
+        """
+        Marque l'évaluation comme terminée.
+        
+        Si le score est fourni (déjà calculé lors de la soumission des réponses),
+        il est enregistré avec le statut au lieu d'être recalculé depuis la base.
+        """
         from django.utils import timezone
         
         if self.status == 'in_progress':
@@ -202,10 +220,17 @@ class Assessment(models.Model):
                 delta = self.end_time - self.start_time
                 self.time_spent_seconds = delta.total_seconds()
             
-            self.save(update_fields=['status', 'end_time', 'time_spent_seconds'])
+            if score is not None:
+                self.score = score
+                self.save(update_fields=['status', 'end_time', 'time_spent_seconds', 'score'])
+            else:
+                self.save(update_fields=['status', 'end_time', 'time_spent_seconds'])
+                
+                # Calculer le score
+                self.calculate_score()
             
-            # Calculer le score
-            self.calculate_score()
+            from .signals import assessment_completed
+            assessment_completed.send(sender=self.__class__, assessment=self)
     
     def is_passed(self):
         """Vérifie si l'étudiant a réussi l'évaluation."""
@@ -251,19 +276,20 @@ class AssessmentAnswer(models.Model):
         Détermine si la réponse est correcte selon le type de question.
         Pour les questions de type échelle, texte, numérique, retourne toujours True.
         """
-        question_type = self.question.question_type
-        
-        if question_type == 'single_choice':
-            correct_option = self.question.options.get('correct_answer')
-            return self.answer_data.get('selected_option') == correct_option
-        
-        elif question_type == 'multiple_choice':
-            correct_options = set(self.question.options.get('correct_answers', []))
-            selected_options = set(self.answer_data.get('selected_options', []))
-            return correct_options == selected_options
+        return self.check_answer(self.question, self.answer_data)
+    
+    @staticmethod
+    def check_answer(question, answer_data):
+        """
+        Corrige des données de réponse pour une question sans passer par une instance
+        enregistrée, ce qui permet de noter une soumission entière en mémoire.
+        Accepte une AssessmentQuestion ou une question déjà compilée.
+        """
+        from .question_sets import CompiledQuestion
         
-        # Pour les autres types de questions, la correction est subjective
-        return True
+        if not isinstance(question, CompiledQuestion):
+            question = CompiledQuestion.from_question(question)
+        return question.is_correct(answer_data)
 
 
 class SkillCategory(models.Model):
@@ -510,6 +536,8 @@ class OrientationCareerPath(models.Model):
     compatibility_score = models.PositiveIntegerField(_('score de compatibilité'), default=0)
     recommendation_reason = models.TextField(_('raison de la recommandation'), blank=True)
     is_primary = models.BooleanField(_('recommandation principale'), default=False)
+    # Ligne écrite par le moteur de recommandation (remplaçable à chaque calcul)
+    is_automatic = models.BooleanField(_('recommandation automatique'), default=False)
     
     class Meta:
         verbose_name = _('filière recommandée')
@@ -0,0 +1,201 @@
+"""
+Questionnaires compilés par type d'évaluation.
+
+Un questionnaire compilé est un objet immuable qui regroupe les questions actives
+d'un type d'évaluation, leurs options déjà extraites du JSON, les clés de correction
+et le barème. Il est identifié par (type d'évaluation, version) : la version est
+incrémentée à chaque modification des questions, ce qui invalide toutes les copies
+en cache (mémoire du processus et cache partagé) sans coordination entre processus.
+"""
+
+import threading
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+# Durée de vie dans le cache partagé : une version n'est jamais modifiée,
+# seule l'apparition d'une nouvelle version la rend obsolète
+QUESTION_SET_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Nombre maximal de questionnaires conservés dans la mémoire du processus
+LOCAL_CACHE_SIZE = 128
+
+_local_cache = {}
+_local_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    """
+    Question précompilée : options, clé de correction et points.
+    """
+    id: int
+    text: str
+    question_type: str
+    required: bool
+    order: int
+    points: int
+    choices: tuple = ()
+    correct_answer: object = None
+    correct_answers: frozenset = frozenset()
+    scale_min: int = None
+    scale_max: int = None
+    scale_step: int = None
+
+    @classmethod
+    def from_question(cls, question):
+        """Compile une instance de AssessmentQuestion."""
+        options = question.options if isinstance(question.options, dict) else {}
+        is_choice = question.question_type in ['single_choice', 'multiple_choice']
+
+        return cls(
+            id=question.id,
+            text=question.text,
+            question_type=question.question_type,
+            required=question.required,
+            order=question.order,
+            points=question.points,
+            choices=tuple(options.get('choices', [])) if is_choice else (),
+            correct_answer=options.get('correct_answer'),
+            correct_answers=frozenset(options.get('correct_answers', [])),
+            scale_min=question.scale_min,
+            scale_max=question.scale_max,
+            scale_step=question.scale_step,
+        )
+
+    def get_options(self):
+        """Retourne les options de la question si c'est une question à choix."""
+        return list(self.choices)
+
+    def is_correct(self, answer_data):
+        """
+        Détermine si une réponse est correcte.
+        Pour les questions de type échelle, texte, numérique, retourne toujours True.
+        """
+        if self.question_type == 'single_choice':
+            return answer_data.get('selected_option') == self.correct_answer
+
+        elif self.question_type == 'multiple_choice':
+            return self.correct_answers == set(answer_data.get('selected_options', []))
+
+        # Pour les autres types de questions, la correction est subjective
+        return True
+
+
+@dataclass(frozen=True)
+class QuestionSet:
+    """
+    Questionnaire compilé et ordonné d'un type d'évaluation.
+    """
+    assessment_type_id: int
+    version: int
+    questions: tuple = ()
+    by_id: dict = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'by_id', {question.id: question for question in self.questions})
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def get(self, question_id, default=None):
+        """Retourne la question compilée correspondant à l'identifiant."""
+        return self.by_id.get(question_id, default)
+
+    @property
+    def total_points(self):
+        """Total des points de toutes les questions."""
+        return sum(question.points for question in self.questions)
+
+
+def _cache_key(assessment_type_id, version):
+    return f'orientation_question_set_{assessment_type_id}_v{version}'
+
+
+def compile_question_set(assessment_type_id, version):
+    """
+    Construit le questionnaire depuis la base de données (une seule requête).
+    """
+    from .models import AssessmentQuestion
+
+    questions = AssessmentQuestion.objects.filter(
+        assessment_type_id=assessment_type_id,
+        is_active=True
+    ).order_by('order', 'id')
+
+    return QuestionSet(
+        assessment_type_id=assessment_type_id,
+        version=version,
+        questions=tuple(CompiledQuestion.from_question(question) for question in questions)
+    )
+
+
+def get_question_set(assessment_type):
+    """
+    Retourne le questionnaire compilé d'un type d'évaluation.
+
+    Recherche d'abord dans la mémoire du processus, puis dans le cache partagé,
+    et ne compile depuis la base qu'en dernier recours.
+
+    Args:
+        assessment_type: Instance de AssessmentType ou son identifiant
+
+    Returns:
+        Le QuestionSet correspondant à la version courante
+    """
+    from .models import AssessmentType
+
+    if isinstance(assessment_type, AssessmentType):
+        assessment_type_id = assessment_type.pk
+        version = assessment_type.question_set_version
+    else:
+        assessment_type_id = assessment_type
+        version = AssessmentType.objects.values_list(
+            'question_set_version', flat=True
+        ).get(pk=assessment_type_id)
+
+    key = (assessment_type_id, version)
+    question_set = _local_cache.get(key)
+    if question_set is not None:
+        return question_set
+
+    cache_key = _cache_key(assessment_type_id, version)
+    question_set = cache.get(cache_key)
+    if question_set is None:
+        question_set = compile_question_set(assessment_type_id, version)
+        cache.set(cache_key, question_set, QUESTION_SET_CACHE_TIMEOUT)
+
+    with _local_lock:
+        if len(_local_cache) >= LOCAL_CACHE_SIZE:
+            _local_cache.pop(next(iter(_local_cache)))
+        _local_cache[key] = question_set
+
+    return question_set
+
+
+def invalidate_question_set(assessment_type_id):
+    """
+    Incrémente la version du questionnaire d'un type d'évaluation.
+
+    Les copies des versions précédentes ne sont plus jamais lues ; celles du
+    processus courant sont libérées immédiatement.
+    """
+    from django.db.models import F
+    from .models import AssessmentType
+
+    AssessmentType.objects.filter(pk=assessment_type_id).update(
+        question_set_version=F('question_set_version') + 1
+    )
+
+    with _local_lock:
+        for key in [key for key in _local_cache if key[0] == assessment_type_id]:
+            del _local_cache[key]
+
+
+def clear_local_cache():
+    """Vide la mémoire du processus (utile pour les tests)."""
+    with _local_lock:
+        _local_cache.clear()
@@ -0,0 +1,278 @@
+"""
+Moteur de recommandation de filières professionnelles.
+
+Les compétences des étudiants forment une matrice creuse étudiants × compétences
+(niveau de maîtrise) et les filières une matrice filières × compétences requises,
+dont chaque ligne est normalisée. Le score de compatibilité d'un étudiant avec
+une filière est le produit de ces deux matrices :
+
+    score = 100 × Σ (maîtrise / 5) / nombre de compétences requises
+
+Le produit est calculé avec un index inversé compétence → filières qui ne
+parcourt que les coefficients non nuls.
+"""
+
+import heapq
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from .models import (
+    CareerPath, OrientationPath, OrientationCareerPath, StudentSkill
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFICIENCY = max(level for level, label in StudentSkill.PROFICIENCY_CHOICES)
+
+# Statuts des parcours auxquels les recommandations peuvent être rattachées
+OPEN_PATH_STATUSES = ('draft', 'proposed', 'in_progress')
+
+
+class CareerMatrix:
+    """
+    Matrice filières × compétences requises, lignes normalisées.
+    """
+    def __init__(self, requirements):
+        """
+        Args:
+            requirements: Itérable de couples (id de filière, id de compétence)
+        """
+        skills_by_career = defaultdict(set)
+        for career_id, skill_id in requirements:
+            skills_by_career[career_id].add(skill_id)
+
+        self.career_ids = sorted(skills_by_career)
+        self.required_counts = [len(skills_by_career[career_id]) for career_id in self.career_ids]
+
+        # Index inversé : compétence → [(indice de filière, poids)]
+        self.careers_by_skill = defaultdict(list)
+        for career_index, career_id in enumerate(self.career_ids):
+            weight = 1.0 / (MAX_PROFICIENCY * len(skills_by_career[career_id]))
+            for skill_id in skills_by_career[career_id]:
+                self.careers_by_skill[skill_id].append((career_index, weight))
+
+    def __len__(self):
+        return len(self.career_ids)
+
+    @classmethod
+    def load(cls):
+        """Charge les compétences requises des filières actives (une requête)."""
+        through = CareerPath.skills_required.through
+        return cls(through.objects.filter(
+            careerpath__is_active=True,
+            skill__is_active=True
+        ).values_list('careerpath_id', 'skill_id'))
+
+    def score(self, student_skills):
+        """
+        Calcule les scores de compatibilité d'un lot d'étudiants.
+
+        Args:
+            student_skills: Dictionnaire {id d'étudiant: {id de compétence: maîtrise}}
+
+        Returns:
+            Dictionnaire {id d'étudiant: liste des scores par indice de filière}
+        """
+        student_ids = list(student_skills)
+        if not student_ids or not self.career_ids:
+            return {}
+
+        results = {}
+        for student_id in student_ids:
+            scores = [0.0] * len(self.career_ids)
+            for skill_id, proficiency in student_skills[student_id].items():
+                for career_index, weight in self.careers_by_skill.get(skill_id, ()):
+                    scores[career_index] += proficiency * weight
+            results[student_id] = [score * 100 for score in scores]
+        return results
+
+
+class CareerRecommendationEngine:
+    """
+    Calcule et enregistre les filières recommandées des étudiants.
+    """
+    def __init__(self, top_n=5, batch_size=1000, career_matrix=None):
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.career_matrix = career_matrix
+
+    def get_career_matrix(self):
+        if self.career_matrix is None:
+            self.career_matrix = CareerMatrix.load()
+        return self.career_matrix
+
+    def run(self, student_ids=None):
+        """
+        Recalcule les recommandations de tous les étudiants (ou d'une sélection).
+
+        Les compétences sont lues en flux, triées par étudiant, et traitées par lots.
+        Les étudiants sélectionnés sans compétence perdent leurs recommandations
+        automatiques.
+
+        Returns:
+            Nombre de recommandations écrites
+        """
+        if not len(self.get_career_matrix()):
+            return 0
+
+        queryset = StudentSkill.objects.filter(skill__is_active=True)
+        if student_ids is not None:
+            queryset = queryset.filter(student_id__in=student_ids)
+
+        written = 0
+        batch = {}
+        seen = set()
+        rows = queryset.order_by('student_id').values_list(
+            'student_id', 'skill_id', 'proficiency_level'
+        ).iterator(chunk_size=self.batch_size * 10)
+
+        for student_id, skill_id, proficiency in rows:
+            if student_id not in batch and len(batch) >= self.batch_size:
+                written += self.process_batch(batch)
+                batch = {}
+            batch.setdefault(student_id, {})[skill_id] = proficiency
+            seen.add(student_id)
+
+        if batch:
+            written += self.process_batch(batch)
+
+        if student_ids is not None:
+            without_skills = {student_id: {} for student_id in student_ids if student_id not in seen}
+            if without_skills:
+                written += self.process_batch(without_skills)
+
+        return written
+
+    def recommend_for_student(self, student_id):
+        """
+        Mode incrémental : recalcule les recommandations d'un seul étudiant,
+        par exemple après la modification de ses compétences.
+        """
+        return self.run(student_ids=[student_id])
+
+    def process_batch(self, student_skills):
+        """Calcule puis enregistre les recommandations d'un lot d'étudiants."""
+        scores = self.get_career_matrix().score(student_skills)
+        return self.save_recommendations(scores)
+
+    def top_careers(self, scores):
+        """Retourne les indices des meilleures filières dont le score est non nul."""
+        best = heapq.nlargest(self.top_n, range(len(scores)), key=scores.__getitem__)
+        return [index for index in best if scores[index] > 0]
+
+    def get_orientation_paths(self, student_ids):
+        """
+        Retourne le parcours ouvert le plus récent de chaque étudiant, en créant
+        un brouillon pour ceux qui n'en ont pas.
+        """
+        paths = {}
+        for path in OrientationPath.objects.filter(
+            student_id__in=student_ids,
+            status__in=OPEN_PATH_STATUSES
+        ).order_by('student_id', '-created_at').only('id', 'student_id'):
+            paths.setdefault(path.student_id, path)
+
+        missing = [student_id for student_id in student_ids if student_id not in paths]
+        if missing:
+            created = OrientationPath.objects.bulk_create([
+                OrientationPath(
+                    student_id=student_id,
+                    title=_('Filières recommandées'),
+                    description=_('Parcours généré automatiquement à partir des compétences de l\'étudiant.'),
+                    status='draft'
+                )
+                for student_id in missing
+            ])
+            for path in created:
+                paths[path.student_id] = path
+
+        return paths
+
+    def save_recommendations(self, scores):
+        """
+        Écrit les recommandations en masse.
+
+        Les meilleures filières de chaque étudiant sont ajoutées ; les filières déjà
+        associées à son parcours voient leur score mis à jour sans toucher aux
+        raisons ni aux choix du conseiller. Les recommandations automatiques
+        (non principales) sorties du classement sont supprimées des parcours
+        ouverts ; pour un étudiant sans filière compatible, le score des filières
+        restantes est remis à zéro.
+
+        Args:
+            scores: Dictionnaire {id d'étudiant: liste des scores par indice de filière}
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        career_ids = self.get_career_matrix().career_ids
+        career_positions = {career_id: index for index, career_id in enumerate(career_ids)}
+
+        targets = {
+            student_id: self.top_careers(student_scores)
+            for student_id, student_scores in scores.items()
+        }
+        if not targets:
+            return 0
+
+        with transaction.atomic():
+            matched = [student_id for student_id, indexes in targets.items() if indexes]
+            paths = self.get_orientation_paths(matched)
+
+            stale, unmatched_rows = [], []
+            existing = defaultdict(set)
+            for row_id, path_id, student_id, career_id, is_automatic, is_primary in OrientationCareerPath.objects.filter(
+                orientation_path__student_id__in=list(targets),
+                orientation_path__status__in=OPEN_PATH_STATUSES
+            ).values_list(
+                'id', 'orientation_path_id', 'orientation_path__student_id',
+                'career_path_id', 'is_automatic', 'is_primary'
+            ):
+                position = career_positions.get(career_id)
+                if is_automatic and not is_primary and position not in targets[student_id]:
+                    stale.append(row_id)
+                elif not targets[student_id]:
+                    unmatched_rows.append(row_id)
+                elif position is not None and path_id == paths[student_id].id:
+                    existing[student_id].add(position)
+
+            if stale:
+                OrientationCareerPath.objects.filter(id__in=stale).delete()
+            if unmatched_rows:
+                OrientationCareerPath.objects.filter(id__in=unmatched_rows).update(compatibility_score=0)
+
+            reason = _('Recommandation automatique basée sur les compétences de l\'étudiant.')
+            recommendations = []
+            for student_id in matched:
+                for career_index in set(targets[student_id]) | existing[student_id]:
+                    recommendations.append(OrientationCareerPath(
+                        orientation_path_id=paths[student_id].id,
+                        career_path_id=career_ids[career_index],
+                        compatibility_score=round(scores[student_id][career_index]),
+                        recommendation_reason=reason,
+                        is_automatic=True
+                    ))
+
+            OrientationCareerPath.objects.bulk_create(
+                recommendations,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['orientation_path', 'career_path'],
+                update_fields=['compatibility_score']
+            )
+
+        return len(recommendations)
+
+
+def recommend_for_students(student_ids):
+    """
+    Gestionnaire d'effets de bord : recalcule en un passage les
+    recommandations des étudiants dont les compétences ont changé.
+    """
+    try:
+        CareerRecommendationEngine().run(student_ids=list(student_ids))
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des recommandations des étudiants {list(student_ids)}: {str(e)}")
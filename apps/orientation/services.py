@@ -0,0 +1,102 @@
+from django.db import transaction
+
+import logging
+from .models import AssessmentAnswer
+from .question_sets import get_question_set
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentService:
+    """
+    Service pour gérer la soumission et la notation des évaluations.
+    """
+    @classmethod
+    def build_answer_data(cls, question, value):
+        """
+        Prépare les données de réponse en fonction du type de question.
+
+        Args:
+            question: Question compilée concernée
+            value: Valeur nettoyée par le formulaire
+
+        Returns:
+            Dictionnaire de réponse, ou None si la question à choix n'a pas été répondue
+        """
+        question_type = question.question_type
+
+        if question_type in ['single_choice', 'scale'] and value in (None, ''):
+            return None
+
+        if question_type == 'single_choice':
+            return {'selected_option': int(value)}
+        elif question_type == 'multiple_choice':
+            return {'selected_options': [int(v) for v in value]}
+        elif question_type == 'text':
+            return {'text': value}
+        elif question_type == 'numeric':
+            return {'value': value}
+        elif question_type == 'scale':
+            return {'value': int(value)}
+
+        return {}
+
+    @classmethod
+    def submit_answers(cls, assessment, answers, questions=None):
+        """
+        Enregistre toutes les réponses d'une évaluation et la termine.
+
+        Les réponses sont insérées ou mises à jour en une seule requête et le
+        score est calculé en mémoire pendant la même passe, si bien que le nombre
+        de requêtes ne dépend pas du nombre de questions.
+
+        Args:
+            assessment: Évaluation concernée
+            answers: Dictionnaire {id de question: valeur nettoyée}
+            questions: Questionnaire compilé déjà chargé, facultatif
+
+        Returns:
+            Le score obtenu
+        """
+        if questions is None:
+            questions = get_question_set(assessment.assessment_type)
+
+        rows = []
+        total_points = 0
+        earned_points = 0
+
+        for question_id, value in answers.items():
+            question = questions.get(question_id)
+            if question is None:
+                logger.warning(f"Question {question_id} inconnue pour l'évaluation {assessment.pk}")
+                continue
+
+            answer_data = cls.build_answer_data(question, value)
+            if answer_data is None:
+                continue
+
+            rows.append(AssessmentAnswer(
+                assessment=assessment,
+                question_id=question.id,
+                answer_data=answer_data
+            ))
+
+            total_points += question.points
+            if question.is_correct(answer_data):
+                earned_points += question.points
+
+        score = assessment.compute_score(earned_points, total_points)
+
+        with transaction.atomic():
+            if rows:
+                AssessmentAnswer.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['assessment', 'question'],
+                    update_fields=['answer_data', 'updated_at']
+                )
+
+            # Marquer l'évaluation comme terminée avec le score déjà calculé
+            assessment.complete(score=score)
+
+        return score
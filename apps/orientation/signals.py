@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from .models import AssessmentQuestion, StudentSkill
+from .question_sets import invalidate_question_set
+from .recommendations import recommend_for_students
+from apps.analytics.side_effects import defer
+
+# Envoyé une seule fois par évaluation, lorsqu'elle est terminée et notée.
+# Arguments : assessment
+assessment_completed = Signal()
+
+
+@receiver(post_save, sender=AssessmentQuestion)
+@receiver(post_delete, sender=AssessmentQuestion)
+def invalidate_question_set_on_change(sender, instance, **kwargs):
+    """
+    Invalide le questionnaire compilé lorsqu'une question est ajoutée,
+    modifiée ou supprimée.
+    """
+    invalidate_question_set(instance.assessment_type_id)
+
+
+@receiver(post_save, sender=StudentSkill)
+@receiver(post_delete, sender=StudentSkill)
+def refresh_career_recommendations(sender, instance, **kwargs):
+    """
+    Recalcule les filières recommandées d'un étudiant lorsque ses compétences
+    changent, une fois la transaction validée et une seule fois par étudiant.
+    """
+    defer(recommend_for_students, instance.student_id, key=instance.student_id)
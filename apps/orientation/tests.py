@@ -1,3 +1,299 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from apps.accounts.models import User
+from .models import (
+    AssessmentType, AssessmentQuestion, Assessment, AssessmentAnswer,
+    SkillCategory, Skill, CareerField, CareerPath, OrientationPath,
+    OrientationCareerPath, StudentSkill
+)
+from .forms import TakeAssessmentForm
+from .question_sets import clear_local_cache
+from .recommendations import CareerMatrix, CareerRecommendationEngine
+
+
+class TakeAssessmentFormTest(TestCase):
+    """
+    Tests pour la soumission groupée des réponses d'une évaluation.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        clear_local_cache()
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        self.assessment_type = AssessmentType.objects.create(
+            name='Aptitudes',
+            description='Évaluation des aptitudes',
+            max_score=100
+        )
+        self.assessment = Assessment.objects.create(
+            student=self.student,
+            assessment_type=self.assessment_type
+        )
+        self.assessment.start()
+
+    def _create_choice_questions(self, count):
+        return [
+            AssessmentQuestion.objects.create(
+                assessment_type=self.assessment_type,
+                text=f'Question {index}',
+                question_type='single_choice',
+                order=index,
+                options={'choices': ['A', 'B', 'C'], 'correct_answer': 1}
+            )
+            for index in range(count)
+        ]
+
+    def test_save_scores_in_memory(self):
+        """
+        Test que le score est calculé à partir des réponses soumises.
+        """
+        questions = self._create_choice_questions(4)
+        data = {f'question_{question.id}': '1' for question in questions[:3]}
+        data[f'question_{questions[3].id}'] = '0'
+
+        form = TakeAssessmentForm(data, assessment=self.assessment)
+        self.assertTrue(form.is_valid())
+        score = form.save()
+
+        self.assessment.refresh_from_db()
+        self.assertEqual(score, 75)
+        self.assertEqual(self.assessment.score, 75)
+        self.assertEqual(self.assessment.status, 'completed')
+        self.assertEqual(self.assessment.answers.count(), 4)
+
+        # Le score calculé depuis la base doit être identique
+        self.assertEqual(self.assessment.calculate_score(), 75)
+
+    def test_save_updates_existing_answers(self):
+        """
+        Test que les réponses existantes sont mises à jour et non dupliquées.
+        """
+        question = self._create_choice_questions(1)[0]
+        AssessmentAnswer.objects.create(
+            assessment=self.assessment,
+            question=question,
+            answer_data={'selected_option': 0}
+        )
+
+        form = TakeAssessmentForm({f'question_{question.id}': '1'}, assessment=self.assessment)
+        self.assertTrue(form.is_valid())
+        form.save()
+
+        answer = AssessmentAnswer.objects.get(assessment=self.assessment, question=question)
+        self.assertEqual(answer.answer_data, {'selected_option': 1})
+        self.assertTrue(answer.is_correct())
+
+    def test_save_query_count_is_constant(self):
+        """
+        Test que le nombre de requêtes ne dépend pas du nombre de questions.
+        """
+        questions = self._create_choice_questions(100)
+        data = {f'question_{question.id}': '1' for question in questions}
+        assessment = Assessment.objects.get(pk=self.assessment.pk)
+
+        # Type d'évaluation, compilation du questionnaire, insertion groupée,
+        # mise à jour de l'évaluation et point de sauvegarde de la transaction
+        with self.assertNumQueries(6):
+            form = TakeAssessmentForm(data, assessment=assessment)
+            self.assertTrue(form.is_valid())
+            form.save()
+
+        self.assertEqual(assessment.score, 100)
+
+
+class QuestionSetTest(TestCase):
+    """
+    Tests pour les questionnaires compilés et leur invalidation.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        cache.clear()
+        clear_local_cache()
+        self.assessment_type = AssessmentType.objects.create(
+            name='Intérêts',
+            description='Évaluation des intérêts'
+        )
+        self.question = AssessmentQuestion.objects.create(
+            assessment_type=self.assessment_type,
+            text='Question à choix multiple',
+            question_type='multiple_choice',
+            points=3,
+            options={'choices': ['A', 'B', 'C'], 'correct_answers': [0, 2]}
+        )
+        AssessmentQuestion.objects.create(
+            assessment_type=self.assessment_type,
+            text='Question inactive',
+            question_type='text',
+            is_active=False
+        )
+
+    def _reload_type(self):
+        return AssessmentType.objects.get(pk=self.assessment_type.pk)
+
+    def test_question_set_is_compiled(self):
+        """
+        Test que le questionnaire contient les options, clés et points précompilés.
+        """
+        question_set = self._reload_type().get_question_set()
+
+        self.assertEqual(len(question_set), 1)
+        compiled = question_set.get(self.question.id)
+        self.assertEqual(compiled.choices, ('A', 'B', 'C'))
+        self.assertEqual(compiled.correct_answers, frozenset([0, 2]))
+        self.assertEqual(question_set.total_points, 3)
+        self.assertTrue(compiled.is_correct({'selected_options': [2, 0]}))
+        self.assertFalse(compiled.is_correct({'selected_options': [0]}))
+
+    def test_question_set_is_reused(self):
+        """
+        Test que le questionnaire n'est compilé qu'une seule fois par version.
+        """
+        assessment_type = self._reload_type()
+        question_set = assessment_type.get_question_set()
+
+        with self.assertNumQueries(0):
+            self.assertIs(assessment_type.get_question_set(), question_set)
+            self.assertEqual(assessment_type.get_question_count(), 1)
+
+    def test_question_change_invalidates_question_set(self):
+        """
+        Test que la modification d'une question produit une nouvelle version.
+        """
+        previous = self._reload_type().get_question_set()
+
+        self.question.points = 5
+        self.question.save()
+
+        current = self._reload_type().get_question_set()
+        self.assertEqual(current.version, previous.version + 1)
+        self.assertEqual(current.total_points, 5)
+
+        self.question.delete()
+        self.assertEqual(self._reload_type().get_question_count(), 0)
+
+
+# Les réglages de test exécutent les effets de bord immédiatement
+@override_settings(SIDE_EFFECTS_SYNC=False)
+class CareerRecommendationEngineTest(TestCase):
+    """
+    Tests pour le moteur de recommandation de filières.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student'
+        )
+        category = SkillCategory.objects.create(name='Sciences')
+        self.python = Skill.objects.create(name='Python', description='Programmation', category=category)
+        self.maths = Skill.objects.create(name='Maths', description='Mathématiques', category=category)
+        self.design = Skill.objects.create(name='Design', description='Graphisme', category=category)
+
+        field = CareerField.objects.create(name='Numérique', description='Métiers du numérique')
+        self.developer = CareerPath.objects.create(name='Développeur', description='Dev', field=field)
+        self.developer.skills_required.set([self.python, self.maths])
+        self.designer = CareerPath.objects.create(name='Designer', description='UI', field=field)
+        self.designer.skills_required.set([self.design])
+
+        StudentSkill.objects.create(student=self.student, skill=self.python, proficiency_level=5)
+        StudentSkill.objects.create(student=self.student, skill=self.maths, proficiency_level=3)
+
+    def test_matrix_scores(self):
+        """
+        Test du calcul des scores de compatibilité.
+        """
+        matrix = CareerMatrix.load()
+        scores = matrix.score({self.student.id: {self.python.id: 5, self.maths.id: 3}})[self.student.id]
+
+        self.assertAlmostEqual(scores[matrix.career_ids.index(self.developer.id)], 80)
+        self.assertAlmostEqual(scores[matrix.career_ids.index(self.designer.id)], 0)
+
+    def test_run_writes_recommendations(self):
+        """
+        Test de l'écriture des meilleures filières dans un parcours d'orientation.
+        """
+        written = CareerRecommendationEngine(top_n=3).run()
+
+        self.assertEqual(written, 1)
+        path = OrientationPath.objects.get(student=self.student)
+        recommendation = OrientationCareerPath.objects.get(orientation_path=path)
+        self.assertEqual(recommendation.career_path, self.developer)
+        self.assertEqual(recommendation.compatibility_score, 80)
+
+    def test_incremental_update_keeps_advisor_reason(self):
+        """
+        Test que le mode incrémental met à jour le score sans écraser la raison du conseiller.
+        """
+        path = OrientationPath.objects.create(student=self.student, title='Mon parcours', description='')
+        OrientationCareerPath.objects.create(
+            orientation_path=path,
+            career_path=self.designer,
+            recommendation_reason='Choisi avec le conseiller',
+            compatibility_score=50
+        )
+
+        StudentSkill.objects.create(student=self.student, skill=self.design, proficiency_level=4)
+        CareerRecommendationEngine().recommend_for_student(self.student.id)
+
+        self.assertEqual(OrientationPath.objects.filter(student=self.student).count(), 1)
+        designer = OrientationCareerPath.objects.get(orientation_path=path, career_path=self.designer)
+        self.assertEqual(designer.compatibility_score, 80)
+        self.assertEqual(designer.recommendation_reason, 'Choisi avec le conseiller')
+        self.assertTrue(
+            OrientationCareerPath.objects.filter(orientation_path=path, career_path=self.developer).exists()
+        )
+
+    def test_rankings_replace_automatic_recommendations(self):
+        """
+        Test qu'une filière automatique sortie du classement est retirée du parcours.
+        """
+        engine = CareerRecommendationEngine(top_n=1)
+        engine.run()
+        path = OrientationPath.objects.get(student=self.student)
+        self.assertTrue(OrientationCareerPath.objects.get(orientation_path=path).is_automatic)
+
+        StudentSkill.objects.create(student=self.student, skill=self.design, proficiency_level=5)
+        engine.run()
+
+        recommendation = OrientationCareerPath.objects.get(orientation_path=path)
+        self.assertEqual(recommendation.career_path, self.designer)
+        self.assertEqual(recommendation.compatibility_score, 100)
+
+    def test_lost_skills_remove_automatic_recommendations(self):
+        """
+        Test que les recommandations automatiques d'un étudiant sans filière compatible sont supprimées.
+        """
+        CareerRecommendationEngine().run()
+        path = OrientationPath.objects.get(student=self.student)
+        OrientationCareerPath.objects.create(
+            orientation_path=path,
+            career_path=self.designer,
+            recommendation_reason='Choisi avec le conseiller',
+            compatibility_score=50
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentSkill.objects.filter(student=self.student).delete()
+
+        designer = OrientationCareerPath.objects.get(orientation_path=path)
+        self.assertEqual(designer.career_path, self.designer)
+        self.assertEqual(designer.compatibility_score, 0)
@@ -100,7 +100,7 @@ class TakeAssessmentView(LoginRequiredMixin, IsStudentMixin, FormView):
     def dispatch(self, request, *args, **kwargs):
         # Récupérer l'évaluation
         self.assessment = get_object_or_404(
-            Assessment,
+            Assessment.objects.select_related('assessment_type'),
             pk=self.kwargs['pk'],
             student=self.request.user
         )
@@ -0,0 +1,268 @@
+"""
+Stockage adressé par contenu des fichiers téléversés (documents d'identité,
+diplômes, CV, fichiers des ressources).
+
+Chaque fichier est haché en SHA-256 pendant son écriture par blocs, puis
+rangé sous un nom déduit de son empreinte (blobs/ab/cd/abcd….pdf). Un même
+contenu téléversé plusieurs fois n'est écrit qu'une fois : les téléversements
+suivants reçoivent le nom du blob existant, et le fichier temporaire est
+abandonné sans copie.
+
+Le modèle Blob compte les références des champs enregistrés dans BLOB_FIELDS
+(tenues à jour par les signaux de l'application). Les blobs sans référence
+sont supprimés par la commande collect_blobs, passé un délai de grâce qui
+protège les téléversements dont l'enregistrement n'est pas encore validé.
+
+Le fichier d'un blob est écrit sur disque avant la validation de la
+transaction qui crée sa ligne Blob : après une annulation, il reste sur disque
+sans ligne. collect_blobs supprime aussi ces fichiers, passé le même délai
+(date de modification, rafraîchie à chaque réutilisation du fichier).
+"""
+
+import hashlib
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIRECTORY = 'blobs'
+
+# Délai avant la suppression d'un blob sans référence ou d'un fichier temporaire
+ORPHAN_GRACE_PERIOD = timedelta(days=1)
+
+# Champs dont les fichiers sont stockés et comptés comme blobs
+BLOB_FIELDS = (
+    ('accounts.User', 'identity_document'),
+    ('accounts.Teacher', 'degree_document'),
+    ('accounts.Teacher', 'cv'),
+    ('accounts.Teacher', 'identity_document'),
+    ('resources.Resource', 'file'),
+)
+
+
+def blob_name(digest, extension):
+    """Nom de stockage d'un blob, réparti en sous-répertoires par préfixe d'empreinte."""
+    return f'{BLOBS_DIRECTORY}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f'{BLOBS_DIRECTORY}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage sur disque dédupliqué : le nom proposé par le champ ne sert qu'à
+    conserver l'extension, le nom final est celui du blob.
+    """
+    def get_available_name(self, name, max_length=None):
+        # Le nom final ne dépend que du contenu : aucune collision à éviter
+        return name
+
+    def _save(self, name, content):
+        Blob = apps.get_model('resources', 'Blob')
+        extension = os.path.splitext(name)[1].lower()
+        digest, size, temporary_path = self._spool(content)
+
+        blob = Blob.objects.filter(digest=digest).first()
+        if blob is None:
+            blob = Blob.objects.get_or_create(
+                digest=digest,
+                defaults={'name': blob_name(digest, extension), 'size': size}
+            )[0]
+        else:
+            # Réutilisation : le blob ne peut plus être ramassé avant le délai de grâce
+            Blob.objects.filter(pk=blob.pk).update(last_used_at=timezone.now())
+
+        if self.exists(blob.name):
+            os.remove(temporary_path)
+            # Fichier réutilisé : protégé du ramasse-miettes s'il n'a pas (encore) de ligne Blob
+            os.utime(self.path(blob.name))
+        else:
+            final_path = self.path(blob.name)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(temporary_path, final_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(final_path, self.file_permissions_mode)
+        return blob.name
+
+    def _spool(self, content):
+        """
+        Écrit le contenu dans un fichier temporaire en le hachant bloc par bloc.
+
+        Returns:
+            Tuple (empreinte SHA-256, taille, chemin du fichier temporaire)
+        """
+        temporary_path = self.path(f'{BLOBS_DIRECTORY}/tmp/{uuid.uuid4().hex}')
+        os.makedirs(os.path.dirname(temporary_path), exist_ok=True)
+
+        sha256 = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        try:
+            with open(temporary_path, 'wb') as output:
+                for chunk in content.chunks():
+                    sha256.update(chunk)
+                    output.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        return sha256.hexdigest(), size, temporary_path
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def get_blob_storage():
+    """Stockage des champs de BLOB_FIELDS (référencé par les migrations)."""
+    return blob_storage
+
+
+def blob_fields():
+    """Renvoie les couples (modèle, nom du champ) enregistrés dans BLOB_FIELDS."""
+    return [(apps.get_model(model_label), field_name) for model_label, field_name in BLOB_FIELDS]
+
+
+def stored_name(value):
+    """Nom de blob d'une valeur de champ fichier déjà enregistrée, ou None."""
+    if isinstance(value, str):
+        name = value
+    else:
+        name = getattr(value, 'name', None) if getattr(value, '_committed', False) else None
+    return name if is_blob_name(name) else None
+
+
+def update_references(old_names, new_names):
+    """
+    Ajuste les compteurs de références après le remplacement de fichiers.
+
+    Args:
+        old_names: Noms de blobs qui n'étaient plus référencés par l'instance
+        new_names: Noms de blobs désormais référencés
+    """
+    changes = Counter(name for name in new_names if name)
+    changes.subtract(name for name in old_names if name)
+
+    Blob = apps.get_model('resources', 'Blob')
+    for delta in {delta for delta in changes.values() if delta}:
+        names = [name for name, change in changes.items() if change == delta]
+        Blob.objects.filter(name__in=names).update(ref_count=F('ref_count') + delta)
+
+
+def collect_orphans(grace_period=ORPHAN_GRACE_PERIOD, dry_run=False):
+    """
+    Recalcule les compteurs de références à partir des champs, puis supprime
+    les blobs sans référence inutilisés depuis le délai de grâce, les fichiers
+    de blobs sans ligne Blob (transaction annulée) et les fichiers temporaires
+    abandonnés, passé le même délai.
+
+    Returns:
+        Tuple (compteurs corrigés, blobs et fichiers supprimés, octets libérés)
+    """
+    Blob = apps.get_model('resources', 'Blob')
+
+    references = Counter()
+    for model, field_name in blob_fields():
+        references.update(
+            model._default_manager
+            .filter(**{f'{field_name}__startswith': f'{BLOBS_DIRECTORY}/'})
+            .values_list(field_name, flat=True)
+            .iterator()
+        )
+
+    corrected = []
+    for blob in Blob.objects.only('id', 'name', 'ref_count').iterator():
+        if blob.ref_count != references[blob.name]:
+            blob.ref_count = references[blob.name]
+            corrected.append(blob)
+
+    if not dry_run:
+        Blob.objects.bulk_update(corrected, ['ref_count'], batch_size=1000)
+
+    cutoff = timezone.now() - grace_period
+    orphans = [
+        blob for blob in Blob.objects.filter(last_used_at__lt=cutoff).only('id', 'name', 'size').iterator()
+        if not references[blob.name]
+    ]
+    unrecorded = _unrecorded_files(cutoff)
+    if dry_run:
+        return (
+            len(corrected),
+            len(orphans) + len(unrecorded),
+            sum(blob.size for blob in orphans) + sum(size for name, size in unrecorded)
+        )
+
+    deleted = freed = 0
+    for blob in orphans:
+        # Un téléversement ou un enregistrement concurrent a pu réutiliser le blob
+        if not Blob.objects.filter(pk=blob.pk, ref_count=0, last_used_at__lt=cutoff).delete()[0]:
+            continue
+        if blob_storage.exists(blob.name):
+            blob_storage.delete(blob.name)
+        deleted += 1
+        freed += blob.size
+
+    for name, size in unrecorded:
+        # Une ligne a pu être créée depuis le parcours du répertoire
+        if Blob.objects.filter(name=name).exists():
+            continue
+        blob_storage.delete(name)
+        deleted += 1
+        freed += size
+
+    _delete_stale_temporary_files(cutoff)
+    return len(corrected), deleted, freed
+
+
+def _unrecorded_files(cutoff):
+    """
+    Fichiers de blobs sans ligne Blob, non modifiés depuis la date indiquée
+    (une requête par répertoire).
+
+    Returns:
+        Liste de couples (nom de stockage, taille)
+    """
+    Blob = apps.get_model('resources', 'Blob')
+    root = blob_storage.path(BLOBS_DIRECTORY)
+    temporary_directory = os.path.join(root, 'tmp')
+
+    unrecorded = []
+    for directory, subdirectories, files in os.walk(root):
+        if directory == temporary_directory:
+            subdirectories[:] = []
+            continue
+        candidates = {}
+        for filename in files:
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime < cutoff.timestamp():
+                name = os.path.relpath(path, blob_storage.location).replace(os.sep, '/')
+                candidates[name] = stat.st_size
+        if candidates:
+            recorded = set(Blob.objects.filter(name__in=candidates).values_list('name', flat=True))
+            unrecorded.extend((name, size) for name, size in candidates.items() if name not in recorded)
+    return unrecorded
+
+
+def _delete_stale_temporary_files(cutoff):
+    directory = blob_storage.path(f'{BLOBS_DIRECTORY}/tmp')
+    if not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff.timestamp():
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Impossible de supprimer le fichier temporaire {entry.path}: {str(e)}")
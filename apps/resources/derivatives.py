@@ -0,0 +1,213 @@
+"""
+Déclinaisons redimensionnées des images téléversées (vignettes, logos, photos).
+
+Pour chaque image source, des déclinaisons sont produites à plusieurs tailles
+(DERIVATIVE_SIZES), en JPEG et en WebP, à des chemins déterministes calculés à
+partir du nom de la source : les sérialiseurs peuvent donc exposer leurs URL
+(attribut srcset) sans interroger la base ni le stockage.
+
+La génération a lieu après la validation de la transaction, dans un petit
+groupe de threads, hors du cycle de la requête de téléversement. Les JPEG sont
+décodés directement à l'échelle réduite grâce à Image.draft(). La commande
+generate_image_derivatives rattrape les images existantes.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Côté le plus long de chaque déclinaison, en pixels
+DERIVATIVE_SIZES = (64, 256, 1024)
+
+# Format de sortie : (extension, format Pillow, options d'enregistrement)
+DERIVATIVE_FORMATS = (
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+)
+
+DERIVATIVES_DIRECTORY = 'derivatives'
+
+# Champs image dont les déclinaisons sont générées
+IMAGE_FIELDS = (
+    ('accounts.User', 'profile_picture'),
+    ('resources.Resource', 'thumbnail'),
+    ('resources.ResourceCollection', 'cover_image'),
+    ('schools.School', 'logo'),
+    ('schools.School', 'cover_image'),
+    ('schools.Facility', 'image'),
+    ('schools.SchoolMedia', 'thumbnail'),
+    ('schools.SchoolMedia', 'file'),
+    ('messaging.Conversation', 'group_avatar'),
+)
+
+_executor = None
+
+
+def derivative_name(source_name, size, extension):
+    """Chemin de stockage d'une déclinaison, déduit du nom de la source."""
+    base, _ = os.path.splitext(source_name)
+    return f'{DERIVATIVES_DIRECTORY}/{base}/{size}.{extension}'
+
+
+def derivative_names(source_name):
+    """Tous les chemins de déclinaisons d'une source."""
+    return [
+        derivative_name(source_name, size, extension)
+        for size in DERIVATIVE_SIZES
+        for extension, _, _ in DERIVATIVE_FORMATS
+    ]
+
+
+def generate_derivatives(storage, source_name, force=False):
+    """
+    Génère les déclinaisons d'une image stockée.
+
+    Args:
+        storage: Le stockage contenant la source et les déclinaisons
+        source_name: Le nom de la source dans le stockage
+        force: Si True, régénère les déclinaisons déjà présentes
+
+    Returns:
+        Nombre de fichiers écrits (0 si la source n'est pas une image)
+    """
+    if not force and all(storage.exists(name) for name in derivative_names(source_name)):
+        return 0
+
+    try:
+        with storage.open(source_name, 'rb') as source:
+            image = Image.open(source)
+            # Décodage JPEG directement à l'échelle de la plus grande déclinaison
+            image.draft('RGB', (max(DERIVATIVE_SIZES), max(DERIVATIVE_SIZES)))
+            image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError):
+        # Vidéo ou document (médias d'établissement) : pas de déclinaison
+        return 0
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    written = 0
+    # Du plus grand au plus petit : chaque taille est réduite depuis la précédente
+    for size in sorted(DERIVATIVE_SIZES, reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        for extension, image_format, options in DERIVATIVE_FORMATS:
+            output = image
+            if image_format == 'JPEG' and has_alpha:
+                # Le JPEG n'a pas de transparence : fond blanc
+                output = Image.new('RGB', image.size, (255, 255, 255))
+                output.paste(image, mask=image.getchannel('A'))
+
+            buffer = BytesIO()
+            output.save(buffer, format=image_format, **options)
+
+            name = derivative_name(source_name, size, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            written += 1
+
+    return written
+
+
+def stored_image_name(value):
+    """Nom d'une image déjà enregistrée dans le stockage, ou None."""
+    if isinstance(value, str):
+        return value or None
+    if getattr(value, '_committed', False):
+        return value.name or None
+    return None
+
+
+def delete_derivatives(storage, source_name):
+    """Supprime les déclinaisons d'une source."""
+    for name in derivative_names(source_name):
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def _generate_safely(storage, source_name):
+    try:
+        generate_derivatives(storage, source_name)
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération des déclinaisons de {source_name}: {str(e)}")
+
+
+def schedule_derivatives(field_file):
+    """
+    Programme la génération des déclinaisons d'une image après la validation
+    de la transaction en cours.
+
+    Le paramètre IMAGE_DERIVATIVES_BACKGROUND (True par défaut) permet de
+    générer les déclinaisons directement, sans thread (tests).
+    """
+    if not field_file:
+        return
+
+    storage, source_name = field_file.storage, field_file.name
+
+    def run():
+        if getattr(settings, 'IMAGE_DERIVATIVES_BACKGROUND', True):
+            _get_executor().submit(_generate_safely, storage, source_name)
+        else:
+            _generate_safely(storage, source_name)
+
+    transaction.on_commit(run)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-derivatives')
+    return _executor
+
+
+def image_fields():
+    """Renvoie les couples (modèle, nom du champ) enregistrés dans IMAGE_FIELDS."""
+    return [(apps.get_model(model_label), field_name) for model_label, field_name in IMAGE_FIELDS]
+
+
+def derivative_urls(field_file):
+    """
+    URL des déclinaisons d'une image, au format srcset.
+
+    Returns:
+        Dictionnaire {'original', 'srcset', 'webp_srcset', 'sizes'} ou None
+    """
+    if not field_file:
+        return None
+
+    storage, name = field_file.storage, field_file.name
+    sizes = {
+        size: {
+            extension: storage.url(derivative_name(name, size, extension))
+            for extension, _, _ in DERIVATIVE_FORMATS
+        }
+        for size in DERIVATIVE_SIZES
+    }
+    return {
+        'original': field_file.url,
+        'srcset': ', '.join(f"{urls['jpg']} {size}w" for size, urls in sizes.items()),
+        'webp_srcset': ', '.join(f"{urls['webp']} {size}w" for size, urls in sizes.items()),
+        'sizes': sizes,
+    }
+
+
+class ImageDerivativesField(serializers.ReadOnlyField):
+    """
+    Champ de sérialiseur exposant les déclinaisons d'un champ image.
+
+    Exemple : logo_derivatives = ImageDerivativesField(source='logo')
+    """
+    def to_representation(self, value):
+        return derivative_urls(value)
@@ -0,0 +1,211 @@
+"""
+Téléchargement des fichiers stockés (ressources, rapports, médias, documents).
+
+Les fichiers sont envoyés par blocs via FileResponse, sans jamais être chargés
+entièrement en mémoire. Une requête Range (reprise d'un téléchargement,
+positionnement dans une vidéo) reçoit une réponse 206 limitée à la plage
+demandée, et les validateurs ETag / Last-Modified permettent de répondre 304
+aux requêtes conditionnelles.
+
+L'envoi peut être délégué au serveur frontal avec le paramètre DOWNLOADS_OFFLOAD
+('x-accel-redirect' pour nginx, 'x-sendfile' pour Apache) : la vue ne fait alors
+que le contrôle d'accès, et le serveur frontal gère lui-même les plages.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+# Taille des blocs lus sur le stockage et envoyés au client
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Lecture bornée d'un fichier : expose au plus `length` octets à partir de `start`.
+
+    `on_close` est appelé à la fermeture de la réponse, une fois le corps envoyé.
+    """
+    def __init__(self, file, start, length, on_close=None):
+        self.file = file
+        self.remaining = length
+        self.on_close = on_close
+        if start:
+            self.file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        try:
+            self.file.close()
+        finally:
+            if self.on_close:
+                self.on_close()
+
+
+def file_validators(field_file):
+    """
+    Calcule les validateurs HTTP d'un fichier stocké sans le lire.
+
+    Returns:
+        Tuple (etag, last_modified, size) ; last_modified est un horodatage ou None
+    """
+    size = field_file.size
+    try:
+        modified = field_file.storage.get_modified_time(field_file.name)
+    except (NotImplementedError, OSError):
+        modified = None
+
+    last_modified = int(modified.timestamp()) if modified else None
+    # Le nom, la taille et la date de modification identifient le contenu :
+    # un fichier remplacé change au moins de date, l'ETag est donc fort.
+    fingerprint = f'{field_file.name}:{size}:{modified.timestamp() if modified else ""}'
+    etag = '"%s"' % hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+    return etag, last_modified, size
+
+
+def parse_range(header, size):
+    """
+    Interprète un en-tête Range portant sur une seule plage.
+
+    Returns:
+        Tuple (début, fin incluse), None si l'en-tête doit être ignoré (mal formé
+        ou plages multiples : le fichier est alors envoyé en entier), ou False si
+        la plage est hors du fichier
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Plage suffixe : les N derniers octets
+        suffix = int(last)
+        if not suffix or not size:
+            return False
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def if_range_matches(request, etag, last_modified):
+    """Vérifie que la version visée par If-Range est toujours celle du fichier."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # Comparaison forte : un ETag faible ne correspond jamais
+        return if_range == etag
+    return last_modified is not None and parse_http_date_safe(if_range) == last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+
+
+def offload_response(field_file, mode):
+    """
+    Réponse vide déléguant l'envoi du fichier au serveur frontal.
+    """
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'DOWNLOADS_ACCEL_PREFIX', '/protected/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(field_file.name)
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = field_file.path
+    else:
+        raise ValueError(f"Mode de délégation des téléchargements inconnu: {mode}")
+    return response
+
+
+def serve_file(request, field_file, filename=None, content_type=None, as_attachment=True, on_download=None):
+    """
+    Construit la réponse de téléchargement d'un fichier stocké.
+
+    Args:
+        request: La requête HTTP
+        field_file: Le fichier (FieldFile) à envoyer
+        filename: Nom proposé au client (par défaut celui du fichier stocké)
+        content_type: Type MIME (deviné d'après le nom par défaut)
+        as_attachment: Si True, propose l'enregistrement plutôt que l'affichage
+        on_download: Fonction appelée pour un téléchargement commençant au début
+            du fichier, à la fermeture de la réponse (compteurs de téléchargement)
+
+    Returns:
+        Réponse 200 ou 206, ou 304 / 412 / 416
+    """
+    etag, last_modified, size = file_validators(field_file)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+        return response
+
+    filename = filename or os.path.basename(field_file.name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(range_header, size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            set_validators(response, etag, last_modified)
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    counter = on_download if start == 0 else None
+
+    offload = getattr(settings, 'DOWNLOADS_OFFLOAD', None)
+    if offload:
+        # Le serveur frontal envoie le fichier et gère lui-même l'en-tête Range
+        response = offload_response(field_file, offload)
+        response['Content-Type'] = content_type
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        set_validators(response, etag, last_modified)
+        if counter:
+            counter()
+        return response
+
+    length = end - start + 1
+    response = FileResponse(
+        FileRange(field_file.storage.open(field_file.name, 'rb'), start, length, on_close=counter),
+        as_attachment=as_attachment,
+        filename=filename,
+        content_type=content_type
+    )
+    response.block_size = DOWNLOAD_CHUNK_SIZE
+    response['Content-Length'] = length
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    set_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.resources.blobs import ORPHAN_GRACE_PERIOD, collect_orphans
+
+
+class Command(BaseCommand):
+    """
+    Supprime les blobs qui ne sont plus référencés.
+    """
+    help = "Recalcule les références des blobs et supprime les blobs orphelins."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=ORPHAN_GRACE_PERIOD.total_seconds() / 3600,
+                            help="Ancienneté minimale (en heures) d'un blob orphelin supprimé")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Afficher le bilan sans rien modifier")
+
+    def handle(self, *args, **options):
+        corrected, deleted, freed = collect_orphans(
+            grace_period=timedelta(hours=options['grace_hours']),
+            dry_run=options['dry_run']
+        )
+
+        prefix = "[simulation] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{corrected} compteur(s) corrigé(s), {deleted} blob(s) supprimé(s), "
+            f"{freed / (1024 * 1024):.1f} Mo libéré(s)."
+        ))
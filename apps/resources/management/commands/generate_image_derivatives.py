@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from apps.resources.derivatives import generate_derivatives, image_fields
+
+
+class Command(BaseCommand):
+    """
+    Génère les déclinaisons redimensionnées des images existantes.
+    """
+    help = "Génère les déclinaisons (tailles et WebP) des images déjà téléversées."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Régénérer les déclinaisons déjà présentes")
+        parser.add_argument('--model', action='append', dest='models',
+                            help="Limiter au modèle indiqué, par ex. schools.School (option répétable)")
+
+    def handle(self, *args, **options):
+        total_images = 0
+        total_files = 0
+
+        for model, field_name in image_fields():
+            if options['models'] and model._meta.label not in options['models']:
+                continue
+
+            storage = model._meta.get_field(field_name).storage
+            names = (
+                model._default_manager
+                .exclude(**{f'{field_name}__isnull': True})
+                .exclude(**{field_name: ''})
+                .values_list(field_name, flat=True)
+                .iterator()
+            )
+
+            images = 0
+            for name in names:
+                try:
+                    written = generate_derivatives(storage, name, force=options['force'])
+                except Exception as e:
+                    self.stderr.write(f"{name} : {e}")
+                    continue
+                if written:
+                    images += 1
+                    total_files += written
+
+            total_images += images
+            self.stdout.write(f"{model._meta.label}.{field_name} : {images} image(s) traitée(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_images} image(s) traitée(s), {total_files} déclinaison(s) écrite(s)."
+        ))
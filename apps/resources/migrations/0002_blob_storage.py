@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-19 04:07
+
+import apps.resources.blobs
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resource',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=apps.resources.blobs.get_blob_storage, upload_to='resources/', verbose_name='fichier'),
+        ),
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='empreinte SHA-256')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='nom de stockage')),
+                ('size', models.BigIntegerField(verbose_name='taille (octets)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='nombre de références')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='créé le')),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='dernière utilisation')),
+            ],
+            options={
+                'verbose_name': 'blob',
+                'verbose_name_plural': 'blobs',
+                'indexes': [models.Index(fields=['ref_count', 'last_used_at'], name='resources_b_ref_cou_09ff03_idx')],
+            },
+        ),
+    ]
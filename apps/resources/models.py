@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.conf import settings
+from django.utils import timezone
+
+from .blobs import get_blob_storage
 
 
 class ResourceCategory(models.Model):
@@ -87,7 +91,7 @@ class Resource(models.Model):
         related_name='resources',
         verbose_name=_('catégories')
     )
-    file = models.FileField(_('fichier'), upload_to='resources/', blank=True, null=True)
+    file = models.FileField(_('fichier'), upload_to='resources/', storage=get_blob_storage, blank=True, null=True)
     external_url = models.URLField(_('URL externe'), blank=True, null=True)
     thumbnail = models.ImageField(_('vignette'), upload_to='resource_thumbnails/', blank=True, null=True)
     created_at = models.DateTimeField(_('créée le'), auto_now_add=True)
@@ -149,10 +153,10 @@ class Resource(models.Model):
     
     def increment_download_count(self):
         """
-        Incrémente le compteur de téléchargements de la ressource.
+        Incrémente le compteur de téléchargements de la ressource par une mise
+        à jour atomique, sans relire ni réécrire la ligne.
         """
-        self.download_count += 1
-        self.save(update_fields=['download_count'])
+        Resource.objects.filter(pk=self.pk).update(download_count=F('download_count') + 1)
     
     def toggle_like(self, user):
         """
@@ -371,4 +375,28 @@ class CollectionResource(models.Model):
         unique_together = ('collection', 'resource')
     
     def __str__(self):
-        return f"{self.resource.title} dans {self.collection.title}"
\ No newline at end of file
+        return f"{self.resource.title} dans {self.collection.title}"
+
+
+class Blob(models.Model):
+    """
+    Fichier stocké une seule fois par contenu (voir apps.resources.blobs),
+    avec le nombre de champs qui le référencent.
+    """
+    digest = models.CharField(_('empreinte SHA-256'), max_length=64, unique=True)
+    name = models.CharField(_('nom de stockage'), max_length=255, unique=True)
+    size = models.BigIntegerField(_('taille (octets)'))
+    ref_count = models.PositiveIntegerField(_('nombre de références'), default=0)
+    created_at = models.DateTimeField(_('créé le'), auto_now_add=True)
+    last_used_at = models.DateTimeField(_('dernière utilisation'), default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('blob')
+        verbose_name_plural = _('blobs')
+        indexes = [
+            # Recherche des blobs sans référence par le ramasse-miettes
+            models.Index(fields=['ref_count', 'last_used_at']),
+        ]
+    
+    def __str__(self):
+        return self.name
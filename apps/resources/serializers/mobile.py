@@ -1,10 +1,14 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from apps.analytics.fieldsets import SparseFieldsetMixin
+
 from .base import (
     ResourceBaseSerializer, ResourceCategoryBaseSerializer, 
     ResourceReviewBaseSerializer, ResourceCommentBaseSerializer, 
     ResourceCollectionBaseSerializer
 )
+from ..derivatives import ImageDerivativesField
 from ..models import Resource, ResourceReview, ResourceComment, ResourceCollection, CollectionResource
 
 
@@ -22,10 +26,11 @@ class MobileResourceSerializer(ResourceBaseSerializer):
     """
     file_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    thumbnail_derivatives = ImageDerivativesField(source='thumbnail')
     
     class Meta(ResourceBaseSerializer.Meta):
         fields = ResourceBaseSerializer.Meta.fields + [
-            'file_url', 'thumbnail_url'
+            'file_url', 'thumbnail_url', 'thumbnail_derivatives'
         ]
     
     def get_file_url(self, obj):
@@ -82,10 +87,11 @@ class MobileResourceCollectionSerializer(ResourceCollectionBaseSerializer):
     """
     resources = serializers.SerializerMethodField()
     cover_url = serializers.SerializerMethodField()
+    cover_derivatives = ImageDerivativesField(source='cover_image')
     
     class Meta(ResourceCollectionBaseSerializer.Meta):
         fields = ResourceCollectionBaseSerializer.Meta.fields + [
-            'resources', 'cover_url'
+            'resources', 'cover_url', 'cover_derivatives'
         ]
     
     def get_resources(self, obj):
@@ -102,9 +108,10 @@ class MobileResourceCollectionSerializer(ResourceCollectionBaseSerializer):
         return None
 
 
-class MobileResourceDetailSerializer(MobileResourceSerializer):
+class MobileResourceDetailSerializer(SparseFieldsetMixin, MobileResourceSerializer):
     """
     Sérialiseur détaillé pour les ressources (mobile).
+    Accepte ?fields= et ?expand= (voir apps.analytics.fieldsets).
     """
     reviews = MobileResourceReviewSerializer(many=True, read_only=True)
     comments = serializers.SerializerMethodField()
@@ -116,17 +123,39 @@ class MobileResourceDetailSerializer(MobileResourceSerializer):
             'external_url', 'language', 'duration', 
             'author_name', 'source', 'license'
         ]
+        expandable_fields = ('reviews', 'comments', 'collections')
+        select_related_fields = {
+            'creator_name': ('created_by',),
+        }
+        prefetch_related_fields = {
+            'categories': ('categories',),
+            'reviews': (Prefetch('reviews', queryset=ResourceReview.objects.select_related('user')),),
+            'comments': (Prefetch(
+                'comments',
+                queryset=ResourceComment.objects.filter(parent=None, is_public=True).select_related('user'),
+                to_attr='public_comments'
+            ),),
+            'collections': (Prefetch(
+                'collections',
+                queryset=ResourceCollection.objects.filter(is_public=True).select_related('created_by'),
+                to_attr='public_collections'
+            ),),
+        }
     
     def get_comments(self, obj):
         """Renvoie les commentaires de premier niveau de la ressource."""
-        comments = ResourceComment.objects.filter(
-            resource=obj, parent=None, is_public=True
-        ).select_related('user')
+        comments = getattr(obj, 'public_comments', None)
+        if comments is None:
+            comments = ResourceComment.objects.filter(
+                resource=obj, parent=None, is_public=True
+            ).select_related('user')
         return MobileResourceCommentSerializer(comments, many=True).data
     
     def get_collections(self, obj):
         """Renvoie les collections publiques contenant cette ressource."""
-        collections = ResourceCollection.objects.filter(
-            resources=obj, is_public=True
-        ).select_related('created_by')
+        collections = getattr(obj, 'public_collections', None)
+        if collections is None:
+            collections = ResourceCollection.objects.filter(
+                resources=obj, is_public=True
+            ).select_related('created_by')
         return MobileResourceCollectionSerializer(collections, many=True).data
\ No newline at end of file
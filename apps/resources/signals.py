@@ -1,14 +1,131 @@
-from django.db.models.signals import post_save, post_delete, pre_delete
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.core.cache import cache
+from django.db import transaction
 from django.utils.text import slugify
 
+from .blobs import blob_fields, is_blob_name, stored_name, update_references
+from .derivatives import delete_derivatives, image_fields, schedule_derivatives, stored_image_name
 from .models import (
     Resource, ResourceCategory, ResourceReview, ResourceComment,
     ResourceLike, ResourceCollection, CollectionResource
 )
 
 
+def schedule_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    """
+    Programme la génération des déclinaisons des champs image d'une instance.
+    Les déclinaisons déjà présentes ne sont pas régénérées.
+    """
+    for field_name, attname in IMAGE_FIELD_NAMES[sender]:
+        if update_fields is None or field_name in update_fields:
+            schedule_derivatives(getattr(instance, field_name))
+
+
+def remember_image_names(sender, instance, **kwargs):
+    """
+    Conserve les noms des images enregistrées au chargement de l'instance,
+    pour détecter sans requête leur remplacement. Les champs différés ne sont
+    pas suivis.
+    """
+    instance._image_names = {
+        field_name: stored_image_name(instance.__dict__[attname])
+        for field_name, attname in IMAGE_FIELD_NAMES[sender]
+        if attname in instance.__dict__
+    }
+
+
+def delete_replaced_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    """
+    Supprime, après validation de la transaction, les déclinaisons des images
+    remplacées par un fichier d'un autre nom (ou retirées).
+    """
+    previous = getattr(instance, '_image_names', {})
+    for field_name, old_name in list(previous.items()):
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        field_file = getattr(instance, field_name)
+        new_name = stored_image_name(field_file)
+        if old_name and new_name != old_name:
+            storage = field_file.storage
+            transaction.on_commit(lambda storage=storage, name=old_name: delete_derivatives(storage, name))
+        previous[field_name] = new_name
+
+
+def delete_image_derivatives(sender, instance, **kwargs):
+    """
+    Supprime les déclinaisons des champs image d'une instance supprimée.
+    Connecté avant les récepteurs qui suppriment les fichiers source.
+    """
+    for field_name, attname in IMAGE_FIELD_NAMES[sender]:
+        field_file = getattr(instance, field_name)
+        if field_file:
+            storage, name = field_file.storage, field_file.name
+            transaction.on_commit(lambda storage=storage, name=name: delete_derivatives(storage, name))
+
+
+# Champs image de chaque modèle (toutes applications confondues)
+IMAGE_FIELD_NAMES = {}
+for model, field_name in image_fields():
+    IMAGE_FIELD_NAMES.setdefault(model, []).append((field_name, model._meta.get_field(field_name).attname))
+
+for model in IMAGE_FIELD_NAMES:
+    post_init.connect(remember_image_names, sender=model, dispatch_uid=f'remember_image_names_{model._meta.label}')
+    post_save.connect(delete_replaced_image_derivatives, sender=model, dispatch_uid=f'replaced_image_derivatives_{model._meta.label}')
+    post_save.connect(schedule_image_derivatives, sender=model, dispatch_uid=f'image_derivatives_{model._meta.label}')
+    pre_delete.connect(delete_image_derivatives, sender=model, dispatch_uid=f'delete_image_derivatives_{model._meta.label}')
+
+
+def remember_blob_names(sender, instance, **kwargs):
+    """
+    Conserve les noms des blobs référencés au chargement de l'instance, pour
+    comparer sans requête lors de l'enregistrement. Les champs différés ne
+    sont pas suivis (le ramasse-miettes corrige les compteurs).
+    """
+    instance._blob_names = {
+        field_name: stored_name(instance.__dict__[attname])
+        for field_name, attname in BLOB_FIELD_NAMES[sender]
+        if attname in instance.__dict__
+    }
+
+
+def count_blob_references(sender, instance, update_fields=None, **kwargs):
+    """
+    Met à jour les compteurs de références des blobs remplacés ou ajoutés.
+    """
+    previous = getattr(instance, '_blob_names', {})
+    changed = {}
+    for field_name in previous:
+        if update_fields is None or field_name in update_fields:
+            name = stored_name(getattr(instance, field_name))
+            if name != previous[field_name]:
+                changed[field_name] = name
+
+    if changed:
+        update_references([previous[field_name] for field_name in changed], changed.values())
+        previous.update(changed)
+
+
+def release_blob_references(sender, instance, **kwargs):
+    """
+    Libère les blobs d'une instance supprimée ; les fichiers eux-mêmes sont
+    supprimés par le ramasse-miettes (commande collect_blobs).
+    """
+    update_references(getattr(instance, '_blob_names', {}).values(), [])
+    instance._blob_names = {}
+
+
+# Champs fichier stockés comme blobs, par modèle
+BLOB_FIELD_NAMES = {}
+for model, field_name in blob_fields():
+    BLOB_FIELD_NAMES.setdefault(model, []).append((field_name, model._meta.get_field(field_name).attname))
+
+for model in BLOB_FIELD_NAMES:
+    post_init.connect(remember_blob_names, sender=model, dispatch_uid=f'remember_blob_names_{model._meta.label}')
+    post_save.connect(count_blob_references, sender=model, dispatch_uid=f'count_blob_references_{model._meta.label}')
+    post_delete.connect(release_blob_references, sender=model, dispatch_uid=f'release_blob_references_{model._meta.label}')
+
+
 @receiver(post_save, sender=Resource)
 def create_resource_slug(sender, instance, created, **kwargs):
     """
@@ -91,7 +208,8 @@ def delete_resource_files(sender, instance, **kwargs):
     """
     Supprime les fichiers associés à une ressource lors de sa suppression.
     """
-    if instance.file:
+    # Un blob peut être partagé : il est supprimé par le ramasse-miettes
+    if instance.file and not is_blob_name(instance.file.name):
         instance.file.delete(False)
     
     if instance.thumbnail:
@@ -115,4 +233,5 @@ def update_resource_like_count(sender, instance, **kwargs):
     """
     resource = instance.resource
     resource.like_count = ResourceLike.objects.filter(resource=resource).count()
-    resource.save(update_fields=['like_count'])
\ No newline at end of file
+    resource.save(update_fields=['like_count'])
+
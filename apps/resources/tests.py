@@ -1,3 +1,274 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
 
-# Create your tests here.
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from .blobs import blob_storage, collect_orphans
+from .derivatives import DERIVATIVE_SIZES, derivative_name
+from .models import Blob, Resource
+from .serializers.mobile import MobileResourceSerializer
+
+
+class ResourceDownloadTest(TestCase):
+    """
+    Tests pour le téléchargement des ressources par plages et requêtes conditionnelles.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='teacher@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Teacher',
+            type='teacher',
+            is_active=True
+        )
+        self.content = bytes(range(256)) * 40
+        self.resource = Resource.objects.create(
+            title='Guide',
+            description='Guide de révision',
+            created_by=self.user,
+            resource_type='document',
+            file=ContentFile(self.content, name='guide.pdf')
+        )
+        self.url = f'/api/resources/resources/{self.resource.slug}/download/'
+        self.client.force_login(self.user)
+
+    def test_full_download_is_streamed_and_counted(self):
+        """
+        Test que le fichier est envoyé par blocs et compté une fois la réponse fermée.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.download_count, 1)
+
+    def test_range_and_conditional_requests(self):
+        """
+        Test des réponses partielles, de If-Range et des réponses 304 / 416.
+        """
+        response = self.client.get(self.url)
+        b''.join(response.streaming_content)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, headers={'range': 'bytes=100-199'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        response = self.client.get(self.url, headers={'range': 'bytes=-10', 'if-range': etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[-10:])
+
+        # Une version obsolète dans If-Range donne le fichier complet
+        response = self.client.get(self.url, headers={'range': 'bytes=0-9', 'if-range': '"obsolete"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        response = self.client.get(self.url, headers={'range': f'bytes={len(self.content)}-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Seuls les téléchargements commençant au début du fichier sont comptés
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.download_count, 2)
+
+    @override_settings(DOWNLOADS_OFFLOAD='x-accel-redirect', DOWNLOADS_ACCEL_PREFIX='/protected/')
+    def test_offload_to_front_server(self):
+        """
+        Test que l'envoi peut être délégué à nginx.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.resource.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertTrue(response.has_header('ETag'))
+
+
+@override_settings(IMAGE_DERIVATIVES_BACKGROUND=False)
+class ImageDerivativesTest(TestCase):
+    """
+    Tests pour la génération des déclinaisons d'images.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='teacher@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Teacher',
+            type='teacher'
+        )
+
+    def test_derivatives_are_generated_after_commit(self):
+        """
+        Test que les déclinaisons JPEG et WebP sont créées à des chemins déterministes.
+        """
+        buffer = BytesIO()
+        Image.new('RGB', (2000, 1500), (200, 30, 30)).save(buffer, format='JPEG')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resource = Resource.objects.create(
+                title='Affiche',
+                description='Affiche de la journée portes ouvertes',
+                created_by=self.user,
+                resource_type='image',
+                thumbnail=ContentFile(buffer.getvalue(), name='affiche.jpg')
+            )
+
+        for size in DERIVATIVE_SIZES:
+            with default_storage.open(derivative_name(resource.thumbnail.name, size, 'webp')) as derivative:
+                self.assertEqual(Image.open(derivative).size, (size, size * 3 // 4))
+            self.assertTrue(default_storage.exists(derivative_name(resource.thumbnail.name, size, 'jpg')))
+
+        images = MobileResourceSerializer(resource).data['thumbnail_derivatives']
+        self.assertEqual(images['original'], resource.thumbnail.url)
+        self.assertIn(f"{default_storage.url(derivative_name(resource.thumbnail.name, 64, 'jpg'))} 64w", images['srcset'])
+
+        # Remplacement de l'image : les déclinaisons de l'ancienne sont supprimées
+        replaced = derivative_name(resource.thumbnail.name, 64, 'jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            resource = Resource.objects.get(pk=resource.pk)
+            resource.thumbnail = ContentFile(buffer.getvalue(), name='affiche-v2.jpg')
+            resource.save()
+        self.assertFalse(default_storage.exists(replaced))
+
+        smallest = derivative_name(resource.thumbnail.name, 64, 'jpg')
+        self.assertTrue(default_storage.exists(smallest))
+        with self.captureOnCommitCallbacks(execute=True):
+            resource.delete()
+        self.assertFalse(default_storage.exists(smallest))
+
+
+class BlobStorageTest(TestCase):
+    """
+    Tests pour le stockage dédupliqué des fichiers téléversés.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            email='teacher@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Teacher',
+            type='teacher'
+        )
+        self.content = b'%PDF-1.4 ' + bytes(range(256)) * 100
+
+    def create_resource(self, content, name='cours.pdf'):
+        return Resource.objects.create(
+            title='Cours',
+            description='Support de cours',
+            created_by=self.user,
+            resource_type='document',
+            file=ContentFile(content, name=name)
+        )
+
+    def test_duplicate_uploads_share_one_blob(self):
+        """
+        Test qu'un même contenu n'est stocké qu'une fois et que ses références sont comptées.
+        """
+        first = self.create_resource(self.content)
+        second = self.create_resource(self.content, name='copie.PDF')
+        self.user.identity_document = ContentFile(self.content, name='identite.pdf')
+        self.user.save()
+
+        blob = Blob.objects.get()
+        self.assertEqual(first.file.name, blob.name)
+        self.assertEqual(second.file.name, blob.name)
+        self.assertEqual(self.user.identity_document.name, blob.name)
+        self.assertEqual(blob.ref_count, 3)
+        self.assertEqual(blob.size, len(self.content))
+        self.assertTrue(blob.name.startswith(f'blobs/{blob.digest[:2]}/'))
+        with blob_storage.open(blob.name) as stored:
+            self.assertEqual(stored.read(), self.content)
+
+        # Un rechargement suivi d'un enregistrement ne change rien
+        Resource.objects.get(pk=first.pk).save()
+        second.file = ContentFile(b'autre contenu', name='autre.pdf')
+        second.save()
+        first.delete()
+
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(blob_storage.exists(blob.name))
+        self.assertEqual(Blob.objects.get(name=second.file.name).ref_count, 1)
+
+    def test_orphans_are_collected_after_grace_period(self):
+        """
+        Test que le ramasse-miettes supprime les blobs sans référence, passé le délai de grâce.
+        """
+        resource = self.create_resource(self.content)
+        name = resource.file.name
+        Blob.objects.update(ref_count=5)
+        resource.delete()
+
+        self.assertEqual(collect_orphans(), (1, 0, 0))
+        self.assertTrue(blob_storage.exists(name))
+
+        self.assertEqual(collect_orphans(grace_period=timedelta(0)), (0, 1, len(self.content)))
+        self.assertFalse(blob_storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_files_of_rolled_back_uploads_are_collected(self):
+        """
+        Test qu'un fichier écrit par une transaction annulée est supprimé, passé le délai de grâce.
+        """
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            resource = self.create_resource(self.content)
+            Resource.objects.create(pk=resource.pk, title='Doublon', description='', created_by=self.user)
+
+        self.assertFalse(Blob.objects.exists())
+        name = resource.file.name
+        self.assertTrue(blob_storage.exists(name))
+
+        self.assertEqual(collect_orphans(), (0, 0, 0))
+        self.assertEqual(collect_orphans(grace_period=timedelta(0), dry_run=True), (0, 1, len(self.content)))
+        self.assertTrue(blob_storage.exists(name))
+
+        self.assertEqual(collect_orphans(grace_period=timedelta(0)), (0, 1, len(self.content)))
+        self.assertFalse(blob_storage.exists(name))
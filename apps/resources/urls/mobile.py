@@ -1,7 +1,7 @@
 from django.urls import path
 from apps.resources.views.mobile import (
     ResourceCategoryAPIListView, ResourceAPIListView,
-    ResourceAPIDetailView, ResourceReviewAPIListCreateView
+    ResourceAPIDetailView, ResourceAPIDownloadView, ResourceReviewAPIListCreateView
 )
 
 app_name = 'resources_api'
@@ -11,5 +11,6 @@ urlpatterns = [
     path('categories/', ResourceCategoryAPIListView.as_view(), name='api_category_list'),
     path('resources/', ResourceAPIListView.as_view(), name='api_resource_list'),
     path('resources/<slug:slug>/', ResourceAPIDetailView.as_view(), name='api_resource_detail'),
+    path('resources/<slug:slug>/download/', ResourceAPIDownloadView.as_view(), name='api_resource_download'),
     path('resources/<slug:slug>/reviews/', ResourceReviewAPIListCreateView.as_view(), name='api_resource_reviews'),
 ]
\ No newline at end of file
@@ -1,10 +1,12 @@
+import os
+
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.views.generic.edit import FormView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import get_object_or_404, redirect
 from django.db.models import Q, Avg, Count, Prefetch
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
 from django.views.decorators.http import require_POST
@@ -15,6 +17,9 @@ from rest_framework import generics, permissions, filters
 from rest_framework.response import Response
 
 from apps.accounts import models
+from apps.analytics.conditional import ConditionalResponseMixin
+from apps.analytics.fieldsets import SparseFieldsetViewMixin
+from apps.analytics.pagination import EstimatedCountPaginator
 from ..models import (
     ResourceCategory, Resource, ResourceReview, ResourceComment, 
     ResourceCollection, CollectionResource, ResourceLike
@@ -28,6 +33,7 @@ from ..serializers.mobile import (
     MobileResourceReviewSerializer, MobileResourceCommentSerializer, MobileResourceCollectionSerializer
 )
 from ..permissions import IsResourceOwnerOrAdmin, CanReviewResource
+from ..downloads import serve_file
 
 
 class ResourceListView(ListView):
@@ -38,6 +44,7 @@ class ResourceListView(ListView):
     template_name = 'resources/resource_list.html'
     context_object_name = 'resources'
     paginate_by = 12
+    paginator_class = EstimatedCountPaginator
     
     def get_queryset(self):
         """
@@ -464,20 +471,24 @@ class ResourceCommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteV
         return super().delete(request, *args, **kwargs)
 
 
-class ResourceCategoryAPIListView(generics.ListAPIView):
+class ResourceCategoryAPIListView(ConditionalResponseMixin, generics.ListAPIView):
     """
-    API pour lister les catégories de ressources.
+    API pour lister les catégories de ressources (réponse 304 si elles n'ont
+    pas changé, conservable une heure par le client).
     """
+    version_models = ('resources.ResourceCategory',)
+    cache_control = {'private': True, 'max_age': 3600}
     queryset = ResourceCategory.objects.filter(is_active=True)
     serializer_class = MobileResourceCategorySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'description']
 
 
-class ResourceAPIListView(generics.ListAPIView):
+class ResourceAPIListView(ConditionalResponseMixin, generics.ListAPIView):
     """
-    API pour lister les ressources.
+    API pour lister les ressources (réponse 304 si la liste n'a pas changé).
     """
+    version_models = ('resources.Resource', 'resources.ResourceCategory')
     serializer_class = MobileResourceSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'tags']
@@ -510,9 +521,10 @@ class ResourceAPIListView(generics.ListAPIView):
         return queryset
 
 
-class ResourceAPIDetailView(generics.RetrieveAPIView):
+class ResourceAPIDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     """
-    API pour récupérer les détails d'une ressource.
+    API pour récupérer les détails d'une ressource. Les relations chargées
+    suivent les champs demandés (?fields=, ?expand=).
     """
     queryset = Resource.objects.filter(is_active=True)
     serializer_class = MobileResourceDetailSerializer
@@ -525,6 +537,28 @@ class ResourceAPIDetailView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
+class ResourceAPIDownloadView(generics.GenericAPIView):
+    """
+    API pour télécharger le fichier d'une ressource (reprise et lecture partielle possibles).
+    """
+    queryset = Resource.objects.filter(is_active=True)
+    lookup_field = 'slug'
+    
+    def get(self, request, *args, **kwargs):
+        resource = self.get_object()
+        
+        # Une ressource privée n'est accessible qu'à son créateur
+        if resource.access_level == 'private' and resource.created_by_id != request.user.pk and not request.user.is_staff:
+            raise Http404
+        if not resource.file:
+            raise Http404
+        
+        # Le nom stocké est l'empreinte du contenu : proposer un nom lisible
+        extension = os.path.splitext(resource.file.name)[1]
+        return serve_file(request, resource.file, filename=f'{resource.slug or resource.pk}{extension}',
+                          on_download=resource.increment_download_count)
+
+
 class ResourceReviewAPIListCreateView(generics.ListCreateAPIView):
     """
     API pour lister et créer des évaluations pour une ressource.
@@ -8,6 +8,7 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 
 from apps.accounts import models
+from apps.analytics.pagination import EstimatedCountPaginator
 from ..models import (
     ResourceCategory, Resource, ResourceReview, ResourceComment, 
     ResourceCollection, CollectionResource, ResourceLike
@@ -212,6 +213,7 @@ class ResourceListView(ListView):
     template_name = 'resources/resource_list.html'
     context_object_name = 'resources'
     paginate_by = 12
+    paginator_class = EstimatedCountPaginator
     
     def get_queryset(self):
         queryset = Resource.objects.filter(is_active=True).select_related('created_by')
@@ -0,0 +1,91 @@
+"""
+Cache versionné des pages d'établissement.
+
+Chaque établissement a un numéro de version conservé dans le cache partagé et
+incrémenté (après validation de la transaction) à chaque modification de
+l'établissement ou d'un objet lié : département, programme, équipement,
+contact, avis, média, événement, type ou ville. Les données construites pour
+une page (réponse sérialisée de l'API, graphe d'objets de la page web) sont
+mises en cache sous (établissement, version) : une modification rend
+simplement les anciennes entrées inaccessibles, sans suppression explicite ni
+coordination entre processus, et une lecture ne fait aucune requête SQL tant
+que rien ne change.
+
+Une version absente du cache (premier accès, éviction) est initialisée à
+partir de l'horloge, pour ne jamais retomber sur une entrée d'une version
+antérieure encore présente.
+"""
+
+import time
+
+from django.core.cache import cache
+
+# Durée de vie des données mises en cache : une version n'est jamais
+# modifiée, seule l'apparition d'une nouvelle version la rend obsolète
+SCHOOL_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(school_id):
+    return f'school_version_{school_id}'
+
+
+def get_version(school_id):
+    """Version courante des données d'un établissement."""
+    key = _version_key(school_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(school_ids):
+    """
+    Rend obsolètes les données en cache des établissements indiqués.
+    Gestionnaire d'effets de bord (voir apps.analytics.side_effects).
+    """
+    for school_id in set(school_ids):
+        try:
+            cache.incr(_version_key(school_id))
+        except ValueError:
+            # Version absente : la prochaine lecture en initialise une nouvelle
+            pass
+
+
+def get_or_build(kind, school_id, build):
+    """
+    Renvoie les données `kind` de la version courante d'un établissement, en
+    les construisant avec `build()` si elles ne sont pas en cache.
+
+    Returns:
+        Tuple (données, version)
+    """
+    version = get_version(school_id)
+    key = f'school_{kind}_{school_id}_v{version}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, SCHOOL_CACHE_TIMEOUT)
+    return data, version
+
+
+def get_school_id(slug, lookup):
+    """
+    Identifiant de l'établissement d'un slug, mis en cache.
+
+    Args:
+        slug: Le slug de l'URL
+        lookup: Fonction renvoyant l'identifiant depuis la base (ou levant Http404)
+    """
+    key = f'school_slug_{slug}'
+    school_id = cache.get(key)
+    if school_id is None:
+        school_id = lookup()
+        cache.set(key, school_id, SCHOOL_CACHE_TIMEOUT)
+    return school_id
+
+
+def forget_slug(slug):
+    """Oublie l'identifiant associé à un slug (slug modifié ou réattribué)."""
+    cache.delete(f'school_slug_{slug}')
@@ -1,7 +1,10 @@
 # schools/serializers/mobile.py
+from django.db.models import Prefetch
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
+from apps.analytics.fieldsets import SparseFieldsetMixin
+from apps.resources.derivatives import ImageDerivativesField, derivative_urls
 from ..models import (
     SchoolType, City, School, Department, Program,
     Facility, SchoolContact, SchoolReview, SchoolMedia, SchoolEvent
@@ -107,10 +110,13 @@ class SchoolMediaSerializer(SchoolMediaBaseSerializer):
     media_type_display = serializers.CharField(source='get_media_type_display', read_only=True)
     file_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    file_derivatives = serializers.SerializerMethodField()
+    thumbnail_derivatives = ImageDerivativesField(source='thumbnail')
     
     class Meta(SchoolMediaBaseSerializer.Meta):
         fields = SchoolMediaBaseSerializer.Meta.fields + [
-            'media_type_display', 'file_url', 'thumbnail_url'
+            'media_type_display', 'file_url', 'thumbnail_url',
+            'file_derivatives', 'thumbnail_derivatives'
         ]
     
     def get_file_url(self, obj):
@@ -119,6 +125,12 @@ class SchoolMediaSerializer(SchoolMediaBaseSerializer):
             return obj.file.url
         return None
     
+    def get_file_derivatives(self, obj):
+        """Retourne les déclinaisons du fichier, pour les photos uniquement."""
+        if obj.media_type == 'photo':
+            return derivative_urls(obj.file)
+        return None
+    
     def get_thumbnail_url(self, obj):
         """Retourne l'URL de la vignette."""
         if obj.thumbnail:
@@ -154,10 +166,11 @@ class SchoolListSerializer(SchoolBaseSerializer):
     city_name = serializers.CharField(source='city.name', read_only=True)
     average_rating = serializers.SerializerMethodField()
     logo_url = serializers.SerializerMethodField()
+    logo_derivatives = ImageDerivativesField(source='logo')
     
     class Meta(SchoolBaseSerializer.Meta):
         fields = SchoolBaseSerializer.Meta.fields + [
-            'school_type_name', 'city_name', 'logo_url', 'average_rating'
+            'school_type_name', 'city_name', 'logo_url', 'logo_derivatives', 'average_rating'
         ]
     
     def get_average_rating(self, obj):
@@ -174,9 +187,14 @@ class SchoolListSerializer(SchoolBaseSerializer):
         return None
 
 
-class SchoolDetailSerializer(serializers.ModelSerializer):
+# Avis publics des établissements, partagés par les champs qui en dépendent
+PUBLIC_REVIEWS = Prefetch('reviews', queryset=SchoolReview.objects.filter(is_public=True).select_related('user'))
+
+
+class SchoolDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Sérialiseur détaillé pour l'API mobile des établissements.
+    Accepte ?fields= et ?expand= (voir apps.analytics.fieldsets).
     """
     school_type = SchoolTypeSerializer(read_only=True)
     city = CitySerializer(read_only=True)
@@ -191,26 +209,50 @@ class SchoolDetailSerializer(serializers.ModelSerializer):
     review_count = serializers.SerializerMethodField()
     logo_url = serializers.SerializerMethodField()
     cover_image_url = serializers.SerializerMethodField()
+    logo_derivatives = ImageDerivativesField(source='logo')
+    cover_image_derivatives = ImageDerivativesField(source='cover_image')
     
     class Meta:
         model = School
         fields = '__all__'
+        expandable_fields = ('departments', 'programs', 'facilities', 'contacts', 'reviews', 'media', 'events')
+        select_related_fields = {
+            'school_type': ('school_type',),
+            'city': ('city',),
+        }
+        prefetch_related_fields = {
+            'departments': ('departments',),
+            'programs': ('programs',),
+            'facilities': ('facilities',),
+            'contacts': ('contacts',),
+            'media': ('media',),
+            'events': ('events',),
+            'reviews': (PUBLIC_REVIEWS,),
+            'average_rating': (PUBLIC_REVIEWS,),
+            'review_count': (PUBLIC_REVIEWS,),
+        }
+    
+    def public_reviews(self, obj):
+        """Avis publics, lus une seule fois (ou depuis le prefetch de la vue)."""
+        cache = self.__dict__.setdefault('_public_reviews', {})
+        if obj.pk not in cache:
+            cache[obj.pk] = [review for review in obj.reviews.all() if review.is_public]
+        return cache[obj.pk]
     
     def get_reviews(self, obj):
         """Retourne uniquement les avis publics."""
-        reviews = obj.reviews.filter(is_public=True)
-        return SchoolReviewSerializer(reviews, many=True).data
+        return SchoolReviewSerializer(self.public_reviews(obj), many=True).data
     
     def get_average_rating(self, obj):
         """Calcule la note moyenne de l'établissement."""
-        reviews = obj.reviews.filter(is_public=True)
-        if not reviews.exists():
+        reviews = self.public_reviews(obj)
+        if not reviews:
             return None
-        return sum(review.rating for review in reviews) / reviews.count()
+        return sum(review.rating for review in reviews) / len(reviews)
     
     def get_review_count(self, obj):
         """Retourne le nombre d'avis publics."""
-        return obj.reviews.filter(is_public=True).count()
+        return len(self.public_reviews(obj))
     
     def get_logo_url(self, obj):
         """Retourne l'URL du logo."""
@@ -1,11 +1,12 @@
 from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.utils.text import slugify
-from django.db.models import Avg
-from django.core.cache import cache
 
+from apps.analytics.side_effects import defer
+from .cache import bump_versions
 from .models import (
-    School, Department, Program, SchoolReview, SchoolMedia, SchoolEvent
+    SchoolType, City, School, Department, Program, Facility,
+    SchoolContact, SchoolReview, SchoolMedia, SchoolEvent
 )
 
 
@@ -73,48 +74,30 @@ def create_program_slug(sender, instance, created, **kwargs):
             instance.save(update_fields=['slug'])
 
 
-@receiver(post_save, sender=SchoolReview)
-def update_school_rating_cache(sender, instance, **kwargs):
+def bump_school_version(sender, instance, **kwargs):
     """
-    Met à jour le cache de la note moyenne de l'école lorsqu'un avis est ajouté ou modifié.
+    Rend obsolètes les pages en cache de l'établissement d'un objet modifié
+    ou supprimé (une seule incrémentation par établissement et par requête).
     """
-    # Recalculer la note moyenne
-    avg_rating = SchoolReview.objects.filter(
-        school=instance.school, is_public=True
-    ).aggregate(Avg('rating'))['rating__avg']
-    
-    # Mettre à jour le cache
-    cache_key = f'school_rating_{instance.school.id}'
-    cache.set(cache_key, avg_rating, 86400)  # Cache pour 24 heures
-    
-    # Mise à jour du nombre d'avis
-    review_count_key = f'school_review_count_{instance.school.id}'
-    review_count = SchoolReview.objects.filter(
-        school=instance.school, is_public=True
-    ).count()
-    cache.set(review_count_key, review_count, 86400)  # Cache pour 24 heures
+    school_id = instance.pk if sender is School else instance.school_id
+    defer(bump_versions, school_id, key=school_id)
 
 
-@receiver(post_delete, sender=SchoolReview)
-def handle_review_deletion(sender, instance, **kwargs):
+def bump_shared_school_versions(sender, instance, **kwargs):
     """
-    Met à jour le cache lorsqu'un avis est supprimé.
+    Rend obsolètes les pages des établissements d'un type ou d'une ville modifiés.
     """
-    # Recalculer la note moyenne
-    avg_rating = SchoolReview.objects.filter(
-        school=instance.school, is_public=True
-    ).aggregate(Avg('rating'))['rating__avg']
-    
-    # Mettre à jour le cache
-    cache_key = f'school_rating_{instance.school.id}'
-    cache.set(cache_key, avg_rating, 86400)  # Cache pour 24 heures
-    
-    # Mise à jour du nombre d'avis
-    review_count_key = f'school_review_count_{instance.school.id}'
-    review_count = SchoolReview.objects.filter(
-        school=instance.school, is_public=True
-    ).count()
-    cache.set(review_count_key, review_count, 86400)  # Cache pour 24 heures
+    field_name = 'school_type' if sender is SchoolType else 'city'
+    for school_id in School.objects.filter(**{field_name: instance}).values_list('id', flat=True):
+        defer(bump_versions, school_id, key=school_id)
+
+
+for model in (School, Department, Program, Facility, SchoolContact, SchoolReview, SchoolMedia, SchoolEvent):
+    post_save.connect(bump_school_version, sender=model, dispatch_uid=f'bump_school_version_{model._meta.label}')
+    post_delete.connect(bump_school_version, sender=model, dispatch_uid=f'bump_school_version_delete_{model._meta.label}')
+
+for model in (SchoolType, City):
+    post_save.connect(bump_shared_school_versions, sender=model, dispatch_uid=f'bump_shared_school_versions_{model._meta.label}')
 
 
 @receiver(pre_delete, sender=SchoolMedia)
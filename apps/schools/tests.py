@@ -1,3 +1,69 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from apps.accounts.models import User
+from .models import City, Department, School, SchoolReview, SchoolType
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'schools-tests'}},
+    SIDE_EFFECTS_SYNC=True
+)
+class SchoolCacheTest(TestCase):
+    """
+    Tests pour le cache versionné des pages d'établissement.
+    """
+
+    def setUp(self):
+        """
+        Configuration initiale pour les tests.
+        """
+        from django.core.cache import cache
+        cache.clear()
+        self.school_type = SchoolType.objects.create(name='Lycée', slug='lycee')
+        self.city = City.objects.create(name='Lyon')
+        self.school = School.objects.create(
+            name='Lycée du Parc', slug='lycee-du-parc', school_type=self.school_type, city=self.city
+        )
+        self.user = User.objects.create_user(
+            email='student@example.com',
+            password='securepass123',
+            first_name='Test',
+            last_name='Student',
+            type='student',
+            is_active=True
+        )
+        self.client.force_login(self.user)
+        self.url = f'/api/schools/api/schools/{self.school.pk}/'
+
+    def test_detail_is_served_from_cache(self):
+        """
+        Test que le détail est servi sans requête SQL tant que rien ne change.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Lycée du Parc')
+
+        # Seules la session et l'utilisateur sont lus
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['review_count'], 0)
+
+    def test_related_changes_invalidate_detail(self):
+        """
+        Test que la modification de l'établissement ou d'un objet lié rend le cache obsolète.
+        """
+        self.client.get(self.url)
+
+        Department.objects.create(school=self.school, name='Sciences', slug='sciences')
+        SchoolReview.objects.create(school=self.school, user=self.user, rating=4)
+        data = self.client.get(self.url).json()
+        self.assertEqual([department['name'] for department in data['departments']], ['Sciences'])
+        self.assertEqual(data['review_count'], 1)
+
+        self.city.name = 'Villeurbanne'
+        self.city.save()
+        self.assertEqual(self.client.get(self.url).json()['city']['name'], 'Villeurbanne')
+
+        self.school.is_active = False
+        self.school.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -2,7 +2,7 @@ from django.urls import path
 from ..views.mobile import (
     SchoolAPIListView, SchoolAPIDetailView,
     SchoolReviewAPIListView, CityAPIListView,
-    SchoolTypeAPIListView
+    SchoolTypeAPIListView, SchoolMediaAPIFileView
 )
 
 app_name = 'schools_api'
@@ -12,6 +12,7 @@ urlpatterns = [
     path('api/schools/', SchoolAPIListView.as_view(), name='api_school_list'),
     path('api/schools/<int:pk>/', SchoolAPIDetailView.as_view(), name='api_school_detail'),
     path('api/schools/<int:pk>/reviews/', SchoolReviewAPIListView.as_view(), name='api_review_list'),
+    path('api/media/<int:pk>/file/', SchoolMediaAPIFileView.as_view(), name='api_media_file'),
     path('api/cities/', CityAPIListView.as_view(), name='api_city_list'),
     path('api/types/', SchoolTypeAPIListView.as_view(), name='api_type_list'),
 ]
\ No newline at end of file
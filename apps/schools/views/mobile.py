@@ -1,14 +1,25 @@
+import hashlib
+
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, filters
-from ..models import SchoolType, City, School, SchoolReview
+from rest_framework.response import Response
+from apps.analytics.conditional import ConditionalResponseMixin
+from apps.analytics.fieldsets import SparseFieldsetViewMixin
+from apps.resources.downloads import serve_file
+from ..models import SchoolType, City, School, SchoolReview, SchoolMedia
 from ..serializers import (
     SchoolTypeSerializer, CitySerializer, 
     SchoolListSerializer, SchoolDetailSerializer,
     SchoolReviewSerializer
 )
+from ..cache import get_or_build
 
 
-class SchoolAPIListView(generics.ListAPIView):
+class SchoolAPIListView(ConditionalResponseMixin, generics.ListAPIView):
+    """
+    Liste des établissements, avec réponse 304 si elle n'a pas changé.
+    """
+    version_models = ('schools.School', 'schools.SchoolType', 'schools.City', 'schools.SchoolReview')
     serializer_class = SchoolListSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'city__name', 'school_type__name']
@@ -35,9 +46,27 @@ class SchoolAPIListView(generics.ListAPIView):
         return queryset
 
 
-class SchoolAPIDetailView(generics.RetrieveAPIView):
+class SchoolAPIDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
+    """
+    Détail d'un établissement. La réponse sérialisée est mise en cache par
+    version (voir apps.schools.cache) : elle est servie sans requête SQL tant
+    que l'établissement et ses relations ne changent pas. Les relations
+    chargées suivent les champs demandés (?fields=, ?expand=).
+    """
     queryset = School.objects.filter(is_active=True)
     serializer_class = SchoolDetailSerializer
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Les URL des fichiers sont absolues et les champs dépendent des
+        # paramètres : une entrée par hôte et par paramètres
+        params = request.query_params
+        variant = f"{request.build_absolute_uri('/')}|{params.get('fields')}|{params.get('expand')}"
+        variant = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()[:8]
+        data = get_or_build(
+            f'api_{variant}', self.kwargs['pk'],
+            lambda: self.get_serializer(self.get_object()).data
+        )[0]
+        return Response(data)
 
 
 class SchoolReviewAPIListView(generics.ListCreateAPIView):
@@ -55,13 +84,37 @@ class SchoolReviewAPIListView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user, school=school, is_public=True)
 
 
-class CityAPIListView(generics.ListAPIView):
+class SchoolMediaAPIFileView(generics.GenericAPIView):
+    """
+    Sert le fichier d'un média public ; affiché dans le navigateur pour
+    permettre la lecture et le positionnement dans les vidéos.
+    """
+    queryset = SchoolMedia.objects.filter(is_public=True, school__is_active=True)
+    
+    def get(self, request, *args, **kwargs):
+        media = self.get_object()
+        return serve_file(request, media.file, as_attachment=False)
+
+
+class CityAPIListView(ConditionalResponseMixin, generics.ListAPIView):
+    """
+    Liste des villes, conservable une heure par le client.
+    """
+    # school_count dépend des établissements
+    version_models = ('schools.City', 'schools.School')
+    cache_control = {'private': True, 'max_age': 3600}
     queryset = City.objects.filter(is_active=True)
     serializer_class = CitySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'region']
 
 
-class SchoolTypeAPIListView(generics.ListAPIView):
+class SchoolTypeAPIListView(ConditionalResponseMixin, generics.ListAPIView):
+    """
+    Liste des types d'établissement, conservable une heure par le client.
+    """
+    # school_count dépend des établissements
+    version_models = ('schools.SchoolType', 'schools.School')
+    cache_control = {'private': True, 'max_age': 3600}
     queryset = SchoolType.objects.all()
     serializer_class = SchoolTypeSerializer
\ No newline at end of file
@@ -4,10 +4,9 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import get_object_or_404, redirect
 from django.db.models import Q, Avg, Count, Prefetch
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
-from django.core.cache import cache
 
 from ..models import (
     SchoolType, City, School, Department, Program,
@@ -17,6 +16,7 @@ from ..forms import (
     SchoolSearchForm, SchoolReviewForm
 )
 from ..permissions import IsSchoolOwnerOrAdmin, CanReviewSchool
+from ..cache import forget_slug, get_or_build, get_school_id
 
 
 class SchoolListView(ListView):
@@ -103,6 +103,13 @@ class CityListView(ListView):
 
 
 class SchoolDetailView(DetailView):
+    """
+    Page d'un établissement. Le graphe d'objets affiché (établissement,
+    relations, avis publics, note, événements) est mis en cache par version
+    (voir apps.schools.cache) : une page déjà construite est servie sans
+    requête SQL pour un visiteur anonyme. Les gabarits peuvent mettre en cache
+    leurs fragments avec {% cache … school.id cache_version %}.
+    """
     model = School
     template_name = 'schools/school_detail.html'
     context_object_name = 'school'
@@ -114,32 +121,42 @@ class SchoolDetailView(DetailView):
             'departments', 'programs', 'facilities', 'contacts', 
             Prefetch('reviews', queryset=SchoolReview.objects.filter(is_public=True).select_related('user')),
             Prefetch('media', queryset=SchoolMedia.objects.filter(is_public=True)),
-            Prefetch('events', queryset=SchoolEvent.objects.filter(is_public=True))
+            Prefetch('events', queryset=SchoolEvent.objects.filter(is_public=True).order_by('start_date'))
         )
     
+    def build_graph(self, school_id):
+        school = self.get_queryset().filter(pk=school_id).first()
+        if school is None:
+            raise Http404
+        ratings = [review.rating for review in school.reviews.all()]
+        return {
+            'school': school,
+            'avg_rating': sum(ratings) / len(ratings) if ratings else None,
+            'review_count': len(ratings),
+        }
+    
+    def get_object(self, queryset=None):
+        slug = self.kwargs['slug']
+        
+        def lookup():
+            return get_object_or_404(School.objects.filter(is_active=True).values_list('id', flat=True), slug=slug)
+        
+        school_id = get_school_id(slug, lookup)
+        self.graph, self.cache_version = get_or_build('page', school_id, lambda: self.build_graph(school_id))
+        if self.graph['school'].slug != slug:
+            # Slug modifié depuis sa mise en cache
+            forget_slug(slug)
+            school_id = get_school_id(slug, lookup)
+            self.graph, self.cache_version = get_or_build('page', school_id, lambda: self.build_graph(school_id))
+        return self.graph['school']
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         school = self.object
-        cache_key = f'school_rating_{school.id}'
-        avg_rating = cache.get(cache_key)
-        
-        if avg_rating is None:
-            avg_rating = school.reviews.filter(is_public=True).aggregate(
-                Avg('rating')
-            )['rating__avg']
-            cache.set(cache_key, avg_rating, 86400)
-        
-        context['avg_rating'] = avg_rating
-        
-        review_count_key = f'school_review_count_{school.id}'
-        review_count = cache.get(review_count_key)
-        
-        if review_count is None:
-            review_count = school.reviews.filter(is_public=True).count()
-            cache.set(review_count_key, review_count, 86400)
-        
-        context['review_count'] = review_count
+        context['avg_rating'] = self.graph['avg_rating']
+        context['review_count'] = self.graph['review_count']
+        context['cache_version'] = self.cache_version
         
         if self.request.user.is_authenticated:
             existing_review = SchoolReview.objects.filter(
@@ -159,11 +176,8 @@ class SchoolDetailView(DetailView):
                     school=school
                 )
         
-        context['upcoming_events'] = school.events.filter(
-            is_public=True
-        ).exclude(
-            is_past=True
-        ).order_by('start_date')[:5]
+        # Filtrés à chaque requête : un événement du graphe en cache peut être passé depuis
+        context['upcoming_events'] = [event for event in school.events.all() if not event.is_past][:5]
         
         return context
 
@@ -345,14 +359,9 @@ class SchoolReviewListView(ListView):
         context = super().get_context_data(**kwargs)
         context['school'] = self.school
         
-        cache_key = f'school_rating_{self.school.id}'
-        avg_rating = cache.get(cache_key)
-        
-        if avg_rating is None:
-            avg_rating = self.school.reviews.filter(is_public=True).aggregate(
-                Avg('rating')
-            )['rating__avg']
-            cache.set(cache_key, avg_rating, 86400)
+        avg_rating = get_or_build('rating', self.school.id, lambda: self.school.reviews.filter(
+            is_public=True
+        ).aggregate(Avg('rating'))['rating__avg'])[0]
         
         context['avg_rating'] = avg_rating
         
@@ -6,4 +6,5 @@ app_name = 'verification'
 urlpatterns = [
     path('', views.verification_list, name='verification_list'),
     path('user/<int:user_id>/', views.user_verification_detail, name='user_verification_detail'),
+    path('user/<int:user_id>/documents/<str:document>/', views.user_document_download, name='user_document'),
 ]
\ No newline at end of file
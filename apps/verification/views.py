@@ -1,14 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.http import Http404
 from django.utils import timezone
 
+from apps.resources.downloads import serve_file
 from apps.accounts.models import User
 
 def is_admin(user):
     """Vérifie si l'utilisateur est un administrateur."""
     return user.is_staff or user.type == 'administrator'
 
+def get_user_documents(user):
+    """
+    Renvoie les documents disponibles pour un utilisateur, par nom.
+    """
+    documents = {
+        'profile_picture': user.profile_picture if user.profile_picture else None,
+        'identity_document': user.identity_document if user.identity_document else None,
+    }
+    
+    # Ajouter des documents spécifiques au type d'utilisateur
+    if user.type == 'teacher' and hasattr(user, 'teacher_profile'):
+        documents['degree_document'] = user.teacher_profile.degree_document if user.teacher_profile.degree_document else None
+        documents['cv'] = user.teacher_profile.cv if user.teacher_profile.cv else None
+    elif user.type == 'advisor' and hasattr(user, 'advisor_profile'):
+        documents['portfolio'] = user.advisor_profile.portfolio if user.advisor_profile.portfolio else None
+    
+    return documents
+
 @login_required
 @user_passes_test(is_admin)
 def verification_list(request):
@@ -50,19 +70,7 @@ def user_verification_detail(request, user_id):
     """
     user = get_object_or_404(User, id=user_id)
     profile = user.get_profile_info()
-    
-    # Récupérer les documents disponibles pour cet utilisateur
-    documents = {
-        'profile_picture': user.profile_picture if user.profile_picture else None,
-        'identity_document': user.identity_document if user.identity_document else None,
-    }
-    
-    # Ajouter des documents spécifiques au type d'utilisateur
-    if user.type == 'teacher' and hasattr(user, 'teacher_profile'):
-        documents['degree_document'] = user.teacher_profile.degree_document if user.teacher_profile.degree_document else None
-        documents['cv'] = user.teacher_profile.cv if user.teacher_profile.cv else None
-    elif user.type == 'advisor' and hasattr(user, 'advisor_profile'):
-        documents['portfolio'] = user.advisor_profile.portfolio if user.advisor_profile.portfolio else None
+    documents = get_user_documents(user)
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -87,4 +95,17 @@ def user_verification_detail(request, user_id):
         'user_type_display': dict(User.USER_TYPE_CHOICES).get(user.type, user.type),
     }
     
-    return render(request, 'dashboard/pages/verification/verification_user_detail.html', context)
\ No newline at end of file
+    return render(request, 'dashboard/pages/verification/verification_user_detail.html', context)
+
+@login_required
+@user_passes_test(is_admin)
+def user_document_download(request, user_id, document):
+    """
+    Envoie un document de vérification d'un utilisateur, affiché dans le navigateur.
+    """
+    user = get_object_or_404(User, id=user_id)
+    field_file = get_user_documents(user).get(document)
+    if not field_file:
+        raise Http404
+    
+    return serve_file(request, field_file, as_attachment=False)
@@ -13,4 +13,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'education_platform.settings.development')
 
+# Les flux temps réel (Server-Sent Events, voir apps/notifications/realtime.py)
+# sont des vues asynchrones : servis par ce point d'entrée, une connexion
+# ouverte n'occupe pas de thread.
 application = get_asgi_application()
\ No newline at end of file
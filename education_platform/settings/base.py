@@ -42,6 +42,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'apps.analytics.compression.CompressionMiddleware',
+    'apps.analytics.instrumentation.RequestInstrumentationMiddleware',
+    'apps.analytics.side_effects.SideEffectsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -117,20 +120,50 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Délégation de l'envoi des fichiers téléchargés au serveur frontal :
+# None (envoi par Django), 'x-accel-redirect' (nginx) ou 'x-sendfile' (Apache)
+DOWNLOADS_OFFLOAD = None
+# Emplacement interne nginx correspondant à MEDIA_ROOT (mode x-accel-redirect)
+DOWNLOADS_ACCEL_PREFIX = '/protected/'
+
+# Génération des déclinaisons d'images dans un thread après téléversement
+IMAGE_DERIVATIVES_BACKGROUND = True
+
+# Mesure des requêtes SQL et du temps de traitement (en-tête Server-Timing,
+# agrégats par route) ; dépassement d'un budget @query_budget : exception si
+# QUERY_BUDGETS_ENFORCE, simple avertissement sinon
+REQUEST_INSTRUMENTATION = True
+QUERY_BUDGETS_ENFORCE = False
+
+# Effets de bord des signaux (activités, préférences de notification) :
+# exécutés immédiatement si True, sinon regroupés après validation
+SIDE_EFFECTS_SYNC = False
+
+# Import en masse de comptes : processus de hachage des mots de passe
+# (None : un par processeur)
+USER_IMPORT_WORKERS = None
+
+# Nombre maximal de lignes d'un import par l'API (au-delà : commande import_users)
+USER_IMPORT_WEB_MAX_ROWS = 200
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.analytics.renderers.FastJSONRenderer',
+        'apps.analytics.renderers.CustomBrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.analytics.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -139,6 +172,21 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Compression brotli / gzip des réponses à partir de cette taille (octets)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Pagination : estimation du nombre de lignes au-delà du seuil (PostgreSQL),
+# mise en cache des nombres exacts à partir du minimum, pour la durée indiquée
+PAGINATION_ESTIMATE_THRESHOLD = 100000
+PAGINATION_COUNT_CACHE_MIN = 1000
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Cache de l'authentification par token : durée de vie dans le cache partagé,
+# puis taille et durée de vie du cache propre à chaque processus (0 : désactivé)
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+TOKEN_AUTH_LOCAL_CACHE_SIZE = 1024
+TOKEN_AUTH_LOCAL_CACHE_TIMEOUT = 5
+
 # Swagger settings for API documentation
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -30,10 +30,16 @@ CACHES = {
     }
 }
 
+# Déclinaisons d'images générées sans thread, à la validation de la transaction
+IMAGE_DERIVATIVES_BACKGROUND = False
+
 # Désactivation des middlewares non essentiels pour les tests
 MIDDLEWARE = [
     middleware for middleware in MIDDLEWARE
     if middleware not in {
         'corsheaders.middleware.CorsMiddleware',
     }
-]
\ No newline at end of file
+]
+
+# Effets de bord des signaux exécutés immédiatement, sans attendre de validation
+SIDE_EFFECTS_SYNC = True